@@ -0,0 +1,64 @@
+"""
+Aho–Corasick multi-pattern matcher.
+Finds every occurrence of a fixed set of keywords in one left-to-right pass over a text,
+instead of one substring search or regex per keyword.
+"""
+
+from collections import deque
+
+
+class AhoCorasick:
+    """
+    Automaton built once from (keyword, value) pairs; several keywords may share a value.
+    Matching is exact; lower-case keywords and text for case-insensitive use.
+    """
+
+    def __init__(self, keywords):
+        goto = [{}]
+        outputs = [[]]
+        for keyword, value in keywords:
+            if not keyword:
+                raise ValueError("keywords must be non-empty")
+            state = 0
+            for char in keyword:
+                child = goto[state].get(char)
+                if child is None:
+                    child = len(goto)
+                    goto.append({})
+                    outputs.append([])
+                    goto[state][char] = child
+                state = child
+            outputs[state].append((len(keyword), value))
+
+        # Breadth-first, so a state's failure target (always shallower) is finished before it.
+        # Failure links are folded into each state's transitions: matching takes one dict lookup per character.
+        fail = [0] * len(goto)
+        delta = [None] * len(goto)
+        delta[0] = dict(goto[0])
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            outputs[state].extend(outputs[fail[state]])
+            for char, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(char, 0)
+                queue.append(child)
+
+        self._delta = delta
+        self._outputs = [tuple(output) for output in outputs]
+
+    def finditer(self, text):
+        """Yield (start, end, value) for every keyword occurrence, overlapping ones included, by end position."""
+        delta = self._delta
+        outputs = self._outputs
+        state = 0
+        for index, char in enumerate(text):
+            state = delta[state].get(char, 0)
+            if outputs[state]:
+                end = index + 1
+                for length, value in outputs[state]:
+                    yield end - length, end, value
+
+    def __len__(self):
+        """Number of automaton states."""
+        return len(self._delta)
@@ -5,53 +5,81 @@ Core bot functionality with slash commands.
 
 import discord
 from discord.ext import commands
-import aiohttp
 import asyncio
+import io
 import time
-import psutil
-import os
-from datetime import datetime, timedelta
+from typing import Literal
+from datetime import datetime
 import logging
 import re
+import sqlite3
 
 from scraper import RTanksScraper
-from utils import format_number, format_exact_number, get_rank_emoji, format_duration, compare_equipment_quality
-from config import RANK_EMOJIS, PREMIUM_EMOJI, GOLD_BOX_EMOJI, RTANKS_BASE_URL
+from scraper_rpc import RemoteScraper
+from circuit_breaker import CircuitOpenError, CLOSED
+from deadline import Deadline, DeadlineExceeded
+from scheduler import INTERACTIVE, BACKGROUND
+from fair_queue import FairQueue, Overloaded, RateLimited
+from resource_sampler import ResourceSampler
+from loop_monitor import LoopLagMonitor
+from profiling import ProfileSession
+from memory_report import MemoryInspector, census, format_size
+from logging_setup import pending_log_records
+from player_cache import PlayerCache, RenderCache
+from leaderboard import Leaderboard, CATEGORIES, KD
+from shared_store import SharedStore
+from models import PlayerSnapshot
+from popularity import PopularityTracker, RefreshAhead, prewarm_cache, save_hot_set
+from localization import translate_rank, translate_group, translate_equipment
+from metrics import registry
+from startup import timeline
+from command_sync import sync_if_changed
+from utils import format_number, format_exact_number, format_duration, compare_equipment_quality, sparkline
+from patched_rank_emoji import get_rank_emoji
+from config import RANK_EMOJIS, PREMIUM_EMOJI, GOLD_BOX_EMOJI, RTANKS_BASE_URL, SPARKLINE_WIDTH, PROFILE_MAX_SECONDS, MEMORY_CENSUS_TYPES
+from config import EQUIPMENT_BUTTON_TEMPLATE, EQUIPMENT_BUTTON_TTL, PLAYER_CACHE_TTL
+from config import LOOKUP_LEASE_TTL, LOOKUP_LEASE_POLL, ONLINE_COUNT_TTL, HEDGE_ENABLED, TOP_BUTTON_TEMPLATE, SHARED_STORE_PATH
 
 logger = logging.getLogger(__name__)
 
-class PlayerEquipmentView(discord.ui.View):
-    def __init__(self, username: str, user_id: int, player_data: dict, language: str = 'en', expanded: bool = False):
-        super().__init__(timeout=None)  # No timeout since we handle expiration manually
+class EquipmentToggleButton(discord.ui.DynamicItem[discord.ui.Button], template=EQUIPMENT_BUTTON_TEMPLATE):
+    """
+    Stateless "+/-" equipment button.
+    Player, language, state, issue time and owner live in the custom_id, so one registered
+    handler serves every message and buttons keep working after a restart.
+    """
+
+    def __init__(self, username: str, user_id: int, language: str = 'en', expanded: bool = False, issued: int = None):
         self.username = username
         self.user_id = user_id
-        self.player_data = player_data
         self.language = language
         self.expanded = expanded
-        self.created_at = datetime.now()
+        self.issued = issued if issued is not None else int(time.time())
         
-        # Add appropriate button based on language and state
-        if expanded:
-            if language == 'ru':
-                self.equipment_button.label = "-"
-                self.equipment_button.emoji = None
-            else:
-                self.equipment_button.label = "-"
-                self.equipment_button.emoji = None
-        else:
-            if language == 'ru':
-                self.equipment_button.label = "+"
-                self.equipment_button.emoji = None
-            else:
-                self.equipment_button.label = "+"
-                self.equipment_button.emoji = None
+        custom_id = f"eq:{language}:{int(expanded)}:{self.issued}:{user_id}:{username}"
+        super().__init__(
+            discord.ui.Button(
+                label="-" if expanded else "+",
+                style=discord.ButtonStyle.secondary,
+                custom_id=custom_id[:100]
+            )
+        )
+    
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(
+            match['username'],
+            int(match['user_id']),
+            match['language'],
+            expanded=match['expanded'] == '1',
+            issued=int(match['issued'])
+        )
     
     def is_expired(self):
         """Check if the button has expired (24 hours)."""
-        return datetime.now() - self.created_at > timedelta(days=1)
+        return time.time() - self.issued > EQUIPMENT_BUTTON_TTL
     
-    @discord.ui.button(label="+", style=discord.ButtonStyle.secondary)
-    async def equipment_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+    async def callback(self, interaction: discord.Interaction):
         # Check if button has expired
         if self.is_expired():
             if self.language == 'ru':
@@ -79,23 +107,21 @@ class PlayerEquipmentView(discord.ui.View):
             # Get the bot instance
             bot = interaction.client
             
+            # Rebuild from the snapshot cache, scraping again only if it was evicted (e.g. after a restart)
+            entry = bot.player_cache.get(self.username)
+            if entry is None:
+                entry = await bot._get_player(self.username, Deadline.for_interaction(interaction), interaction)
+                if entry is None:
+                    raise ValueError(f"no data for {self.username}")
+            
             # Toggle expanded state
             new_expanded = not self.expanded
             
             # Create updated embed based on language and expansion state
-            if self.language == 'ru':
-                embed = await bot._create_player_embed_russian(self.player_data, expanded=new_expanded)
-            else:
-                embed = await bot._create_player_embed(self.player_data, expanded=new_expanded)
+            embed = await bot._render_player_embed(entry, self.language, expanded=new_expanded, stale=bot._is_stale(entry))
             
-            # Create new view with toggled state
-            new_view = PlayerEquipmentView(
-                self.username, 
-                self.user_id, 
-                self.player_data, 
-                self.language, 
-                expanded=new_expanded
-            )
+            # Same button with toggled state, keeping the original issue time
+            new_view = equipment_view(self.username, self.user_id, self.language, new_expanded, self.issued)
             
             # Update the original message
             await interaction.followup.edit_message(interaction.message.id, embed=embed, view=new_view)
@@ -110,46 +136,158 @@ class PlayerEquipmentView(discord.ui.View):
             
             await interaction.followup.send(error_msg, ephemeral=True)
 
-class RTanksBot(commands.Bot):
-    def __init__(self):
+def equipment_view(username: str, user_id: int, language: str = 'en', expanded: bool = False, issued: int = None):
+    """Build a throwaway view holding only the stateless equipment button."""
+    view = discord.ui.View(timeout=None)
+    view.add_item(EquipmentToggleButton(username, user_id, language, expanded, issued))
+    return view
+
+class TopPageButton(discord.ui.DynamicItem[discord.ui.Button], template=TOP_BUTTON_TEMPLATE):
+    """Stateless previous/next page button for /top; anyone may page through the leaderboard."""
+
+    def __init__(self, category: str, page: int, direction: str, disabled: bool = False):
+        self.category = category
+        self.page = page
+        self.direction = direction
+        super().__init__(
+            discord.ui.Button(
+                label="◀" if direction == 'p' else "▶",
+                style=discord.ButtonStyle.secondary,
+                custom_id=f"top:{category}:{page}:{direction}",
+                disabled=disabled
+            )
+        )
+    
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match['category'], int(match['page']), match['direction'])
+    
+    async def callback(self, interaction: discord.Interaction):
+        bot = interaction.client
+        if self.category not in CATEGORIES:
+            await interaction.response.send_message("⚠️ This leaderboard no longer exists.", ephemeral=True)
+            return
+        page, embed = bot._top_embed(self.category, self.page)
+        await interaction.response.edit_message(embed=embed, view=top_view(self.category, page, bot.leaderboard.page_count(self.category)))
+
+def top_view(category: str, page: int, page_count: int):
+    """Previous/next buttons for a /top page."""
+    view = discord.ui.View(timeout=None)
+    view.add_item(TopPageButton(category, max(1, page - 1), 'p', disabled=page <= 1))
+    view.add_item(TopPageButton(category, min(page_count, page + 1), 'n', disabled=page >= page_count))
+    return view
+
+# /top category choices: (emoji, label)
+TOP_CATEGORIES = {
+    'experience': ('⭐', 'Experience'),
+    'kills': ('💥', 'Kills'),
+    'kd': ('⚖️', 'K/D'),
+    'gold_boxes': (GOLD_BOX_EMOJI, 'Gold boxes'),
+    'equipment': ('🛠️', 'Equipment score'),
+}
+
+class RTanksBot(commands.AutoShardedBot):
+    def __init__(self, force_command_sync=False, shard_count=None, shard_ids=None, scraper_sockets=None):
         intents = discord.Intents.default()
         intents.message_content = True
         
+        # With shard_ids set, this process runs only those shards of shard_count
         super().__init__(
             command_prefix='!',
             intents=intents,
-            help_command=None
+            help_command=None,
+            shard_count=shard_count,
+            shard_ids=shard_ids
         )
         
+        # Sync slash commands even if the schema fingerprint is unchanged
+        self.force_command_sync = force_command_sync
+        
         # Bot statistics
         self.start_time = datetime.now()
         self.commands_processed = 0
         self.scraping_successes = 0
         self.scraping_failures = 0
         self.total_scraping_time = 0.0
+        self.cache_hits = 0
+        
+        # Snapshots, scrape leases and the request schedule shared with other shard processes (opt-in)
+        self.shared_store = SharedStore() if SHARED_STORE_PATH else None
+        if self.shared_store is None and shard_ids is not None:
+            logger.warning("SHARED_STORE_PATH is not set; shard processes will not share snapshots or the request schedule")
+        self._store_writes = set()
+        
+        # Initialize scraper, in-process or as a client of scraper worker processes
+        if scraper_sockets:
+            self.scraper = RemoteScraper(scraper_sockets)
+        else:
+            self.scraper = RTanksScraper(shared_store=self.shared_store)
         
-        # Initialize scraper
-        self.scraper = RTanksScraper()
+        # Latest snapshot per player, used to rebuild embeds for button presses
+        self.player_cache = PlayerCache()
+        self.player_cache.add_listener(self._publish_player)
+        
+        # Sorted indexes of every player seen, for /top
+        self.leaderboard = Leaderboard()
+        self.player_cache.add_listener(lambda key, entry, shared: self.leaderboard.update(entry.snapshot))
+        self.render_cache = RenderCache()
+        
+        # Lookups in progress in this process, so concurrent requests share one scrape
+        self._inflight = {}
+        
+        # Admission control for lookups that have to hit the website
+        self.fair_queue = FairQueue()
+        
+        # Request frequency per player; hot players are refreshed before they expire
+        self.popularity = PopularityTracker()
+        self.refresh_ahead = RefreshAhead(self.scraper, self.player_cache, self.popularity)
+        
+        # Background sampler feeding /botstats
+        self.resource_sampler = ResourceSampler(self.scraper)
+        self.loop_monitor = LoopLagMonitor()
+        
+        # Running /profile session, if any
+        self.profile_session = None
+        
+        # tracemalloc snapshots for /memory
+        self.memory_inspector = MemoryInspector()
     
     async def setup_hook(self):
+        # setup_hook runs once the token has been accepted
+        timeline.mark('login')
         self.loop.create_task(self._update_online_status_task())
+        self.resource_sampler.start()
+        self.loop_monitor.start()
+        self.refresh_ahead.start()
+        # Pre-warm in the background so command registration and on_ready are not held up
+        self.loop.create_task(prewarm_cache(self.scraper, self.player_cache, self.popularity))
+        self.loop.create_task(self._seed_leaderboard())
+        self.add_dynamic_items(EquipmentToggleButton, TopPageButton)
         """Setup hook called when bot is starting up."""
         # Register commands with the command tree
         self.tree.command(name="player", description="Get RTanks player statistics")(self.player_command_handler)
         self.tree.command(name="игрок", description="Получить статистику игрока RTanks")(self.player_command_handler_russian)
         self.tree.command(name="botstats", description="Display bot performance statistics")(self.botstats_command_handler)
         self.tree.command(name="compare", description="Compare two RTanks players")(self.compare_command_handler)
+        self.tree.command(name="top", description="Show the top known RTanks players")(self.top_command_handler)
+        self.tree.command(name="profile", description="Profile the bot for a few seconds (owner only)")(self.profile_command_handler)
+        self.tree.command(name="memory", description="Show a memory usage report (owner only)")(self.memory_command_handler)
         
-        try:
-            synced = await self.tree.sync()
-            logger.info(f"Synced {len(synced)} command(s)")
-        except Exception as e:
-            logger.error(f"Failed to sync commands: {e}")
+        # Global commands only need syncing once; leave it to the process running shard 0
+        if self.shard_ids is None or 0 in self.shard_ids:
+            try:
+                # Only hit the global sync endpoint when the command schema changed
+                await sync_if_changed(self.tree, self.application_id, force=self.force_command_sync)
+            except Exception as e:
+                logger.error(f"Failed to sync commands: {e}")
+        timeline.mark('command sync')
     
     async def on_ready(self):
         """Called when the bot is ready."""
         logger.info(f'{self.user} has connected to Discord!')
         logger.info(f'Bot is in {len(self.guilds)} guilds')
+        if timeline.mark('gateway ready'):
+            timeline.log()
         
         # Set bot status
 
@@ -162,10 +300,10 @@ class RTanksBot(commands.Bot):
         self.commands_processed += 1
         
         try:
-            # Scrape player data
-            player_data = await self.scraper.get_player_data(username.strip())
+            # Scrape player data (or reuse a fresh snapshot) within the interaction's deadline
+            entry = await self._get_player(username.strip(), Deadline.for_interaction(interaction), interaction)
             
-            if not player_data:
+            if entry is None:
                 embed = discord.Embed(
                     title="❌ Player Not Found",
                     description=f"Player `{username}` not found,try again.",
@@ -176,17 +314,27 @@ class RTanksBot(commands.Bot):
                 return
             
             # Create player embed
-            embed = await self._create_player_embed(player_data)
+            embed = await self._render_player_embed(entry, 'en', stale=self._is_stale(entry))
             
             # Create equipment view
-            view = PlayerEquipmentView(username, interaction.user.id, player_data, 'en')
+            view = equipment_view(username.strip(), interaction.user.id, 'en')
             
             await interaction.followup.send(embed=embed, view=view)
             
             # Update statistics
-            scraping_time = time.time() - start_time
-            self.total_scraping_time += scraping_time
-            self.scraping_successes += 1
+            self._record_lookups((entry,), start_time)
+            
+        except CircuitOpenError as e:
+            await interaction.followup.send(embed=self._website_down_embed(e.retry_after, 'en'))
+            self.scraping_failures += 1
+            
+        except Overloaded as e:
+            await interaction.followup.send(embed=self._busy_embed(e, 'en'))
+            
+        except DeadlineExceeded as e:
+            logger.info("Dropped player lookup for %s: %s", username, e)
+            await self._send_timed_out(interaction, 'en')
+            self.scraping_failures += 1
             
         except Exception as e:
             logger.error(f"Error processing player command: {e}")
@@ -208,10 +356,10 @@ class RTanksBot(commands.Bot):
         self.commands_processed += 1
         
         try:
-            # Scrape player data
-            player_data = await self.scraper.get_player_data(username.strip())
+            # Scrape player data (or reuse a fresh snapshot) within the interaction's deadline
+            entry = await self._get_player(username.strip(), Deadline.for_interaction(interaction), interaction)
             
-            if not player_data:
+            if entry is None:
                 embed = discord.Embed(
                     title="❌ Игрок не найден",
                     description=f"Игрок `{username}` не найден, попробуйте еще раз.",
@@ -222,17 +370,27 @@ class RTanksBot(commands.Bot):
                 return
             
             # Create Russian player embed
-            embed = await self._create_player_embed_russian(player_data)
+            embed = await self._render_player_embed(entry, 'ru', stale=self._is_stale(entry))
             
             # Create equipment view with Russian language
-            view = PlayerEquipmentView(username, interaction.user.id, player_data, 'ru')
+            view = equipment_view(username.strip(), interaction.user.id, 'ru')
             
             await interaction.followup.send(embed=embed, view=view)
             
             # Update statistics
-            scraping_time = time.time() - start_time
-            self.total_scraping_time += scraping_time
-            self.scraping_successes += 1
+            self._record_lookups((entry,), start_time)
+            
+        except CircuitOpenError as e:
+            await interaction.followup.send(embed=self._website_down_embed(e.retry_after, 'ru'))
+            self.scraping_failures += 1
+            
+        except Overloaded as e:
+            await interaction.followup.send(embed=self._busy_embed(e, 'ru'))
+            
+        except DeadlineExceeded as e:
+            logger.info("Dropped player lookup for %s: %s", username, e)
+            await self._send_timed_out(interaction, 'ru')
+            self.scraping_failures += 1
             
         except Exception as e:
             logger.error(f"Error processing Russian player command: {e}")
@@ -271,21 +429,27 @@ class RTanksBot(commands.Bot):
                 return
             
             # Fetch data for both players
-            logger.info(f"Fetching data for {player1} and {player2}")
+            logger.info("Fetching data for %s and %s", player1, player2)
             
-            # Fetch both players concurrently
-            player1_task = self.scraper.get_player_data(player1)
-            player2_task = self.scraper.get_player_data(player2)
+            # Fetch both players concurrently under one deadline
+            deadline = Deadline.for_interaction(interaction)
+            player1_task = self._get_player(player1, deadline, interaction)
+            player2_task = self._get_player(player2, deadline, interaction)
             
-            player1_data, player2_data = await asyncio.gather(player1_task, player2_task, return_exceptions=True)
+            player1_entry, player2_entry = await asyncio.gather(player1_task, player2_task, return_exceptions=True)
             
-            # Check for errors in data fetching
-            if isinstance(player1_data, Exception):
-                logger.error(f"Error fetching {player1}: {player1_data}")
-                player1_data = None
-            if isinstance(player2_data, Exception):
-                logger.error(f"Error fetching {player2}: {player2_data}")
-                player2_data = None
+            # Check for errors in data fetching; an open circuit is reported as such, not as "not found"
+            for result in (player1_entry, player2_entry):
+                if isinstance(result, (CircuitOpenError, Overloaded, DeadlineExceeded)):
+                    raise result
+            if isinstance(player1_entry, Exception):
+                logger.error(f"Error fetching {player1}: {player1_entry}")
+                player1_entry = None
+            if isinstance(player2_entry, Exception):
+                logger.error(f"Error fetching {player2}: {player2_entry}")
+                player2_entry = None
+            player1_data = player1_entry.snapshot if player1_entry else None
+            player2_data = player2_entry.snapshot if player2_entry else None
             
             # Handle cases where one or both players are not found
             if not player1_data and not player2_data:
@@ -318,12 +482,26 @@ class RTanksBot(commands.Bot):
             
             # Create comparison embed
             embed = await self._create_comparison_embed(player1_data, player2_data)
+            stale_entries = [entry for entry in (player1_entry, player2_entry) if self._is_stale(entry)]
+            if stale_entries:
+                oldest = max(entry.age for entry in stale_entries)
+                embed.set_footer(text=self._stale_footer(oldest, 'en'))
             await interaction.followup.send(embed=embed)
             
             # Update statistics
-            scraping_time = time.time() - start_time
-            self.total_scraping_time += scraping_time
-            self.scraping_successes += 2
+            self._record_lookups((player1_entry, player2_entry), start_time)
+            
+        except CircuitOpenError as e:
+            await interaction.followup.send(embed=self._website_down_embed(e.retry_after, 'en'))
+            self.scraping_failures += 1
+            
+        except Overloaded as e:
+            await interaction.followup.send(embed=self._busy_embed(e, 'en'))
+            
+        except DeadlineExceeded as e:
+            logger.info("Dropped comparison of %s and %s: %s", player1, player2, e)
+            await self._send_timed_out(interaction, 'en')
+            self.scraping_failures += 1
             
         except Exception as e:
             logger.error(f"Error processing compare command: {e}")
@@ -336,6 +514,53 @@ class RTanksBot(commands.Bot):
             await interaction.followup.send(embed=embed)
             self.scraping_failures += 1
 
+    @discord.app_commands.describe(
+        category="What to rank players by",
+        page="Leaderboard page"
+    )
+    async def top_command_handler(
+        self,
+        interaction: discord.Interaction,
+        category: Literal['experience', 'kills', 'kd', 'gold_boxes', 'equipment'] = 'experience',
+        page: discord.app_commands.Range[int, 1, 10000] = 1
+    ):
+        """Slash command to show a leaderboard page, read from the in-memory index (no scraping)."""
+        self.commands_processed += 1
+        page, embed = self._top_embed(category, page)
+        await interaction.response.send_message(embed=embed, view=top_view(category, page, self.leaderboard.page_count(category)))
+    
+    def _top_embed(self, category, page):
+        """Render one leaderboard page; returns (page actually shown, embed)."""
+        emoji, label = TOP_CATEGORIES[category]
+        page, rows = self.leaderboard.page(category, page)
+        lines = []
+        for position, username, rank, premium, value in rows:
+            shown = f"{value:.2f}" if category == KD else format_exact_number(value)
+            lines.append(f"`#{position}` {get_rank_emoji(rank, premium=premium)} **{username}** — {shown}")
+        embed = discord.Embed(
+            title=f"{emoji} Top players by {label}",
+            description="\n".join(lines) or "No players known yet. Look some up with /player first.",
+            color=0xffd700,
+            timestamp=datetime.now()
+        )
+        embed.set_footer(text=f"Page {page}/{self.leaderboard.page_count(category)} • {format_number(len(self.leaderboard))} players seen by the bot")
+        return page, embed
+    
+    async def _seed_leaderboard(self):
+        """Add every player in the shared store to the leaderboard, so /top survives restarts."""
+        if self.shared_store is None:
+            return
+        try:
+            rows = await self.shared_store.run(self.shared_store.all_players)
+        except sqlite3.Error as e:
+            logger.warning(f"Could not seed leaderboard from the shared store: {e}")
+            return
+        self.leaderboard.load(
+            dict(PlayerSnapshot.fields_from_tuple(data), equipment_levels=PlayerSnapshot.mod_levels_from_tuple(data))
+            for _, data, _ in rows
+        )
+        logger.info(f"Leaderboard seeded with {len(self.leaderboard)} player(s)")
+    
     async def botstats_command_handler(self, interaction: discord.Interaction):
         """Slash command to display bot statistics."""
         await interaction.response.defer()
@@ -345,6 +570,9 @@ class RTanksBot(commands.Bot):
         # Calculate bot latency
         bot_latency = round(self.latency * 1000, 2)
         
+        # Event loop scheduling delay from the lag monitor
+        lag_series = registry.series('loop_lag_ms')
+        
         # Calculate average scraping latency
         avg_scraping_latency = 0
         if self.scraping_successes > 0:
@@ -354,10 +582,13 @@ class RTanksBot(commands.Bot):
         uptime = datetime.now() - self.start_time
         uptime_str = format_duration(uptime.total_seconds())
         
-        # Get system stats
-        process = psutil.Process(os.getpid())
-        memory_usage = round(process.memory_info().rss / 1024 / 1024, 2)  # MB
-        cpu_usage = round(process.cpu_percent(interval=1), 1)
+        # System stats come from the background sampler so this never blocks
+        cpu_series = registry.series('cpu_percent')
+        rss_series = registry.series('rss_mb')
+        memory_usage = rss_series.last(0)
+        cpu_usage = cpu_series.last(0)
+        open_fds = registry.series('open_fds').last(0)
+        task_count = registry.series('asyncio_tasks').last(0)
         
         # Calculate success rate
         total_scrapes = self.scraping_successes + self.scraping_failures
@@ -374,13 +605,16 @@ class RTanksBot(commands.Bot):
         # Performance metrics
         embed.add_field(
             name="📡 Latency",
-            value=f"**Discord API:** {bot_latency}ms\n**Scraping Avg:** {avg_scraping_latency}ms",
+            value=(
+                f"**Discord API:** {bot_latency}ms\n**Scraping Avg:** {avg_scraping_latency}ms\n"
+                f"**Loop Lag p99:** {lag_series.percentile(99)}ms `{sparkline(lag_series.values(), SPARKLINE_WIDTH)}`"
+            ),
             inline=True
         )
         
         embed.add_field(
             name="⏱️ Uptime",
-            value=uptime_str,
+            value=f"{uptime_str}\n**Ready in:** {timeline.total:.2f}s",
             inline=True
         )
         
@@ -400,19 +634,38 @@ class RTanksBot(commands.Bot):
         # Scraping statistics
         embed.add_field(
             name="🔍 Scraping Stats",
-            value=f"**Successful:** {format_number(self.scraping_successes)}\n**Failed:** {format_number(self.scraping_failures)}",
+            value=(
+                f"**Successful:** {format_number(self.scraping_successes)}\n**Failed:** {format_number(self.scraping_failures)}\n"
+                f"**Cache Hits:** {format_number(self.cache_hits)}\n"
+                f"**Queued:** {self.scraper.scheduler.queued(INTERACTIVE)} interactive, "
+                f"{self.scraper.scheduler.queued(BACKGROUND)} background\n"
+                f"**Admission:** {self.fair_queue.depth} waiting, {format_number(registry.counter('fair_queue_shed'))} shed"
+                + (f"\n**Hedged:** {format_number(registry.counter('hedged_requests'))} "
+                   f"({format_number(registry.counter('hedge_wins'))} won)" if HEDGE_ENABLED else "")
+            ),
             inline=True
         )
         
         # System resources
         embed.add_field(
             name="💻 System Resources",
-            value=f"**Memory:** {memory_usage} MB\n**CPU:** {cpu_usage}%",
+            value=(
+                f"**Memory:** {memory_usage} MB `{sparkline(rss_series.values(), SPARKLINE_WIDTH)}`\n"
+                f"**CPU:** {cpu_usage}% `{sparkline(cpu_series.values(), SPARKLINE_WIDTH)}`\n"
+                f"**FDs:** {open_fds} | **Tasks:** {task_count}"
+            ),
             inline=True
         )
         
+        # Startup phases
+        embed.add_field(
+            name="🚀 Startup",
+            value=" → ".join(f"{name} {duration * 1000:.0f}ms" for name, duration in timeline.phases()) or "In progress",
+            inline=False
+        )
+        
         # Website status
-        website_status = await self._check_website_status()
+        website_status = self._format_website_status()
         embed.add_field(
             name="🌍 Website Status",
             value=website_status,
@@ -423,6 +676,316 @@ class RTanksBot(commands.Bot):
         
         await interaction.followup.send(embed=embed)
 
+    @discord.app_commands.describe(
+        seconds="How long to profile for",
+        mode="sampling (low overhead) or deterministic (cProfile)"
+    )
+    async def profile_command_handler(
+        self,
+        interaction: discord.Interaction,
+        seconds: discord.app_commands.Range[int, 1, PROFILE_MAX_SECONDS] = 10,
+        mode: Literal['sampling', 'deterministic'] = 'sampling'
+    ):
+        """Owner-only slash command to profile the event loop and parse workers."""
+        if not await self.is_owner(interaction.user):
+            await interaction.response.send_message("❌ This command is restricted to the bot owner.", ephemeral=True)
+            return
+        
+        if self.profile_session is not None:
+            await interaction.response.send_message("⏳ A profiling session is already running.", ephemeral=True)
+            return
+        
+        # Claimed before the first await so a concurrent invocation sees it
+        session = ProfileSession(mode)
+        self.profile_session = session
+        try:
+            await interaction.response.defer(ephemeral=True)
+            self.commands_processed += 1
+            
+            session.start()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                session.stop()
+        finally:
+            self.profile_session = None
+        
+        try:
+            stats_name, stats_bytes = await asyncio.to_thread(session.stats_file)
+            collapsed = await asyncio.to_thread(session.collapsed_stacks)
+            summary = await asyncio.to_thread(session.summary)
+        except Exception as e:
+            logger.error(f"Error building profile results: {e}")
+            await interaction.followup.send("⚠️ Failed to build profiling results.", ephemeral=True)
+            return
+        
+        files = [
+            discord.File(io.BytesIO(stats_bytes), filename=stats_name),
+            discord.File(io.BytesIO(collapsed.encode('utf-8')), filename='profile.collapsed.txt'),
+        ]
+        await interaction.followup.send(f"```\n{summary[:1900]}\n```", files=files, ephemeral=True)
+
+    @discord.app_commands.describe(
+        action="report: object census, snapshot: take a tracemalloc snapshot and diff it, stop: stop tracing"
+    )
+    async def memory_command_handler(
+        self,
+        interaction: discord.Interaction,
+        action: Literal['report', 'snapshot', 'stop'] = 'report'
+    ):
+        """Owner-only slash command to inspect memory usage."""
+        if not await self.is_owner(interaction.user):
+            await interaction.response.send_message("❌ This command is restricted to the bot owner.", ephemeral=True)
+            return
+        
+        await interaction.response.defer(ephemeral=True)
+        self.commands_processed += 1
+        
+        try:
+            if action == 'stop':
+                self.memory_inspector.stop()
+            elif action == 'snapshot':
+                await asyncio.to_thread(self.memory_inspector.take_snapshot)
+            report = self._build_memory_report()
+        except Exception as e:
+            logger.error(f"Error building memory report: {e}")
+            await interaction.followup.send("⚠️ Failed to build memory report.", ephemeral=True)
+            return
+        
+        report_file = discord.File(io.BytesIO(report.encode('utf-8')), filename='memory_report.txt')
+        await interaction.followup.send(f"```\n{report[:1900]}\n```", file=report_file, ephemeral=True)
+
+    def _build_memory_report(self):
+        """Describe RSS, key object counts and tracemalloc results as plain text."""
+        lines = [f"RSS: {registry.series('rss_mb').last(0)} MB"]
+        
+        # Census runs on the loop thread so the objects cannot change underneath it
+        lines.append("")
+        lines.append("Key objects:")
+        for name, (count, size) in census(MEMORY_CENSUS_TYPES).items():
+            lines.append(f"  {name}: {count} ({format_size(size)})")
+        lines.append(f"  Cached players: {len(self.player_cache)}")
+        lines.append(f"  Cached embeds: {len(self.render_cache)} ({self.render_cache.hits} hits / {self.render_cache.misses} misses)")
+        lines.append(f"  Pending asyncio tasks: {len(asyncio.all_tasks())}")
+        lines.append(f"  Queued log records: {pending_log_records()}")
+        
+        if not self.memory_inspector.tracing:
+            lines.append("")
+            lines.append("tracemalloc is off, use action 'snapshot' to start it.")
+            return "\n".join(lines)
+        
+        top = self.memory_inspector.top_allocators()
+        if top:
+            lines.append("")
+            lines.append("Top allocators:")
+            lines.extend(f"  {line}" for line in top)
+        
+        diff = self.memory_inspector.diff()
+        if diff:
+            lines.append("")
+            lines.append("Since previous snapshot:")
+            lines.extend(f"  {line}" for line in diff)
+        elif top:
+            lines.append("")
+            lines.append("Take another snapshot to see growth since this one.")
+        return "\n".join(lines)
+
+    async def _get_player(self, username, deadline=None, interaction=None):
+        """
+        Return a fresh cache entry for ``username``, scraping only when the cached one is stale.
+        Snapshots scraped by other shard processes are reused through the shared store.
+        Scraping is abandoned with DeadlineExceeded once ``deadline`` passes.
+        Scrapes for an ``interaction`` are admitted through the fair queue of its guild and user.
+        While the website circuit is open or the queue sheds load, an older cached entry is
+        returned instead; with nothing cached, the error propagates so the caller can fail fast.
+        """
+        self.popularity.record(username)
+        entry = self.player_cache.get_fresh(username, PLAYER_CACHE_TTL)
+        if entry is None:
+            entry = await self._shared_get(username)
+        if entry is not None:
+            return entry
+        try:
+            if interaction is None:
+                return await self._lookup(username, deadline)
+            async with self.fair_queue.admit(interaction.guild_id, interaction.user.id, deadline=deadline):
+                return await self._lookup(username, deadline)
+        except (CircuitOpenError, Overloaded):
+            entry = self.player_cache.get(username) or await self._shared_get(username, max_age=None)
+            if entry is None:
+                raise
+            return entry
+    
+    async def _lookup(self, username, deadline=None):
+        """Scrape ``username``, sharing one scrape between every concurrent caller in this process."""
+        key = PlayerCache.key(username)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._lookup_leader(username, deadline))
+            self._inflight[key] = task
+            
+            def finished(done):
+                self._inflight.pop(key, None)
+                # Retrieve the error here in case every caller gave up before it was raised
+                if not done.cancelled():
+                    done.exception()
+            task.add_done_callback(finished)
+        else:
+            registry.incr('lookups_coalesced')
+        # A caller giving up must not cancel the scrape the others are waiting on
+        waiter = asyncio.shield(task)
+        if deadline is not None:
+            return await deadline.wait_for(waiter, 'player lookup')
+        return await waiter
+    
+    async def _lookup_leader(self, username, deadline):
+        """
+        Scrape on behalf of this process unless another shard process holds the lease
+        for the same player, in which case wait for its result in the shared store.
+        """
+        store = self.shared_store
+        if store is None:
+            return await self._scrape(username, deadline)
+        key = PlayerCache.key(username)
+        try:
+            while not await store.run(store.acquire_lease, key, LOOKUP_LEASE_TTL):
+                registry.incr('lookups_shared_wait')
+                while await store.run(store.lease_held, key):
+                    if deadline is not None:
+                        deadline.check('shared lookup')
+                    await asyncio.sleep(LOOKUP_LEASE_POLL)
+                entry = await self._shared_get(username)
+                if entry is not None:
+                    return entry
+                # The leaseholder found nothing or died; try for the lease ourselves
+        except sqlite3.Error as e:
+            logger.warning(f"Shared store unavailable, scraping {username} without a lease: {e}")
+            return await self._scrape(username, deadline)
+        try:
+            entry = await self._scrape(username, deadline)
+            if entry is not None:
+                # Written before the lease is released so waiting processes find it
+                await self._write_shared_player(key, entry)
+            return entry
+        finally:
+            try:
+                await store.run(store.release_lease, key)
+            except sqlite3.Error as e:
+                logger.warning(f"Could not release the lookup lease for {key}: {e}")
+    
+    async def _scrape(self, username, deadline):
+        snapshot = await self.scraper.get_player_data(username, deadline)
+        if not snapshot:
+            return None
+        return self.player_cache.put(username, snapshot, shared=True)
+    
+    async def _shared_get(self, username, max_age=PLAYER_CACHE_TTL):
+        """Copy a snapshot another shard process stored into the local cache and return its entry."""
+        if self.shared_store is None:
+            return None
+        try:
+            row = await self.shared_store.run(self.shared_store.get_player, PlayerCache.key(username), max_age)
+        except sqlite3.Error as e:
+            logger.warning(f"Shared store read failed: {e}")
+            return None
+        if row is None:
+            return None
+        data, fetched_at = row
+        return self.player_cache.put(username, PlayerSnapshot.from_tuple(data), fetched_at=fetched_at, shared=True)
+    
+    def _publish_player(self, key, entry, shared):
+        """Cache listener: write snapshots scraped in the background through to the shared store."""
+        if shared or self.shared_store is None:
+            return
+        task = asyncio.get_running_loop().create_task(self._write_shared_player(key, entry))
+        self._store_writes.add(task)
+        task.add_done_callback(self._store_writes.discard)
+    
+    async def _write_shared_player(self, key, entry):
+        try:
+            await self.shared_store.run(self.shared_store.put_player, key, entry.snapshot.to_tuple(), entry.fetched_at)
+        except sqlite3.Error as e:
+            logger.warning(f"Shared store write failed for {key}: {e}")
+
+    def _record_lookups(self, entries, start_time):
+        """Scraping stats count only entries fetched during this command; the rest were served from cache."""
+        scraped = sum(1 for entry in entries if entry.fetched_at >= start_time)
+        self.cache_hits += len(entries) - scraped
+        if scraped:
+            self.total_scraping_time += time.time() - start_time
+            self.scraping_successes += scraped
+
+    @staticmethod
+    def _is_stale(entry):
+        return entry is not None and entry.age > PLAYER_CACHE_TTL
+
+    @staticmethod
+    def _stale_footer(age, language='en'):
+        if language == 'ru':
+            return f"⚠️ Данные из кэша ({format_duration(age)} назад) — актуальные данные недоступны"
+        return f"⚠️ Cached data from {format_duration(age)} ago — live lookup unavailable"
+
+    @staticmethod
+    def _website_down_embed(retry_after, language='en'):
+        """Fast-fail reply while the website circuit is open and nothing is cached."""
+        if language == 'ru':
+            return discord.Embed(
+                title="🚧 Сайт недоступен",
+                description=f"Сайт рейтинга RTanks сейчас не отвечает. Попробуйте снова через {format_duration(retry_after)}.",
+                color=0xffa500
+            )
+        return discord.Embed(
+            title="🚧 Website Unavailable",
+            description=f"The RTanks ratings website is not responding right now. Please try again in {format_duration(retry_after)}.",
+            color=0xffa500
+        )
+
+    @staticmethod
+    def _busy_embed(error, language='en'):
+        """Reply for a lookup shed by the fair queue with nothing cached to fall back on."""
+        if isinstance(error, RateLimited):
+            if language == 'ru':
+                title, description = "⏳ Слишком много запросов", f"Вы отправляете запросы слишком часто. Попробуйте снова через {format_duration(error.retry_after)}."
+            else:
+                title, description = "⏳ Slow Down", f"You are sending lookups too quickly. Please try again in {format_duration(error.retry_after)}."
+        elif language == 'ru':
+            title, description = "🚦 Бот перегружен", "Сейчас обрабатывается слишком много запросов. Попробуйте еще раз через минуту."
+        else:
+            title, description = "🚦 Bot Busy", "Too many lookups are queued right now. Please try again in a minute."
+        return discord.Embed(title=title, description=description, color=0xffa500)
+
+    @staticmethod
+    async def _send_timed_out(interaction, language='en'):
+        """Tell the user the lookup was abandoned, if the interaction can still be answered."""
+        if language == 'ru':
+            message = "⌛ Запрос занял слишком много времени и был отменён. Попробуйте еще раз."
+        else:
+            message = "⌛ The lookup took too long and was cancelled. Please try again."
+        try:
+            await interaction.followup.send(message, ephemeral=True)
+        except discord.HTTPException as e:
+            # The interaction token has expired; nobody is left to answer
+            logger.debug(f"Could not report timeout: {e}")
+
+    async def _render_player_embed(self, entry, language='en', expanded=False, stale=False):
+        """
+        Render the player embed for a cache entry, reusing the payload rendered earlier
+        for the same snapshot version, language and expansion state.
+        Stale entries get a footer saying how old the data is.
+        """
+        payload = self.render_cache.get(entry.version, language, expanded)
+        if payload is None:
+            if language == 'ru':
+                embed = await self._create_player_embed_russian(entry.snapshot, expanded=expanded)
+            else:
+                embed = await self._create_player_embed(entry.snapshot, expanded=expanded)
+            payload = embed.to_dict()
+            self.render_cache.put(entry.version, language, expanded, payload)
+        embed = discord.Embed.from_dict(payload)
+        if stale:
+            embed.set_footer(text=self._stale_footer(entry.age, language))
+        return embed
+
     async def _create_player_embed(self, player_data, expanded=False):
         """Create a formatted embed for player data."""
         # Create embed with activity status
@@ -592,7 +1155,7 @@ class RTanksBot(commands.Bot):
             embed.set_thumbnail(url=emoji_url)
         
         # Rank field with Russian translation
-        rank_russian = self._translate_rank_to_russian(player_data['rank'])
+        rank_russian = translate_rank(player_data['rank'], 'ru')
         embed.add_field(
             name="Звание",
             value=f"**{rank_russian}**",
@@ -646,7 +1209,7 @@ class RTanksBot(commands.Bot):
         )
         
         # Group/Clan in Russian - translate all possible group types
-        group_text = self._translate_group_to_russian(player_data.get('group', 'Нет группы'))
+        group_text = translate_group(player_data.get('group'), 'ru')
         embed.add_field(
             name="Группа",
             value=group_text,
@@ -664,16 +1227,16 @@ class RTanksBot(commands.Bot):
                 equipped_protections = player_data['equipment'].get('equipped_protections', [])
                 
                 if equipped_turrets:
-                    russian_turret = self._translate_equipment_to_russian(equipped_turrets[0])
+                    russian_turret = translate_equipment(equipped_turrets[0], 'ru')
                     equipment_text += f"**Башня:** {russian_turret}\n"
                 
                 if equipped_hulls:
-                    russian_hull = self._translate_equipment_to_russian(equipped_hulls[0])
+                    russian_hull = translate_equipment(equipped_hulls[0], 'ru')
                     equipment_text += f"**Корпус:** {russian_hull}\n"
                 
                 if equipped_protections:
                     current_paints = equipped_protections[:3]
-                    russian_paints = [self._translate_equipment_to_russian(paint) for paint in current_paints]
+                    russian_paints = [translate_equipment(paint, 'ru') for paint in current_paints]
                     paints_text = ", ".join(russian_paints)
                     equipment_text += f"**Краски:** {paints_text}"
                         
@@ -689,17 +1252,17 @@ class RTanksBot(commands.Bot):
             else:
                 # Show all equipment in Russian
                 if player_data['equipment'].get('turrets'):
-                    russian_turrets = [self._translate_equipment_to_russian(turret) for turret in player_data['equipment']['turrets']]
+                    russian_turrets = [translate_equipment(turret, 'ru') for turret in player_data['equipment']['turrets']]
                     turrets = ", ".join(russian_turrets)
                     equipment_text += f"**Башни:** {turrets}\n"
                 
                 if player_data['equipment'].get('hulls'):
-                    russian_hulls = [self._translate_equipment_to_russian(hull) for hull in player_data['equipment']['hulls']]
+                    russian_hulls = [translate_equipment(hull, 'ru') for hull in player_data['equipment']['hulls']]
                     hulls = ", ".join(russian_hulls)
                     equipment_text += f"**Корпуса:** {hulls}\n"
                 
                 if player_data['equipment'].get('protections'):
-                    russian_protections = [self._translate_equipment_to_russian(protection) for protection in player_data['equipment']['protections']]
+                    russian_protections = [translate_equipment(protection, 'ru') for protection in player_data['equipment']['protections']]
                     protections = ", ".join(russian_protections)
                     equipment_text += f"**Защита:** {protections}"
             
@@ -714,304 +1277,6 @@ class RTanksBot(commands.Bot):
         
         return embed
     
-    def _translate_rank_to_russian(self, rank):
-        """Translate English rank names to Russian."""
-        rank_translations = {
-            # Basic ranks
-            'Recruit': 'Рекрут',
-            'Private': 'Рядовой',
-            'Gefreiter': 'Ефрейтор', 
-            'Corporal': 'Капрал',
-            'Master Corporal': 'Старший капрал',
-            'Sergeant': 'Сержант',
-            'Staff Sergeant': 'Штаб-сержант',
-            'Master Sergeant': 'Старший сержант',
-            'First Sergeant': 'Старшина',
-            'Sergeant Major': 'Старшина',
-            
-            # Warrant Officers (all levels)
-            'Warrant Officer': 'Прапорщик',
-            'Warrant Officer 1': 'Прапорщик 1',
-            'Warrant Officer 2': 'Прапорщик 2', 
-            'Warrant Officer 3': 'Прапорщик 3',
-            'Warrant Officer 4': 'Прапорщик 4',
-            'Warrant Officer 5': 'Прапорщик 5',
-            'Master Warrant Officer': 'Старший прапорщик',
-            
-            # Officer ranks
-            'Third Lieutenant': 'Младший лейтенант',
-            'Second Lieutenant': 'Лейтенант',
-            'First Lieutenant': 'Старший лейтенант',
-            'Lieutenant': 'Лейтенант',
-            'Captain': 'Капитан',
-            'Major': 'Майор',
-            'Lieutenant Colonel': 'Подполковник',
-            'Colonel': 'Полковник',
-            
-            # General ranks
-            'Brigadier': 'Бригадир',
-            'Brigadier General': 'Генерал-бригадир',
-            'Major General': 'Генерал-майор',
-            'Lieutenant General': 'Генерал-лейтенант',
-            'General': 'Генерал',
-            'General of the Army': 'Генерал армии',
-            
-            # Marshal ranks
-            'Marshal': 'Маршал',
-            'Field Marshal': 'Фельдмаршал',
-            'Air Marshal': 'Маршал авиации',
-            'Fleet Admiral': 'Адмирал флота',
-            
-            # Special ranks
-            'Commander': 'Командир',
-            'Commander in Chief': 'Главнокомандующий',
-            'Generalissimo': 'Генералиссимус',
-            'Supreme Commander': 'Верховный командующий'
-        }
-        
-        # Handle Legend ranks
-        if rank.startswith('Legend'):
-            if ' ' in rank:
-                level = rank.split(' ')[1]
-                return f"Легенда {level}"
-            else:
-                return "Легенда"
-        
-        return rank_translations.get(rank, rank)
-
-    def _translate_equipment_to_russian(self, equipment: str) -> str:
-        """Translate equipment names to Russian"""
-        equipment_translations = {
-            # Turrets
-            'Smoky M0': 'Смоки М0',
-            'Smoky M1': 'Смоки М1',
-            'Smoky M2': 'Смоки М2',
-            'Smoky M3': 'Смоки М3',
-            'Rail M0': 'Рельса М0',
-            'Rail M1': 'Рельса М1',
-            'Rail M2': 'Рельса М2',
-            'Rail M3': 'Рельса М3',
-            'Ricochet M0': 'Рикошет М0',
-            'Ricochet M1': 'Рикошет М1',
-            'Ricochet M2': 'Рикошет М2',
-            'Ricochet M3': 'Рикошет М3',
-            'Isida M0': 'Изида М0',
-            'Isida M1': 'Изида М1',
-            'Isida M2': 'Изида М2',
-            'Isida M3': 'Изида М3',
-            'Freeze M0': 'Фриз М0',
-            'Freeze M1': 'Фриз М1',
-            'Freeze M2': 'Фриз М2',
-            'Freeze M3': 'Фриз М3',
-            'Flamethrower M0': 'Огнемёт М0',
-            'Flamethrower M1': 'Огнемёт М1',
-            'Flamethrower M2': 'Огнемёт М2',
-            'Flamethrower M3': 'Огнемёт М3',
-            'Thunder M0': 'Гром М0',
-            'Thunder M1': 'Гром М1',
-            'Thunder M2': 'Гром М2',
-            'Thunder M3': 'Гром М3',
-            'Hammer M0': 'Молот М0',
-            'Hammer M1': 'Молот М1',
-            'Hammer M2': 'Молот М2',
-            'Hammer M3': 'Молот М3',
-            'Vulcan M0': 'Вулкан М0',
-            'Vulcan M1': 'Вулкан М1',
-            'Vulcan M2': 'Вулкан М2',
-            'Vulcan M3': 'Вулкан М3',
-            'Twins M0': 'Близнецы М0',
-            'Twins M1': 'Близнецы М1',
-            'Twins M2': 'Близнецы М2',
-            'Twins M3': 'Близнецы М3',
-            'Shaft M0': 'Шафт М0',
-            'Shaft M1': 'Шафт М1',
-            'Shaft M2': 'Шафт М2',
-            'Shaft M3': 'Шафт М3',
-            'Striker M0': 'Страйкер М0',
-            'Striker M1': 'Страйкер М1',
-            'Striker M2': 'Страйкер М2',
-            'Striker M3': 'Страйкер М3',
-            
-            # Hulls
-            'Hunter M0': 'Охотник М0',
-            'Hunter M1': 'Охотник М1',
-            'Hunter M2': 'Охотник М2',
-            'Hunter M3': 'Охотник М3',
-            'Mammoth M0': 'Мамонт М0',
-            'Mammoth M1': 'Мамонт М1',
-            'Mammoth M2': 'Мамонт М2',
-            'Mammoth M3': 'Мамонт М3',
-            'Titan M0': 'Титан М0',
-            'Titan M1': 'Титан М1',
-            'Titan M2': 'Титан М2',
-            'Titan M3': 'Титан М3',
-            'Wasp M0': 'Оса М0',
-            'Wasp M1': 'Оса М1',
-            'Wasp M2': 'Оса М2',
-            'Wasp M3': 'Оса М3',
-            'Viking M0': 'Викинг М0',
-            'Viking M1': 'Викинг М1',
-            'Viking M2': 'Викинг М2',
-            'Viking M3': 'Викинг М3',
-            'Hornet M0': 'Хорнет М0',
-            'Hornet M1': 'Хорнет М1',
-            'Hornet M2': 'Хорнет М2',
-            'Hornet M3': 'Хорнет М3',
-            'Dictator M0': 'Диктатор М0',
-            'Dictator M1': 'Диктатор М1',
-            'Dictator M2': 'Диктатор М2',
-            'Dictator M3': 'Диктатор М3',
-            
-            # Protections
-            'Smoky Protection M0': 'Защита от Смоки М0',
-            'Smoky Protection M1': 'Защита от Смоки М1',
-            'Smoky Protection M2': 'Защита от Смоки М2',
-            'Smoky Protection M3': 'Защита от Смоки М3',
-            'Rail Protection M0': 'Защита от Рельса М0',
-            'Rail Protection M1': 'Защита от Рельса М1',
-            'Rail Protection M2': 'Защита от Рельса М2',
-            'Rail Protection M3': 'Защита от Рельса М3',
-            'Ricochet Protection M0': 'Защита от Рикошета М0',
-            'Ricochet Protection M1': 'Защита от Рикошета М1',
-            'Ricochet Protection M2': 'Защита от Рикошета М2',
-            'Ricochet Protection M3': 'Защита от Рикошета М3',
-            'Isida Protection M0': 'Защита от Изиды М0',
-            'Isida Protection M1': 'Защита от Изиды М1',
-            'Isida Protection M2': 'Защита от Изиды М2',
-            'Isida Protection M3': 'Защита от Изиды М3',
-            'Freeze Protection M0': 'Защита от Фриза М0',
-            'Freeze Protection M1': 'Защита от Фриза М1',
-            'Freeze Protection M2': 'Защита от Фриза М2',
-            'Freeze Protection M3': 'Защита от Фриза М3',
-            'Flamethrower Protection M0': 'Защита от Огнемета М0',
-            'Flamethrower Protection M1': 'Защита от Огнемета М1',
-            'Flamethrower Protection M2': 'Защита от Огнемета М2',
-            'Flamethrower Protection M3': 'Защита от Огнемета М3',
-            'Thunder Protection M0': 'Защита от Грома М0',
-            'Thunder Protection M1': 'Защита от Грома М1',
-            'Thunder Protection M2': 'Защита от Грома М2',
-            'Thunder Protection M3': 'Защита от Грома М3',
-            'Hammer Protection M0': 'Защита от Молота М0',
-            'Hammer Protection M1': 'Защита от Молота М1',
-            'Hammer Protection M2': 'Защита от Молота М2',
-            'Hammer Protection M3': 'Защита от Молота М3',
-            'Vulcan Protection M0': 'Защита от Вулкана М0',
-            'Vulcan Protection M1': 'Защита от Вулкана М1',
-            'Vulcan Protection M2': 'Защита от Вулкана М2',
-            'Vulcan Protection M3': 'Защита от Вулкана М3',
-            'Twins Protection M0': 'Защита от Твинса М0',
-            'Twins Protection M1': 'Защита от Твинса М1',
-            'Twins Protection M2': 'Защита от Твинса М2',
-            'Twins Protection M3': 'Защита от Твинса М3',
-            'Shaft Protection M0': 'Защита от Шафта М0',
-            'Shaft Protection M1': 'Защита от Шафта М1',
-            'Shaft Protection M2': 'Защита от Шафта М2',
-            'Shaft Protection M3': 'Защита от Шафта М3',
-            'Striker Protection M0': 'Защита от Страйкера М0',
-            'Striker Protection M1': 'Защита от Страйкера М1',
-            'Striker Protection M2': 'Защита от Страйкера М2',
-            'Striker Protection M3': 'Защита от Страйкера М3',
-            
-            # Resistances (actual website format)
-            'Badger M0': 'Барсук М0',
-            'Badger M1': 'Барсук М1', 
-            'Badger M2': 'Барсук М2',
-            'Badger M3': 'Барсук М3',
-            'Spider M0': 'Паук М0',
-            'Spider M1': 'Паук М1',
-            'Spider M2': 'Паук М2', 
-            'Spider M3': 'Паук М3',
-            'Falcon M0': 'Сокол М0',
-            'Falcon M1': 'Сокол М1',
-            'Falcon M2': 'Сокол М2',
-            'Falcon M3': 'Сокол М3',
-            'Bear M0': 'Медведь М0',
-            'Bear M1': 'Медведь М1',
-            'Bear M2': 'Медведь М2',
-            'Bear M3': 'Медведь М3',
-            'Wolf M0': 'Волк М0',
-            'Wolf M1': 'Волк М1',
-            'Wolf M2': 'Волк М2',
-            'Wolf M3': 'Волк М3',
-            'Eagle M0': 'Орёл М0',
-            'Eagle M1': 'Орёл М1',
-            'Eagle M2': 'Орёл М2',
-            'Eagle M3': 'Орёл М3',
-            'Tiger M0': 'Тигр М0',
-            'Tiger M1': 'Тигр М1',
-            'Tiger M2': 'Тигр М2',
-            'Tiger M3': 'Тигр М3',
-            'Shark M0': 'Акула М0',
-            'Shark M1': 'Акула М1',
-            'Shark M2': 'Акула М2',
-            'Shark M3': 'Акула М3',
-            'Lion M0': 'Лев М0',
-            'Lion M1': 'Лев М1',
-            'Lion M2': 'Лев М2',
-            'Lion M3': 'Лев М3',
-            'Snake M0': 'Змея М0',
-            'Snake M1': 'Змея М1',
-            'Snake M2': 'Змея М2',
-            'Snake M3': 'Змея М3',
-            'Hawk M0': 'Ястреб М0',
-            'Hawk M1': 'Ястреб М1',
-            'Hawk M2': 'Ястреб М2',
-            'Hawk M3': 'Ястреб М3',
-            'Panther M0': 'Пантера М0',
-            'Panther M1': 'Пантера М1',
-            'Panther M2': 'Пантера М2',
-            'Panther M3': 'Пантера М3',
-            'Dolphin M0': 'Дельфин М0',
-            'Dolphin M1': 'Дельфин М1',
-            'Dolphin M2': 'Дельфин М2',
-            'Dolphin M3': 'Дельфин М3',
-            'Ocelot M0': 'Оцелот М0',
-            'Ocelot M1': 'Оцелот М1',
-            'Ocelot M2': 'Оцелот М2',
-            'Ocelot M3': 'Оцелот М3',
-            'Leopard M0': 'Леопард М0',
-            'Leopard M1': 'Леопард М1',
-            'Leopard M2': 'Леопард М2',
-            'Leopard M3': 'Леопард М3',
-            'Rhino M0': 'Носорог М0',
-            'Rhino M1': 'Носорог М1',
-            'Rhino M2': 'Носорог М2',
-            'Rhino M3': 'Носорог М3',
-            'Gorilla M0': 'Горилла М0',
-            'Gorilla M1': 'Горилла М1',
-            'Gorilla M2': 'Горилла М2',
-            'Gorilla M3': 'Горилла М3',
-            'Cheetah M0': 'Гепард М0',
-            'Cheetah M1': 'Гепард М1',
-            'Cheetah M2': 'Гепард М2',
-            'Cheetah M3': 'Гепард М3'
-        }
-        return equipment_translations.get(equipment, equipment)
-
-    def _translate_group_to_russian(self, group: str) -> str:
-        """Translate group names to Russian for any player"""
-        if not group or group in ['Unknown', 'No Group', None]:
-            return 'Нет группы'
-        
-        group_translations = {
-            'Player': 'Игрок',
-            'Premium': 'Премиум',
-            'Moderator': 'Модератор',
-            'Administrator': 'Администратор',
-            'Developer': 'Разработчик',
-            'Tester': 'Тестер',
-            'VIP': 'ВИП',
-            'Streamer': 'Стример',
-            'Content Creator': 'Создатель контента',
-            'Beta Tester': 'Бета-тестер',
-            'Volunteer': 'Волонтёр',
-            'Helper': 'Помощник',
-            'Supporter': 'Поддержка',
-            'Veteran': 'Ветеран',
-            'Elite': 'Элита'
-        }
-        return group_translations.get(group, group)
-
     async def _create_comparison_embed(self, player1_data, player2_data):
         """Create a formatted embed for player comparison."""
         p1_name = player1_data['username']
@@ -1084,7 +1349,17 @@ class RTanksBot(commands.Bot):
             inline=True
         )
         
-
+        # Equipment comparison (M3 count, then highest M level, then overall score)
+        equipment_result = compare_equipment_quality(player1_data['equipment'], player2_data['equipment'])
+        if equipment_result['winner'] == 'tie':
+            equipment_winner = "**Tie**"
+        else:
+            equipment_winner = f"**{p1_name if equipment_result['winner'] == 'player1' else p2_name}**"
+        embed.add_field(
+            name="🛠️ Equipment",
+            value=f"{equipment_winner}\n{equipment_result['reason']}",
+            inline=False
+        )
         
         # Add player details section
         p1_details = (
@@ -1120,19 +1395,21 @@ class RTanksBot(commands.Bot):
         
         return embed
 
-    async def _check_website_status(self):
-        """Check if the RTanks website is accessible."""
-        try:
-            start_time = time.time()
-            timeout = aiohttp.ClientTimeout(total=10)
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get('https://ratings.ranked-rtanks.online/') as response:
-                    response_time = round((time.time() - start_time) * 1000, 2)
-                    if response.status == 200:
-                        return f"🟢 Online ({response_time}ms)"
-                    else:
-                        return f"🟡 Partial ({response.status})"
-        except Exception:
+    def _format_website_status(self):
+        """Describe RTanks website health from the latest background probe."""
+        if registry.gauge('upstream_checked_at') is None:
+            return "⚪ Not checked yet"
+        status = registry.gauge('upstream_status')
+        upstream_series = registry.series('upstream_ms')
+        trend = sparkline(upstream_series.values(), SPARKLINE_WIDTH)
+        breaker = self.scraper.breaker
+        if breaker.state != CLOSED:
+            return f"🔴 Circuit {breaker.state} (retry in {format_duration(breaker.retry_after)})"
+        if status == 200:
+            return f"🟢 Online ({upstream_series.last(0)}ms) `{trend}`"
+        elif status is not None:
+            return f"🟡 Partial ({status})"
+        else:
             return "🔴 Offline"
 
     async def on_command_error(self, ctx, error):
@@ -1145,14 +1422,36 @@ class RTanksBot(commands.Bot):
         await self.wait_until_ready()
         while not self.is_closed():
             try:
-                count = await self.scraper.get_online_players_count()
+                # One process fetches the count, the other shard processes reuse it
+                store = self.shared_store
+                count = await store.run(store.get_value, 'online_players', ONLINE_COUNT_TTL) if store else None
+                if count is None:
+                    count = await self.scraper.get_online_players_count()
+                    if store:
+                        await store.run(store.set_value, 'online_players', count)
                 activity = discord.Activity(type=discord.ActivityType.watching, name=f"{count} players online")
-                await self.change_presence(activity=activity)
+                for shard_id, shard in self.shards.items():
+                    if not shard.is_closed():
+                        await self.change_presence(activity=activity, shard_id=shard_id)
+            except CircuitOpenError:
+                logger.debug("Skipping online count update while the website circuit is open")
             except Exception as e:
                 logger.warning(f"Failed to update online player count: {e}")
             await asyncio.sleep(30)
 
     async def close(self):
         """Clean up when bot is closing."""
+        await self.resource_sampler.stop()
+        await self.loop_monitor.stop()
+        await self.refresh_ahead.stop()
+        try:
+            saved = save_hot_set(self.popularity)
+            logger.info(f"Saved {saved} hot player(s) for the next start")
+        except OSError as e:
+            logger.warning(f"Could not save hot players: {e}")
         await self.scraper.close()
         await super().close()
+        if self._store_writes:
+            await asyncio.gather(*self._store_writes, return_exceptions=True)
+        if self.shared_store is not None:
+            self.shared_store.close()
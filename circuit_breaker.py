@@ -0,0 +1,147 @@
+"""
+Circuit breaker for the RTanks ratings website.
+Stops sending requests while the site is failing or very slow, so commands can fail fast.
+"""
+
+from collections import deque
+import logging
+import time
+
+from config import (
+    CIRCUIT_WINDOW, CIRCUIT_MIN_CALLS, CIRCUIT_ERROR_RATE, CIRCUIT_SLOW_CALL_MS,
+    CIRCUIT_SLOW_RATE, CIRCUIT_OPEN_SECONDS, CIRCUIT_HALF_OPEN_PROBES,
+)
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of making a request while the circuit is open."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"circuit open, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class CircuitCall:
+    """One admitted request; report its outcome exactly once."""
+
+    __slots__ = ('_breaker', '_probe', '_done')
+
+    def __init__(self, breaker, probe):
+        self._breaker = breaker
+        self._probe = probe
+        self._done = False
+
+    def success(self, elapsed_ms):
+        self._finish(True, elapsed_ms >= self._breaker.slow_call_ms)
+
+    def failure(self):
+        self._finish(False, False)
+
+    def cancel(self):
+        """The call was abandoned before an outcome was known (e.g. task cancelled)."""
+        if not self._done:
+            self._done = True
+            self._breaker._release_probe(self._probe)
+
+    def _finish(self, ok, slow):
+        if self._done:
+            return
+        self._done = True
+        self._breaker._record(ok, slow, self._probe)
+
+
+class CircuitBreaker:
+    """
+    Closed: requests flow and outcomes are tracked over a sliding window.
+    Open: requests are rejected with CircuitOpenError until ``open_seconds`` pass.
+    Half-open: a few probes go through; a success closes the circuit, a failure reopens it.
+    """
+
+    def __init__(self, name, window=CIRCUIT_WINDOW, min_calls=CIRCUIT_MIN_CALLS,
+                 error_rate=CIRCUIT_ERROR_RATE, slow_call_ms=CIRCUIT_SLOW_CALL_MS,
+                 slow_rate=CIRCUIT_SLOW_RATE, open_seconds=CIRCUIT_OPEN_SECONDS,
+                 half_open_probes=CIRCUIT_HALF_OPEN_PROBES):
+        self.name = name
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.slow_call_ms = slow_call_ms
+        self.slow_rate = slow_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self._outcomes = deque(maxlen=window)  # (ok, slow) per call
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+
+    @property
+    def state(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._set_state(HALF_OPEN)
+        return self._state
+
+    @property
+    def retry_after(self):
+        if self._state != OPEN:
+            return 0.0
+        return max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+
+    def check(self):
+        """Raise CircuitOpenError if a request would be rejected right now."""
+        state = self.state
+        if state == OPEN or (state == HALF_OPEN and self._probes_in_flight >= self.half_open_probes):
+            registry.incr(f'{self.name}_circuit_rejected')
+            raise CircuitOpenError(self.retry_after or self.open_seconds)
+
+    def begin(self):
+        """Admit one request and return its CircuitCall, or raise CircuitOpenError."""
+        self.check()
+        probe = self._state == HALF_OPEN
+        if probe:
+            self._probes_in_flight += 1
+        return CircuitCall(self, probe)
+
+    def _release_probe(self, probe):
+        if probe:
+            self._probes_in_flight -= 1
+
+    def _record(self, ok, slow, probe):
+        self._release_probe(probe)
+        if self._state == HALF_OPEN:
+            if ok and not slow:
+                self._outcomes.clear()
+                self._set_state(CLOSED)
+            else:
+                self._open()
+            return
+        if self._state == OPEN:
+            # A request admitted before the circuit opened finished late
+            return
+
+        self._outcomes.append((ok, slow))
+        calls = len(self._outcomes)
+        if calls < self.min_calls:
+            return
+        failures = sum(1 for call_ok, _ in self._outcomes if not call_ok)
+        slow_calls = sum(1 for _, call_slow in self._outcomes if call_slow)
+        if failures / calls >= self.error_rate or slow_calls / calls >= self.slow_rate:
+            logger.warning(f"Opening {self.name} circuit: {failures}/{calls} failed, {slow_calls}/{calls} slow")
+            self._open()
+
+    def _open(self):
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        registry.incr(f'{self.name}_circuit_opened')
+        self._set_state(OPEN)
+
+    def _set_state(self, state):
+        if state != self._state:
+            logger.info(f"{self.name} circuit {self._state} -> {state}")
+            self._state = state
+        registry.set_gauge(f'{self.name}_circuit_state', state)
@@ -0,0 +1,63 @@
+"""
+Command tree sync fingerprinting for the RTanks Discord Bot.
+The global command sync only runs when the registered command schema has changed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+
+from config import COMMAND_SYNC_STATE_FILE
+
+logger = logging.getLogger(__name__)
+
+
+def command_fingerprint(tree):
+    """Stable hash of every global command's payload as Discord would receive it."""
+    payload = sorted((command.to_dict(tree) for command in tree.get_commands()), key=lambda item: (item.get('type', 1), item['name']))
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _load_state(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except ValueError as e:
+        logger.warning(f"Ignoring unreadable command sync state {path}: {e}")
+        return {}
+
+
+def last_synced_fingerprint(application_id, path=COMMAND_SYNC_STATE_FILE):
+    return _load_state(path).get(str(application_id))
+
+
+def record_synced_fingerprint(application_id, fingerprint, path=COMMAND_SYNC_STATE_FILE):
+    # Keyed by application so switching tokens (e.g. a test bot) still triggers a sync
+    state = _load_state(path)
+    state[str(application_id)] = fingerprint
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(temp_path, path)
+
+
+async def sync_if_changed(tree, application_id, force=False, path=COMMAND_SYNC_STATE_FILE):
+    """
+    Sync the global command tree unless its fingerprint matches the last successful sync.
+    Returns True if a sync was performed.
+    """
+    fingerprint = command_fingerprint(tree)
+    if not force and last_synced_fingerprint(application_id, path) == fingerprint:
+        logger.info(f"Command schema unchanged ({fingerprint[:12]}), skipping sync")
+        return False
+    synced = await tree.sync()
+    logger.info(f"Synced {len(synced)} command(s) ({fingerprint[:12]})")
+    try:
+        record_synced_fingerprint(application_id, fingerprint, path)
+    except OSError as e:
+        logger.warning(f"Could not save command sync state: {e}")
+    return True
@@ -56,6 +56,148 @@ WARNING_EMBED_COLOR = 0xffa500  # Orange
 REQUEST_DELAY_MIN = 0.5  # minimum delay between requests (seconds)
 REQUEST_DELAY_MAX = 1.5  # maximum delay between requests (seconds)
 
+# Scheduling of website work
+SCHEDULER_MAX_CONCURRENCY = 4    # website jobs running at once across all classes
+SCHEDULER_CLASS_LIMITS = {       # per-class concurrency caps
+    'interactive': 4,
+    'background': 1,
+}
+SCHEDULER_AGING_SECONDS = 10     # background jobs waiting this long compete with interactive ones
+
+# Fair queuing of command lookups
+FAIR_QUEUE_CONCURRENCY = 4       # lookups admitted at once across all guilds
+FAIR_QUEUE_QUANTUM = 1           # deficit round-robin credit per guild per round
+FAIR_QUEUE_MAX_DEPTH = 40        # waiting lookups beyond which new ones are shed
+USER_RATE = 0.2                  # lookups per second refilled into each user's bucket
+USER_BURST = 5                   # lookups a user can make back to back
+USER_BUCKETS_MAX = 10000         # users tracked before the least recent are forgotten
+
+# Popularity tracking and refresh-ahead
+POPULARITY_HALF_LIFE = 30 * 60   # seconds for a player's request score to halve
+POPULARITY_MAX_TRACKED = 20000   # players tracked before the coldest are forgotten
+HOT_PLAYER_SCORE = 3.0           # decayed request score that makes a player hot
+HOT_PLAYER_LIMIT = 50            # hot players kept warm at most
+REFRESH_AHEAD_MARGIN = 10        # seconds before expiry a hot entry is refreshed
+REFRESH_AHEAD_INTERVAL = 5       # seconds between refresh-ahead passes
+REFRESH_BUDGET_SHARE = 0.25      # share of the upstream request rate refreshes may use
+
+# Startup cache pre-warm
+HOT_SET_FILE = 'hot_players.json'  # most requested players, saved at shutdown for the next start
+HOT_SET_SIZE = 100               # players saved and pre-warmed from the previous session
+PREWARM_TOP_N = 0                # also pre-warm this many players from the ratings page (0 = off)
+PREWARM_CONCURRENCY = 2          # pre-warm fetches in flight at once
+
+# Deadlines
+COMMAND_DEADLINE = 30            # seconds a command may spend fetching data (was the fixed session timeout)
+INTERACTION_TOKEN_TTL = 15 * 60  # Discord interaction tokens expire after 15 minutes
+SCRAPE_CONNECT_TIMEOUT = 10      # cap on the connect phase of one request
+SCRAPE_READ_TIMEOUT = 15         # cap on waiting for a single socket read
+PARSE_RESERVE = 2                # seconds of the budget kept back for parsing
+
+# Hedged profile requests
+HEDGE_ENABLED = False            # race a second request against slow interactive profile fetches
+HEDGE_PERCENTILE = 95            # hedge once the time-to-headers passes this percentile
+HEDGE_MIN_SAMPLES = 20           # latency samples needed before hedging starts
+HEDGE_MIN_DELAY = 0.5            # never hedge earlier than this (seconds)
+HEDGE_LATENCY_SAMPLES = 200      # recent time-to-headers samples kept
+
+# Startup
+STARTUP_TARGET_SECONDS = 2.0     # time-to-ready above this is logged as a warning
+LOGIN_BACKOFF_BASE = 5           # first wait after a rate-limited login (seconds)
+LOGIN_BACKOFF_MAX = 300          # longest wait between login attempts
+LOGIN_MAX_ATTEMPTS = 5
+
+# Command sync
+COMMAND_SYNC_STATE_FILE = 'command_sync.json'  # fingerprint of the last synced command schema
+
+# Sharding and the cross-process shared store
+SHARED_STORE_PATH = None         # SQLite file shared by all shard processes on a host (e.g. 'shared_store.sqlite3'); None keeps state in-process
+SHARED_STORE_RETENTION = 24 * 60 * 60       # seconds before stored snapshots are deleted
+LOOKUP_LEASE_TTL = 30            # seconds a process may hold the scrape lease for one player
+LOOKUP_LEASE_POLL = 0.25         # how often waiting processes check for the leaseholder's result
+ONLINE_COUNT_TTL = 25            # seconds a shared online player count is reused
+
+# Scraper worker processes (scraper_worker.py)
+SCRAPER_RPC_MAX_FRAME = 4 * 1024 * 1024  # largest RPC message accepted (bytes)
+SCRAPER_RPC_CONNECT_TIMEOUT = 5  # seconds to wait when connecting to a worker socket
+SCRAPER_RPC_RETRY_MIN = 0.5      # first wait before reconnecting to an unreachable worker (seconds)
+SCRAPER_RPC_RETRY_MAX = 30       # longest wait between reconnect attempts
+SCRAPER_SOCKET_MODE = 0o660      # permissions of the worker socket file
+
+# Raw profile page archive (page_archive.py)
+PAGE_ARCHIVE_PATH = None         # SQLite file for fetched profile pages; None disables archiving
+ARCHIVE_DICT_SAMPLES = 50        # pages archived before the shared compression dictionary is trained
+ARCHIVE_DICT_SIZE = 32 * 1024    # dictionary size (zlib uses at most 32 KiB)
+ARCHIVE_REPARSE_BATCH = 200      # captures per re-parse task
+
+# Player snapshot cache
+PLAYER_CACHE_SIZE = 5000         # players kept in memory (LRU)
+PLAYER_CACHE_TTL = 60            # seconds a snapshot is served to /player without re-scraping
+RENDER_CACHE_SIZE = 2000         # rendered embed payloads kept (LRU)
+
+# Stateless equipment buttons: eq:<language>:<expanded>:<issued unix time>:<user id>:<username>
+EQUIPMENT_BUTTON_TEMPLATE = r'eq:(?P<language>en|ru):(?P<expanded>[01]):(?P<issued>\d+):(?P<user_id>\d+):(?P<username>.+)'
+EQUIPMENT_BUTTON_TTL = 24 * 60 * 60  # seconds a button stays usable
+
+# /top leaderboard, served from players seen in lookups and the shared store
+LEADERBOARD_PAGE_SIZE = 10       # players per /top page
+# Stateless page buttons: top:<category>:<target page>:<p(rev) or n(ext)>
+TOP_BUTTON_TEMPLATE = r'top:(?P<category>[a-z_]+):(?P<page>\d+):(?P<direction>[pn])'
+
+# Parsing
+PARSE_WORKERS = 2                # threads used to parse profile pages off the event loop
+
+# Circuit breaker around the ratings website
+CIRCUIT_WINDOW = 20              # most recent calls considered
+CIRCUIT_MIN_CALLS = 5            # calls needed in the window before the breaker can trip
+CIRCUIT_ERROR_RATE = 0.5         # failure share that opens the circuit
+CIRCUIT_SLOW_CALL_MS = 10000     # time to response headers above which a call counts as slow
+CIRCUIT_SLOW_RATE = 0.8          # slow share that opens the circuit
+CIRCUIT_OPEN_SECONDS = 30        # how long to fail fast before letting a probe through
+CIRCUIT_HALF_OPEN_PROBES = 1     # concurrent probes allowed while half-open
+
+# Streaming profile download
+PROFILE_ENCODING = 'utf-8'       # encoding of profile pages when the response does not declare one
+PROFILE_CHUNK_SIZE = 16 * 1024   # bytes read per chunk
+# Each group needs one marker seen before the download may stop early.
+# Markers are case-sensitive regular expressions; a bare word like "Hit" would also match "White".
+PROFILE_REQUIRED_MARKERS = {
+    'kills': ('Уничтожил', 'Destroyed', '"destroyed"'),
+    'deaths': (r'\bHit\s{0,16}\d', 'Подбит', 'Падение', '"deaths"'),
+    'gold_boxes': ('золотых ящиков', '[Gg]old boxes'),
+    # Resistance modules are the last section the parser reads
+    'protections': (r'resistances/\w+/m\d/preview\.png',),
+}
+PROFILE_TAIL_BYTES = 8 * 1024    # read this much past the last marker, for the rest of the resistance block
+PROFILE_MARKER_OVERLAP = 128     # characters kept between chunks; must exceed the longest marker match
+
+# Resource sampling for /botstats
+RESOURCE_SAMPLE_INTERVAL = 15   # seconds between process samples
+UPSTREAM_HEALTH_INTERVAL = 60   # seconds between website health probes
+SPARKLINE_WIDTH = 20            # number of samples shown in trend sparklines
+
+# Event loop lag monitoring
+LOOP_LAG_INTERVAL = 0.25         # seconds between loop ticks
+LOOP_LAG_THRESHOLD = 0.5         # lag (seconds) that counts as a stall and triggers a stack capture
+LOOP_LAG_LOG_COOLDOWN = 30       # minimum seconds between logged stall stacks
+
+# On-demand profiling (/profile)
+PROFILE_MAX_SECONDS = 120        # longest profiling window allowed
+PROFILE_SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+
+# Memory introspection (/memory)
+TRACEMALLOC_FRAMES = 1           # traceback depth recorded per allocation
+MEMORY_CENSUS_TYPES = ['View', 'CacheEntry', 'PlayerSnapshot', 'ClientResponse', 'LogRecord']
+
+# Logging pipeline
+LOG_FILE = 'bot.log'
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+LOG_MAX_BYTES = 5 * 1024 * 1024  # rotate bot.log at 5 MB
+LOG_BACKUP_COUNT = 3
+LOG_QUEUE_SIZE = 10000           # records buffered before new ones are dropped
+LOG_SAMPLE_WINDOW = 60           # seconds per sampling window
+LOG_SAMPLE_BURST = 20            # max INFO/DEBUG records per message template per window
+
 # Equipment lists for parsing
 TURRET_NAMES = [
     'Smoky', 'Rail', 'Hunter', 'Wasp', 'Dictator', 'Thunder', 'Freeze', 
@@ -68,6 +210,49 @@ HULL_NAMES = [
     'Mammoth', 'Smoky', 'Crusader'
 ]
 
+# Russian equipment names as they appear on the website, mapped to English
+TURRET_RUSSIAN_NAMES = {
+    'Смоки': 'Smoky', 'Рельса': 'Rail', 'Рикошет': 'Ricochet',
+    'Изида': 'Isida', 'Фриз': 'Freeze', 'Огнемет': 'Flamethrower',
+    'Гром': 'Thunder', 'Молот': 'Hammer', 'Вулкан': 'Vulcan',
+    'Твинс': 'Twins', 'Шафт': 'Shaft', 'Страйкер': 'Striker'
+}
+
+HULL_RUSSIAN_NAMES = {
+    'Хантер': 'Hunter', 'Мамонт': 'Mammoth', 'Титан': 'Titan',
+    'Васп': 'Wasp', 'Викинг': 'Viking', 'Хорнет': 'Hornet',
+    'Диктатор': 'Dictator'
+}
+
+# Resistance modules use animal names in their image paths (resistances/<name>/m<level>/preview.png)
+PROTECTION_NAMES = {
+    'badger': 'Badger',
+    'spider': 'Spider',
+    'falcon': 'Falcon',
+    'bear': 'Bear',
+    'wolf': 'Wolf',
+    'fox': 'Fox',
+    'eagle': 'Eagle',
+    'tiger': 'Tiger',
+    'shark': 'Shark',
+    'lion': 'Lion',
+    'snake': 'Snake',
+    'hawk': 'Hawk',
+    'panther': 'Panther',
+    'dolphin': 'Dolphin',
+    'ocelot': 'Ocelot',
+    'leopard': 'Leopard',
+    'rhino': 'Rhino',
+    'gorilla': 'Gorilla',
+    'grizzly': 'Grizzly',
+    'orca': 'Orca',
+    'cheetah': 'Cheetah',
+    'spectr_b': 'Spectr B',
+    'spectr_d': 'Spectr D',
+    'spectr_l': 'Spectr L',
+    'spectr_e': 'Spectr E'
+}
+
 # Known rank names for parsing
 RANK_NAMES = [
     'Recruit', 'Private', 'Gefreiter', 'Corporal', 'Master Corporal',
@@ -0,0 +1,75 @@
+"""
+Request deadlines for the RTanks Discord Bot.
+A Deadline travels from the slash-command handler through the scraper so abandoned work can be dropped.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+import time
+
+import aiohttp
+
+from config import (
+    COMMAND_DEADLINE, INTERACTION_TOKEN_TTL, SCRAPE_CONNECT_TIMEOUT,
+    SCRAPE_READ_TIMEOUT, PARSE_RESERVE,
+)
+
+
+class DeadlineExceeded(Exception):
+    """Raised when work is started or still running after its deadline."""
+
+
+class Deadline:
+    """An absolute point in time (event-loop independent, monotonic clock)."""
+
+    __slots__ = ('expires_at',)
+
+    def __init__(self, seconds):
+        self.expires_at = time.monotonic() + seconds
+
+    @classmethod
+    def for_interaction(cls, interaction, budget=COMMAND_DEADLINE):
+        """Deadline for a command: its budget, capped by when the interaction token expires."""
+        token_left = INTERACTION_TOKEN_TTL - (datetime.now(timezone.utc) - interaction.created_at).total_seconds()
+        return cls(min(budget, token_left))
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self):
+        return time.monotonic() >= self.expires_at
+
+    def check(self, what='request', reserve=0):
+        """Raise DeadlineExceeded unless more than ``reserve`` seconds are left."""
+        if self.remaining() <= reserve:
+            raise DeadlineExceeded(f"deadline passed before {what}")
+
+    def check_fetch(self, what='request'):
+        """Like check(), but also fails when only the parse reserve is left."""
+        self.check(what, PARSE_RESERVE)
+
+    def client_timeout(self, reserve=PARSE_RESERVE):
+        """
+        Per-phase aiohttp timeouts from the remaining budget, keeping ``reserve`` seconds
+        for parsing. Connect and per-read waits are capped so one slow phase cannot use it all.
+        """
+        budget = max(0.1, self.remaining() - reserve)
+        return aiohttp.ClientTimeout(
+            total=budget,
+            connect=min(budget, SCRAPE_CONNECT_TIMEOUT),
+            sock_read=min(budget, SCRAPE_READ_TIMEOUT),
+        )
+
+    async def wait_for(self, awaitable, what='request'):
+        """Await ``awaitable``, cancelling it and raising DeadlineExceeded when time runs out."""
+        if self.expired:
+            if asyncio.iscoroutine(awaitable):
+                awaitable.close()
+            raise DeadlineExceeded(f"deadline passed before {what}")
+        try:
+            return await asyncio.wait_for(awaitable, self.remaining())
+        except asyncio.TimeoutError:
+            if self.expired:
+                raise DeadlineExceeded(f"deadline passed during {what}") from None
+            raise
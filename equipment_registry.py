@@ -0,0 +1,58 @@
+"""
+Equipment registry for the RTanks Discord Bot.
+Gives every turret, hull and protection a small integer id; mod levels are stored separately.
+"""
+
+from config import TURRET_NAMES, HULL_NAMES, TURRET_RUSSIAN_NAMES, HULL_RUSSIAN_NAMES, PROTECTION_NAMES
+
+TURRET = 'turrets'
+HULL = 'hulls'
+PROTECTION = 'protections'
+
+
+class EquipmentRegistry:
+    """Bidirectional base name <-> id mapping, with the category each id belongs to."""
+
+    def __init__(self):
+        self._names = []
+        self._categories = []
+        self._ids = {}
+
+    def register(self, name, category=None):
+        """Return the id for ``name``, registering it if it is new."""
+        existing = self._ids.get(name)
+        if existing is not None:
+            return existing
+        item = len(self._names)
+        self._ids[name] = item
+        self._names.append(name)
+        self._categories.append(category)
+        return item
+
+    def id(self, name):
+        return self._ids.get(name)
+
+    def name(self, item):
+        return self._names[item]
+
+    def category(self, item):
+        return self._categories[item]
+
+    def __len__(self):
+        return len(self._names)
+
+
+def build_registry():
+    """Register every known name up front so ids are stable across processes."""
+    registry = EquipmentRegistry()
+    # Names shared by a turret and a hull (Wasp, Hunter, ...) keep a single id
+    for name in list(TURRET_NAMES) + sorted(set(TURRET_RUSSIAN_NAMES.values()) - set(TURRET_NAMES)):
+        registry.register(name, TURRET)
+    for name in list(HULL_NAMES) + sorted(set(HULL_RUSSIAN_NAMES.values()) - set(HULL_NAMES)):
+        registry.register(name, HULL)
+    for name in PROTECTION_NAMES.values():
+        registry.register(name, PROTECTION)
+    return registry
+
+
+equipment_registry = build_registry()
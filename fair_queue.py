@@ -0,0 +1,185 @@
+"""
+Fair admission of command lookups for the RTanks Discord Bot.
+Deficit round-robin across guilds, token buckets per user, and load shedding when the queue is deep.
+"""
+
+from collections import OrderedDict, deque
+import asyncio
+import contextlib
+import time
+
+from config import (
+    FAIR_QUEUE_CONCURRENCY, FAIR_QUEUE_QUANTUM, FAIR_QUEUE_MAX_DEPTH,
+    USER_RATE, USER_BURST, USER_BUCKETS_MAX,
+)
+from metrics import registry
+
+
+class Overloaded(Exception):
+    """Raised when a lookup is shed because too much work is already queued."""
+
+    def __init__(self, message="too many lookups queued", retry_after=0.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimited(Overloaded):
+    """Raised when a user has used up their lookup budget."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"user rate limited, retry in {retry_after:.0f}s", retry_after)
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at ``rate`` tokens per second."""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated_at')
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def take(self, amount=1):
+        """Take ``amount`` tokens if available; returns False otherwise."""
+        self._refill()
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return True
+        return False
+
+    def retry_after(self, amount=1):
+        self._refill()
+        return max(0.0, (amount - self.tokens) / self.rate)
+
+
+class FairQueue:
+    """
+    Admission control for lookups that need the website.
+    Each guild (or DM user) has its own queue; queues are served by deficit round-robin,
+    so a busy guild gets its share of capacity but cannot take the rest.
+    """
+
+    def __init__(self, concurrency=FAIR_QUEUE_CONCURRENCY, quantum=FAIR_QUEUE_QUANTUM,
+                 max_depth=FAIR_QUEUE_MAX_DEPTH, user_rate=USER_RATE, user_burst=USER_BURST,
+                 max_users=USER_BUCKETS_MAX):
+        self.concurrency = concurrency
+        self.quantum = quantum
+        self.max_depth = max_depth
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.max_users = max_users
+        self._queues = {}             # flow key -> deque of (cost, future)
+        self._deficits = {}
+        self._active = deque()        # flow keys with waiters, in round-robin order
+        self._credited = False        # head of _active already got this round's quantum
+        self._in_flight = 0
+        self._waiting = 0
+        self._buckets = OrderedDict()
+
+    @staticmethod
+    def flow_key(guild_id, user_id):
+        return guild_id if guild_id is not None else f"dm:{user_id}"
+
+    @property
+    def depth(self):
+        return self._waiting
+
+    @contextlib.asynccontextmanager
+    async def admit(self, guild_id, user_id, cost=1, deadline=None):
+        """
+        Hold ``cost`` units of lookup capacity for the block.
+        Raises RateLimited if the user is over budget and Overloaded if the queue is full.
+        """
+        self._charge_user(user_id, cost)
+        if self._waiting >= self.max_depth:
+            registry.incr('fair_queue_shed')
+            raise Overloaded()
+
+        key = self.flow_key(guild_id, user_id)
+        future = asyncio.get_running_loop().create_future()
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = deque()
+            self._deficits[key] = 0
+            self._active.append(key)
+        queue.append((cost, future))
+        self._waiting += 1
+        self._dispatch()
+
+        try:
+            if deadline is not None:
+                await deadline.wait_for(future, 'lookup admission')
+            else:
+                await future
+        except BaseException:
+            if future.done() and not future.cancelled():
+                self._release(cost)
+            else:
+                future.cancel()
+                self._waiting -= 1
+                self._dispatch()
+            raise
+        try:
+            yield
+        finally:
+            self._release(cost)
+
+    def _charge_user(self, user_id, cost):
+        bucket = self._buckets.get(user_id)
+        if bucket is None:
+            bucket = self._buckets[user_id] = TokenBucket(self.user_rate, self.user_burst)
+            if len(self._buckets) > self.max_users:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(user_id)
+        if not bucket.take(cost):
+            registry.incr('fair_queue_rate_limited')
+            raise RateLimited(bucket.retry_after(cost))
+
+    def _release(self, cost):
+        self._in_flight -= cost
+        self._dispatch()
+
+    def _dispatch(self):
+        while self._active:
+            key = self._active[0]
+            queue = self._queues[key]
+            while queue and queue[0][1].done():
+                # Abandoned while waiting (already counted out of _waiting)
+                queue.popleft()
+            if not queue:
+                # Idle flows keep no credit
+                self._active.popleft()
+                del self._queues[key]
+                del self._deficits[key]
+                self._credited = False
+                continue
+
+            if not self._credited:
+                self._deficits[key] += self.quantum
+                self._credited = True
+
+            cost, future = queue[0]
+            if cost > self._deficits[key]:
+                # Out of credit this round; move on to the next flow
+                self._active.rotate(-1)
+                self._credited = False
+                continue
+            if self._in_flight and self._in_flight + cost > self.concurrency:
+                break
+
+            queue.popleft()
+            self._deficits[key] -= cost
+            self._in_flight += cost
+            self._waiting -= 1
+            future.set_result(None)
+
+        registry.set_gauge('fair_queue_depth', self._waiting)
+        registry.set_gauge('fair_queue_in_flight', self._in_flight)
@@ -1,10 +1,14 @@
-from flask import Flask
+def create_app():
+    # Flask is only needed by the keep-alive thread, so it is imported there rather than at startup
+    from flask import Flask
 
-app = Flask('')
+    app = Flask('')
 
-@app.route('/')
-def home():
-    return "I'm alive!"
+    @app.route('/')
+    def home():
+        return "I'm alive!"
+
+    return app
 
 def run():
-    app.run(host='0.0.0.0', port=8080)
+    create_app().run(host='0.0.0.0', port=8080)
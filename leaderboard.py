@@ -0,0 +1,116 @@
+"""
+Leaderboard for the RTanks Discord Bot.
+Every known player is kept in one sorted list per category, updated as snapshots arrive,
+so a page of /top is a slice rather than a sort or a scrape.
+"""
+
+import bisect
+
+from config import LEADERBOARD_PAGE_SIZE
+from utils import equipment_mod_levels, equipment_quality_batch
+
+EXPERIENCE = 'experience'
+KILLS = 'kills'
+KD = 'kd'
+GOLD_BOXES = 'gold_boxes'
+EQUIPMENT = 'equipment'
+
+CATEGORIES = (EXPERIENCE, KILLS, KD, GOLD_BOXES, EQUIPMENT)
+
+
+def _kd(record):
+    try:
+        return float(record.get('kd_ratio') or 0)
+    except ValueError:
+        return 0.0
+
+
+def _levels(record):
+    # Field dicts from the shared store carry pre-extracted levels; snapshots have their equipment
+    levels = record.get('equipment_levels')
+    return levels if levels is not None else equipment_mod_levels(record.get('equipment'))
+
+
+# How each category's value is read from a snapshot (or a snapshot field dict);
+# the equipment score is computed for many players at once, see _entries()
+_VALUES = {
+    EXPERIENCE: lambda record: record.get('experience') or 0,
+    KILLS: lambda record: record.get('kills') or 0,
+    KD: _kd,
+    GOLD_BOXES: lambda record: record.get('gold_boxes') or 0,
+}
+
+
+class Leaderboard:
+    """
+    Sorted indexes of (-value, player key) per category, highest value first.
+    Updating a player moves it within each index (two bisects); reading a page slices the list.
+    """
+
+    def __init__(self, page_size=LEADERBOARD_PAGE_SIZE):
+        self.page_size = page_size
+        self._players = {}  # key -> (username, rank, premium, {category: value})
+        self._indexes = {category: [] for category in CATEGORIES}
+
+    @staticmethod
+    def key(username):
+        return username.strip().lower()
+
+    @staticmethod
+    def _entries(records):
+        """Leaderboard entries for ``records``, with every equipment score from one batch."""
+        scores = equipment_quality_batch(_levels(record) for record in records)
+        players = []
+        for record, (_, _, score) in zip(records, scores):
+            values = {category: value(record) for category, value in _VALUES.items()}
+            values[EQUIPMENT] = score
+            players.append((record['username'], record.get('rank') or 'Unknown', bool(record.get('premium')), values))
+        return players
+
+    def update(self, record):
+        """Add or re-rank a player from a PlayerSnapshot or a dict with the same fields."""
+        key = self.key(record['username'])
+        previous = self._players.get(key)
+        self._players[key] = player = self._entries([record])[0]
+        values = player[3]
+        for category, index in self._indexes.items():
+            if previous is not None:
+                old_value = previous[3][category]
+                if old_value == values[category]:
+                    continue
+                position = bisect.bisect_left(index, (-old_value, key))
+                del index[position]
+            bisect.insort(index, (-values[category], key))
+
+    def load(self, records):
+        """
+        Bulk-add players not already known (e.g. from the shared store at startup),
+        re-sorting each index once instead of inserting one by one.
+        """
+        new = {}
+        for record in records:
+            key = self.key(record['username'])
+            if key not in self._players:
+                new[key] = record
+        self._players.update(zip(new, self._entries(list(new.values()))))
+        for category in CATEGORIES:
+            self._indexes[category] = sorted((-player[3][category], key) for key, player in self._players.items())
+
+    def page_count(self, category):
+        return max(1, -(-len(self._indexes[category]) // self.page_size))
+
+    def page(self, category, page):
+        """
+        Rows of 1-based ``page`` (clamped to the valid range) as (position, username, rank, premium, value).
+        Returns (page, rows).
+        """
+        page = min(max(1, page), self.page_count(category))
+        start = (page - 1) * self.page_size
+        rows = []
+        for offset, (negative_value, key) in enumerate(self._indexes[category][start:start + self.page_size]):
+            username, rank, premium, _ = self._players[key]
+            rows.append((start + offset + 1, username, rank, premium, -negative_value))
+        return page, rows
+
+    def __len__(self):
+        return len(self._players)
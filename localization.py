@@ -0,0 +1,199 @@
+"""
+Localization catalog for the RTanks Discord Bot.
+Rank, group and equipment translations, built once at import time.
+"""
+
+import re
+
+from config import TURRET_NAMES, HULL_NAMES, TURRET_RUSSIAN_NAMES, HULL_RUSSIAN_NAMES, PROTECTION_NAMES
+
+# Equipment names are "<base name> M<level>" (with a Latin or Cyrillic M)
+_MOD_SUFFIX = re.compile(r'^(.*?)\s+[MМ](\d+)$')
+
+RUSSIAN_RANKS = {
+    # Basic ranks
+    'Recruit': 'Рекрут',
+    'Private': 'Рядовой',
+    'Gefreiter': 'Ефрейтор',
+    'Corporal': 'Капрал',
+    'Master Corporal': 'Старший капрал',
+    'Sergeant': 'Сержант',
+    'Staff Sergeant': 'Штаб-сержант',
+    'Master Sergeant': 'Старший сержант',
+    'First Sergeant': 'Старшина',
+    'Sergeant Major': 'Старшина',
+
+    # Warrant Officers (all levels)
+    'Warrant Officer': 'Прапорщик',
+    'Warrant Officer 1': 'Прапорщик 1',
+    'Warrant Officer 2': 'Прапорщик 2',
+    'Warrant Officer 3': 'Прапорщик 3',
+    'Warrant Officer 4': 'Прапорщик 4',
+    'Warrant Officer 5': 'Прапорщик 5',
+    'Master Warrant Officer': 'Старший прапорщик',
+
+    # Officer ranks
+    'Third Lieutenant': 'Младший лейтенант',
+    'Second Lieutenant': 'Лейтенант',
+    'First Lieutenant': 'Старший лейтенант',
+    'Lieutenant': 'Лейтенант',
+    'Captain': 'Капитан',
+    'Major': 'Майор',
+    'Lieutenant Colonel': 'Подполковник',
+    'Colonel': 'Полковник',
+
+    # General ranks
+    'Brigadier': 'Бригадир',
+    'Brigadier General': 'Генерал-бригадир',
+    'Major General': 'Генерал-майор',
+    'Lieutenant General': 'Генерал-лейтенант',
+    'General': 'Генерал',
+    'General of the Army': 'Генерал армии',
+
+    # Marshal ranks
+    'Marshal': 'Маршал',
+    'Field Marshal': 'Фельдмаршал',
+    'Air Marshal': 'Маршал авиации',
+    'Fleet Admiral': 'Адмирал флота',
+
+    # Special ranks
+    'Commander': 'Командир',
+    'Commander in Chief': 'Главнокомандующий',
+    'Generalissimo': 'Генералиссимус',
+    'Supreme Commander': 'Верховный командующий',
+    'Legend': 'Легенда',
+}
+
+RUSSIAN_GROUPS = {
+    'Unknown': 'Нет группы',
+    'No Group': 'Нет группы',
+    'Player': 'Игрок',
+    'Premium': 'Премиум',
+    'Moderator': 'Модератор',
+    'Administrator': 'Администратор',
+    'Developer': 'Разработчик',
+    'Tester': 'Тестер',
+    'VIP': 'ВИП',
+    'Streamer': 'Стример',
+    'Content Creator': 'Создатель контента',
+    'Beta Tester': 'Бета-тестер',
+    'Volunteer': 'Волонтёр',
+    'Helper': 'Помощник',
+    'Supporter': 'Поддержка',
+    'Veteran': 'Ветеран',
+    'Elite': 'Элита',
+}
+
+# Base names only; modification levels are appended at lookup time
+RUSSIAN_EQUIPMENT = {
+    # Turrets
+    'Smoky': 'Смоки', 'Rail': 'Рельса', 'Ricochet': 'Рикошет', 'Isida': 'Изида',
+    'Freeze': 'Фриз', 'Flamethrower': 'Огнемёт', 'Thunder': 'Гром', 'Hammer': 'Молот',
+    'Vulcan': 'Вулкан', 'Twins': 'Близнецы', 'Shaft': 'Шафт', 'Striker': 'Страйкер',
+
+    # Hulls
+    'Hunter': 'Охотник', 'Mammoth': 'Мамонт', 'Titan': 'Титан', 'Wasp': 'Оса',
+    'Viking': 'Викинг', 'Hornet': 'Хорнет', 'Dictator': 'Диктатор',
+
+    # Resistances (actual website format)
+    'Badger': 'Барсук', 'Spider': 'Паук', 'Falcon': 'Сокол', 'Bear': 'Медведь',
+    'Wolf': 'Волк', 'Eagle': 'Орёл', 'Tiger': 'Тигр', 'Shark': 'Акула', 'Lion': 'Лев',
+    'Snake': 'Змея', 'Hawk': 'Ястреб', 'Panther': 'Пантера', 'Dolphin': 'Дельфин',
+    'Ocelot': 'Оцелот', 'Leopard': 'Леопард', 'Rhino': 'Носорог', 'Gorilla': 'Горилла',
+    'Cheetah': 'Гепард',
+}
+
+# Genitive turret names for "<Turret> Protection" -> "Защита от <turret>"
+RUSSIAN_TURRET_GENITIVE = {
+    'Smoky': 'Смоки', 'Rail': 'Рельса', 'Ricochet': 'Рикошета', 'Isida': 'Изиды',
+    'Freeze': 'Фриза', 'Flamethrower': 'Огнемета', 'Thunder': 'Грома', 'Hammer': 'Молота',
+    'Vulcan': 'Вулкана', 'Twins': 'Твинса', 'Shaft': 'Шафта', 'Striker': 'Страйкера',
+}
+
+
+def split_modification(equipment_name):
+    """Split "Smoky M3" into ("Smoky", 3); names without a level return (name, None)."""
+    match = _MOD_SUFFIX.match(equipment_name)
+    if match:
+        return match.group(1), int(match.group(2))
+    return equipment_name, None
+
+
+class LocalizationCatalog:
+    """Per-language lookup tables for ranks, groups and equipment base names."""
+
+    def __init__(self):
+        self.ranks = {}
+        self.groups = {}
+        self.equipment = {}
+        self.mod_prefix = {}
+
+    def add_language(self, language, ranks, groups, equipment, mod_prefix='M'):
+        self.ranks[language] = ranks
+        self.groups[language] = groups
+        self.equipment[language] = equipment
+        self.mod_prefix[language] = mod_prefix
+
+    def rank(self, rank, language):
+        table = self.ranks.get(language)
+        if table is None:
+            return rank
+        # Dynamic Legend ranks keep their level ("Legend 3" -> "Легенда 3")
+        if rank.startswith('Legend'):
+            base, _, level = rank.partition(' ')
+            translated = table.get('Legend', base)
+            return f"{translated} {level}" if level else translated
+        return table.get(rank, rank)
+
+    def group(self, group, language):
+        table = self.groups.get(language)
+        if not group:
+            group = 'Unknown'
+        if table is None:
+            return group
+        return table.get(group, group)
+
+    def equipment_name(self, equipment, language):
+        table = self.equipment.get(language)
+        if table is None:
+            return equipment
+        base, level = split_modification(equipment)
+        translated = table.get(base, base)
+        if level is None:
+            return translated
+        return f"{translated} {self.mod_prefix[language]}{level}"
+
+
+def _build_russian_equipment():
+    """Equipment base-name table covering every name the scraper can produce."""
+    table = {}
+    known_names = set(TURRET_NAMES) | set(HULL_NAMES)
+    known_names |= set(TURRET_RUSSIAN_NAMES.values()) | set(HULL_RUSSIAN_NAMES.values())
+    known_names |= set(PROTECTION_NAMES.values())
+    for name in known_names:
+        table[name] = RUSSIAN_EQUIPMENT.get(name, name)
+    for turret, genitive in RUSSIAN_TURRET_GENITIVE.items():
+        table[f"{turret} Protection"] = f"Защита от {genitive}"
+    return table
+
+
+def build_catalog():
+    catalog = LocalizationCatalog()
+    catalog.add_language('en', {}, {}, {})
+    catalog.add_language('ru', RUSSIAN_RANKS, RUSSIAN_GROUPS, _build_russian_equipment(), mod_prefix='М')
+    return catalog
+
+
+catalog = build_catalog()
+
+
+def translate_rank(rank, language):
+    return catalog.rank(rank, language)
+
+
+def translate_group(group, language):
+    return catalog.group(group, language)
+
+
+def translate_equipment(equipment, language):
+    return catalog.equipment_name(equipment, language)
@@ -0,0 +1,100 @@
+"""
+Logging pipeline for the RTanks Discord Bot.
+Records are queued on the event loop and written to disk by a background thread.
+"""
+
+import logging
+import logging.handlers
+import queue
+import threading
+import time
+
+from config import (
+    LOG_FILE, LOG_FORMAT, LOG_MAX_BYTES, LOG_BACKUP_COUNT,
+    LOG_QUEUE_SIZE, LOG_SAMPLE_WINDOW, LOG_SAMPLE_BURST,
+)
+from metrics import registry
+
+# Queue feeding the writer thread, set by setup_logging()
+log_queue = None
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Let at most ``burst`` records per call site through every ``window`` seconds.
+    Records are grouped by where they were logged rather than by message, since most
+    call sites format with f-strings and so produce a different message every time.
+    Warnings and errors are never sampled.
+    """
+
+    def __init__(self, window=LOG_SAMPLE_WINDOW, burst=LOG_SAMPLE_BURST):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._counts = {}
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+
+        now = time.monotonic()
+        key = (record.pathname, record.lineno)
+        with self._lock:
+            if now - self._window_start >= self.window:
+                self._window_start = now
+                self._counts.clear()
+            count = self._counts.get(key, 0) + 1
+            self._counts[key] = count
+
+        if count > self.burst:
+            registry.incr('log_records_sampled_out')
+            return False
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that drops records instead of blocking when the writer falls behind."""
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            registry.incr('log_records_dropped')
+
+
+def setup_logging(level=logging.INFO):
+    """
+    Route all logging through a bounded queue drained by a writer thread.
+    Returns the started QueueListener; call ``stop()`` on it at shutdown to flush.
+    """
+    global log_queue
+    formatter = logging.Formatter(LOG_FORMAT)
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'
+    )
+    file_handler.setFormatter(formatter)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
+
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(SamplingFilter())
+
+    root = logging.getLogger()
+    root.handlers.clear()
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(
+        log_queue, file_handler, stream_handler, respect_handler_level=True
+    )
+    listener.start()
+    return listener
+
+
+def pending_log_records():
+    """Number of records waiting for the writer thread."""
+    return log_queue.qsize() if log_queue is not None else 0
@@ -0,0 +1,93 @@
+"""
+Event loop lag monitor for the RTanks Discord Bot.
+Measures scheduling delay and captures the stack of whatever is blocking the loop.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from config import LOOP_LAG_INTERVAL, LOOP_LAG_THRESHOLD, LOOP_LAG_LOG_COOLDOWN
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """
+    Ticks on the event loop every ``interval`` seconds and records how late each tick was.
+    A watchdog thread notices when a tick is overdue by more than ``threshold`` and logs
+    the loop thread's current stack, at most once per ``cooldown`` seconds.
+    """
+
+    def __init__(self, interval=LOOP_LAG_INTERVAL, threshold=LOOP_LAG_THRESHOLD, cooldown=LOOP_LAG_LOG_COOLDOWN):
+        self.interval = interval
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.last_tick = time.monotonic()
+        self.loop_thread_id = None
+        self.last_report = 0.0
+        self._tick_count = 0
+        self._reported_tick = -1
+        self._task = None
+        self._stop_event = threading.Event()
+        self._watchdog = None
+
+    def start(self):
+        """Start ticking on the running loop and launch the watchdog thread."""
+        if self._task is not None and not self._task.done():
+            return self._task
+        self.loop_thread_id = threading.get_ident()
+        self.last_tick = time.monotonic()
+        self._stop_event.clear()
+        self._task = asyncio.create_task(self._run())
+        self._watchdog = threading.Thread(target=self._watch, name='loop-lag-watchdog', daemon=True)
+        self._watchdog.start()
+        return self._task
+
+    async def stop(self):
+        self._stop_event.set()
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self):
+        while True:
+            scheduled = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag_ms = max(0.0, (now - scheduled - self.interval) * 1000)
+            registry.observe('loop_lag_ms', round(lag_ms, 2))
+            if lag_ms > self.threshold * 1000:
+                registry.incr('loop_stalls')
+            self.last_tick = now
+            self._tick_count += 1
+
+    def _watch(self):
+        """Watchdog thread: capture the loop's stack while it is blocked."""
+        while not self._stop_event.wait(self.interval / 2):
+            overdue = time.monotonic() - self.last_tick - self.interval
+            if overdue < self.threshold or self._reported_tick == self._tick_count:
+                continue
+
+            # Only report each blocking episode once, and rate-limit across episodes
+            self._reported_tick = self._tick_count
+            now = time.monotonic()
+            if now - self.last_report < self.cooldown:
+                registry.incr('loop_stall_reports_suppressed')
+                continue
+            self.last_report = now
+
+            frame = sys._current_frames().get(self.loop_thread_id)
+            if frame is None:
+                continue
+            stack = "".join(traceback.format_stack(frame))
+            logger.warning(
+                "Event loop blocked for %.0fms, loop thread stack:\n%s", overdue * 1000, stack
+            )
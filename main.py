@@ -4,6 +4,8 @@ RTanks Online Discord Bot
 Main entry point for the Discord bot application.
 """
 
+from startup import timeline, login_backoff  # first, so the startup clock includes imports
+
 import asyncio
 import logging
 import os
@@ -11,24 +13,35 @@ from dotenv import load_dotenv
 import threading
 from keepalive import run
 
+import discord
+
 from bot import RTanksBot
-import patched_rank_emoji  # this will patch get_rank_emoji for the bot
+from config import LOGIN_MAX_ATTEMPTS
+from logging_setup import setup_logging
 
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('bot.log'),
-        logging.StreamHandler()
-    ]
-)
+# Configure logging (set LOG_LEVEL=DEBUG to enable per-field parser logging)
+log_listener = setup_logging(getattr(logging, os.getenv('LOG_LEVEL', 'INFO').upper(), logging.INFO))
 
 logger = logging.getLogger(__name__)
+timeline.mark('imports')
+
+async def login_with_backoff(bot, token):
+    """Log in, backing off only when Discord actually rate-limits us."""
+    for attempt in range(1, LOGIN_MAX_ATTEMPTS + 1):
+        try:
+            await bot.login(token)
+            return
+        except discord.HTTPException as e:
+            if e.status != 429 or attempt == LOGIN_MAX_ATTEMPTS:
+                raise
+            retry_after = e.response.headers.get('Retry-After') if e.response is not None else None
+            delay = login_backoff(attempt, float(retry_after) if retry_after else None)
+            logger.warning(f"Login rate limited, retrying in {delay:.1f}s (attempt {attempt}/{LOGIN_MAX_ATTEMPTS})")
+            await asyncio.sleep(delay)
 
 async def main():
     """Main function to start the bot."""
@@ -43,12 +56,19 @@ async def main():
             return
     
     # Create and run the bot
-    bot = RTanksBot()
+    # FORCE_COMMAND_SYNC=1 re-syncs slash commands even if their schema is unchanged
+    force_sync = os.getenv('FORCE_COMMAND_SYNC', '').lower() in ('1', 'true', 'yes')
+    # SHARD_COUNT / SHARD_IDS ("0,1") split the shards across processes; unset lets Discord decide
+    shard_count = int(os.getenv('SHARD_COUNT')) if os.getenv('SHARD_COUNT') else None
+    shard_ids = [int(i) for i in os.getenv('SHARD_IDS').split(',')] if os.getenv('SHARD_IDS') else None
+    # SCRAPER_SOCKET (comma-separated for a pool) uses scraper_worker.py processes instead of scraping in-process
+    scraper_sockets = [path for path in os.getenv('SCRAPER_SOCKET', '').split(',') if path] or None
+    bot = RTanksBot(force_command_sync=force_sync, shard_count=shard_count, shard_ids=shard_ids, scraper_sockets=scraper_sockets)
     
     try:
         logger.info("Starting RTanks Discord Bot...")
-        await asyncio.sleep(5)  # Add small delay to reduce chance of rate-limit
-        await bot.start(token)
+        await login_with_backoff(bot, token)
+        await bot.connect()
     except KeyboardInterrupt:
         logger.info("Bot stopped by user")
     except Exception as e:
@@ -63,3 +83,5 @@ if __name__ == "__main__":
         asyncio.run(main())
     except KeyboardInterrupt:
         logger.info("Application terminated by user")
+    finally:
+        log_listener.stop()
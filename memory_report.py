@@ -0,0 +1,121 @@
+"""
+Memory introspection for the RTanks Discord Bot.
+tracemalloc snapshots, snapshot diffs and size census of the bot's long-lived objects.
+"""
+
+import gc
+import logging
+import sys
+import tracemalloc
+
+from config import TRACEMALLOC_FRAMES
+
+logger = logging.getLogger(__name__)
+
+
+def deep_sizeof(obj, seen=None, root_type=None):
+    """
+    Approximate size in bytes of an object and the containers/strings it references.
+    With ``root_type``, referenced objects of other classes (a response's session,
+    connector, loop...) are not followed; they belong to their own census line.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += deep_sizeof(key, seen, root_type) + deep_sizeof(value, seen, root_type)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += deep_sizeof(item, seen, root_type)
+    elif root_type is not None and not isinstance(obj, root_type):
+        pass
+    elif hasattr(obj, '__slots__'):
+        for slot in obj.__slots__:
+            if hasattr(obj, slot):
+                size += deep_sizeof(getattr(obj, slot), seen, root_type)
+    elif hasattr(obj, '__dict__'):
+        size += deep_sizeof(vars(obj), seen, root_type)
+    return size
+
+
+def census(type_names):
+    """
+    Count live instances and total deep size for each class name in ``type_names``.
+    One ``seen`` set spans the whole census, so shared structures are counted once.
+    """
+    wanted = set(type_names)
+    results = {name: [0, 0] for name in type_names}
+    seen = set()
+    for obj in gc.get_objects():
+        name = type(obj).__name__
+        if name in wanted:
+            results[name][0] += 1
+            results[name][1] += deep_sizeof(obj, seen, type(obj))
+    return {name: tuple(values) for name, values in results.items()}
+
+
+def format_size(num_bytes):
+    """Format a byte count as B/KB/MB."""
+    if num_bytes < 1024:
+        return f"{num_bytes} B"
+    elif num_bytes < 1024 * 1024:
+        return f"{num_bytes / 1024:.1f} KB"
+    return f"{num_bytes / 1024 / 1024:.1f} MB"
+
+
+class MemoryInspector:
+    """Keeps tracemalloc snapshots so consecutive reports can be diffed."""
+
+    def __init__(self, frames=TRACEMALLOC_FRAMES):
+        self.frames = frames
+        self.previous = None
+        self.current = None
+
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            logger.info(f"tracemalloc started with {self.frames} frame(s)")
+
+    def stop(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+            logger.info("tracemalloc stopped")
+        self.previous = None
+        self.current = None
+
+    def take_snapshot(self):
+        """Take a filtered snapshot, keeping the previous one for diffing (blocking)."""
+        self.start()
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<unknown>'),
+        ))
+        self.previous, self.current = self.current, snapshot
+        return snapshot
+
+    def top_allocators(self, limit=10):
+        if self.current is None:
+            return []
+        return [
+            f"{format_size(stat.size):>10} {stat.count:>7}  {stat.traceback[0].filename.rsplit('/', 1)[-1]}:{stat.traceback[0].lineno}"
+            for stat in self.current.statistics('lineno')[:limit]
+        ]
+
+    def diff(self, limit=10):
+        if self.previous is None or self.current is None:
+            return []
+        return [
+            f"{'+' if stat.size_diff >= 0 else '-'}{format_size(abs(stat.size_diff)):>9} {stat.count_diff:>+7}  "
+            f"{stat.traceback[0].filename.rsplit('/', 1)[-1]}:{stat.traceback[0].lineno}"
+            for stat in self.current.compare_to(self.previous, 'lineno')[:limit]
+        ]
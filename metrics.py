@@ -0,0 +1,92 @@
+"""
+Metrics for the RTanks Discord Bot.
+Small in-process counters, gauges and ring buffers shared by the bot's background tasks.
+"""
+
+from collections import deque
+import threading
+
+
+class RingBuffer:
+    """Fixed-size buffer that keeps the most recent samples."""
+
+    def __init__(self, size):
+        self._samples = deque(maxlen=size)
+
+    def append(self, value):
+        self._samples.append(value)
+
+    def values(self):
+        return list(self._samples)
+
+    def last(self, default=None):
+        return self._samples[-1] if self._samples else default
+
+    def average(self):
+        if not self._samples:
+            return 0.0
+        return sum(self._samples) / len(self._samples)
+
+    def maximum(self):
+        return max(self._samples, default=0)
+
+    def percentile(self, pct):
+        """Return the given percentile (0-100) of the stored samples."""
+        if not self._samples:
+            return 0.0
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def __len__(self):
+        return len(self._samples)
+
+
+class MetricsRegistry:
+    """Thread-safe registry of named counters, gauges and sample histories."""
+
+    def __init__(self, history_size=60):
+        self.history_size = history_size
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._series = {}
+
+    def incr(self, name, amount=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + amount
+
+    def set_gauge(self, name, value):
+        with self._lock:
+            self._gauges[name] = value
+
+    def observe(self, name, value):
+        """Record a sample in the ring buffer for ``name``."""
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                series = self._series[name] = RingBuffer(self.history_size)
+            series.append(value)
+
+    def counter(self, name):
+        return self._counters.get(name, 0)
+
+    def gauge(self, name, default=None):
+        return self._gauges.get(name, default)
+
+    def series(self, name):
+        """Return the ring buffer for ``name`` (empty if nothing was recorded)."""
+        return self._series.get(name) or RingBuffer(self.history_size)
+
+    def snapshot(self):
+        """Return a plain-dict copy of every metric."""
+        with self._lock:
+            return {
+                'counters': dict(self._counters),
+                'gauges': dict(self._gauges),
+                'series': {name: series.values() for name, series in self._series.items()},
+            }
+
+
+# Shared registry used across the bot
+registry = MetricsRegistry()
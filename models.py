@@ -0,0 +1,273 @@
+"""
+Data models for the RTanks Discord Bot.
+Compact player snapshots with packed equipment arrays.
+"""
+
+from array import array
+
+from equipment_registry import equipment_registry
+from localization import split_modification
+
+EQUIPMENT_CATEGORIES = ('turrets', 'hulls', 'protections')
+
+# Packed equipment code layout: item id << 8 | mod level << 2 | owned << 1 | installed
+_INSTALLED = 0b01
+_OWNED = 0b10
+
+
+def item_id(base_name):
+    """Return the registry id for an equipment base name, registering unknown names."""
+    return equipment_registry.register(base_name)
+
+
+def item_name(item):
+    return equipment_registry.name(item)
+
+
+def pack_equipment(item, mod_level, owned=True, installed=False):
+    return item << 8 | (mod_level & 0x3f) << 2 | (_OWNED if owned else 0) | (_INSTALLED if installed else 0)
+
+
+def unpack_equipment(code):
+    """Return (item id, mod level, owned, installed) for a packed equipment code."""
+    return code >> 8, (code >> 2) & 0x3f, bool(code & _OWNED), bool(code & _INSTALLED)
+
+
+def equipment_label(code):
+    item, mod_level, _, _ = unpack_equipment(code)
+    return f"{equipment_registry.name(item)} M{mod_level}"
+
+
+def mod_levels(codes):
+    """Mod levels of a code array as bytes, so counting/max/sum run in C."""
+    return bytes((code >> 2) & 0x3f for code in codes)
+
+
+class EquipmentBuilder:
+    """Collects packed equipment codes while a profile page is parsed."""
+
+    def __init__(self):
+        self._codes = {category: array('I') for category in EQUIPMENT_CATEGORIES}
+        self._positions = {category: {} for category in EQUIPMENT_CATEGORIES}
+
+    def add(self, category, base_name, mod_level, installed=False):
+        """
+        Record an owned (or, with ``installed``, an installed) item.
+        Returns True if this call changed anything.
+        """
+        key = pack_equipment(item_id(base_name), int(mod_level), owned=False)
+        codes = self._codes[category]
+        positions = self._positions[category]
+        flag = _INSTALLED if installed else _OWNED
+        position = positions.get(key)
+        if position is None:
+            positions[key] = len(codes)
+            codes.append(key | flag)
+            return True
+        if codes[position] & flag:
+            return False
+        codes[position] |= flag
+        return True
+
+    def sort(self, category):
+        """Sort one category by display label."""
+        codes = self._codes[category]
+        self._codes[category] = array('I', sorted(codes, key=equipment_label))
+        self._positions[category] = {code & ~0b11: index for index, code in enumerate(self._codes[category])}
+
+    def count(self, category):
+        return sum(1 for code in self._codes[category] if code & _OWNED)
+
+    def codes(self):
+        return tuple(self._codes[category] for category in EQUIPMENT_CATEGORIES)
+
+
+def _pack_category(owned_names, installed_names):
+    """Pack one category's owned and installed name lists into an array of codes."""
+    codes = array('I')
+    positions = {}
+    for name in owned_names:
+        base, mod_level = split_modification(name)
+        code = pack_equipment(item_id(base), mod_level or 0)
+        if code not in positions:
+            positions[code] = len(codes)
+            codes.append(code)
+    for name in installed_names:
+        base, mod_level = split_modification(name)
+        code = pack_equipment(item_id(base), mod_level or 0)
+        if code in positions:
+            codes[positions[code]] |= _INSTALLED
+        else:
+            # Installed but not seen in the owned list (detected from an equipment card only)
+            positions[code] = len(codes)
+            codes.append(pack_equipment(item_id(base), mod_level or 0, owned=False, installed=True))
+    return codes
+
+
+class EquipmentView:
+    """Read-only dict-like view of a snapshot's equipment, matching the old nested-dict layout."""
+
+    __slots__ = ('_snapshot',)
+
+    _KEYS = EQUIPMENT_CATEGORIES + tuple(f"equipped_{category}" for category in EQUIPMENT_CATEGORIES)
+
+    def __init__(self, snapshot):
+        self._snapshot = snapshot
+
+    def __getitem__(self, key):
+        if key not in self._KEYS:
+            raise KeyError(key)
+        installed = key.startswith('equipped_')
+        category = key[len('equipped_'):] if installed else key
+        codes = self._snapshot.equipment_codes[EQUIPMENT_CATEGORIES.index(category)]
+        mask = _INSTALLED if installed else _OWNED
+        return [equipment_label(code) for code in codes if code & mask]
+
+    def mod_levels(self, categories=('turrets', 'hulls')):
+        """Mod levels of every owned item in ``categories`` as bytes."""
+        return b"".join(
+            mod_levels(code for code in self._snapshot.equipment_codes[EQUIPMENT_CATEGORIES.index(category)] if code & _OWNED)
+            for category in categories
+        )
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        return list(self._KEYS)
+
+    def items(self):
+        return [(key, self[key]) for key in self._KEYS]
+
+    def __iter__(self):
+        return iter(self._KEYS)
+
+    def __contains__(self, key):
+        return key in self._KEYS
+
+    def __bool__(self):
+        return any(len(codes) for codes in self._snapshot.equipment_codes)
+
+    def to_dict(self):
+        return dict(self.items())
+
+
+class PlayerSnapshot:
+    """
+    Compact record of one scraped player.
+    Supports the read-only dict interface (``snapshot['rank']``, ``.get()``, ``in``) the embed code uses.
+    """
+
+    __slots__ = (
+        'username', 'clan', 'rank', 'experience', 'max_experience', 'kills', 'deaths',
+        'kd_ratio', 'gold_boxes', 'premium', 'group', 'is_online', 'status_indicator',
+        'equipment_codes',
+    )
+
+    _FIELDS = __slots__[:-1]
+    _DEFAULTS = {
+        'clan': None, 'rank': 'Unknown', 'experience': 0, 'max_experience': None, 'kills': 0,
+        'deaths': 0, 'kd_ratio': '0.00', 'gold_boxes': 0, 'premium': False, 'group': 'Unknown',
+        'is_online': False, 'status_indicator': '🔴',
+    }
+
+    def __init__(self, username, equipment_codes=None, **fields):
+        self.username = username
+        for name, default in self._DEFAULTS.items():
+            setattr(self, name, fields.get(name, default))
+        self.equipment_codes = equipment_codes or tuple(array('I') for _ in EQUIPMENT_CATEGORIES)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a snapshot from the scraper's nested player dict."""
+        equipment = data.get('equipment') or {}
+        codes = tuple(
+            _pack_category(equipment.get(category, []), equipment.get(f"equipped_{category}", []))
+            for category in EQUIPMENT_CATEGORIES
+        )
+        return cls.from_fields(data, codes)
+
+    @classmethod
+    def from_fields(cls, data, equipment_codes):
+        """Build a snapshot from a flat field dict and already packed equipment codes."""
+        fields = {name: data[name] for name in cls._DEFAULTS if name in data}
+        return cls(data['username'], equipment_codes, **fields)
+
+    @property
+    def equipment(self):
+        return EquipmentView(self)
+
+    def to_dict(self):
+        data = {name: getattr(self, name) for name in self._FIELDS}
+        data['equipment'] = self.equipment.to_dict()
+        return data
+
+    def to_tuple(self):
+        """Plain tuple of primitives (msgpack friendly) for cheap serialization."""
+        item_names = {}
+        for codes in self.equipment_codes:
+            for code in codes:
+                item = code >> 8
+                item_names[item] = equipment_registry.name(item)
+        return (
+            tuple(getattr(self, name) for name in self._FIELDS),
+            tuple(codes.tobytes() for codes in self.equipment_codes),
+            item_names,
+        )
+
+    @classmethod
+    def fields_from_tuple(cls, data):
+        """Just the scalar fields of a ``to_tuple()`` result, without unpacking equipment."""
+        return dict(zip(cls._FIELDS, data[0]))
+
+    @staticmethod
+    def mod_levels_from_tuple(data, categories=('turrets', 'hulls')):
+        """Mod levels of the owned items in ``categories`` of a ``to_tuple()`` result, without unpacking names."""
+        _, packed, _ = data
+        levels = []
+        for category in categories:
+            codes = array('I')
+            codes.frombytes(packed[EQUIPMENT_CATEGORIES.index(category)])
+            levels.append(mod_levels(code for code in codes if code & _OWNED))
+        return b"".join(levels)
+
+    @classmethod
+    def from_tuple(cls, data):
+        values, packed, item_names = data
+        # Names outside the static registry get per-process ids, so remap through the names shipped alongside
+        remap = {item: item_id(name) for item, name in item_names.items()}
+        codes = []
+        for raw in packed:
+            category = array('I')
+            category.frombytes(raw)
+            codes.append(array('I', (remap[code >> 8] << 8 | code & 0xff for code in category)))
+        fields = dict(zip(cls._FIELDS, values))
+        return cls(fields.pop('username'), tuple(codes), **fields)
+
+    # Dict-compatible read access for existing embed code
+    def __getitem__(self, key):
+        if key == 'equipment':
+            return self.equipment
+        if key in self._FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key == 'equipment':
+            return self.equipment
+        if key in self._FIELDS:
+            value = getattr(self, key)
+            return default if value is None else value
+        return default
+
+    def __contains__(self, key):
+        return key == 'equipment' or (key in self._FIELDS and getattr(self, key) is not None)
+
+    def keys(self):
+        return [name for name in self._FIELDS if getattr(self, name) is not None] + ['equipment']
+
+    def __repr__(self):
+        return f"<PlayerSnapshot {self.username!r} {self.rank!r}>"
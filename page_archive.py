@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Raw profile page archive for the RTanks Discord Bot.
+Pages are stored once per distinct content (sha256), zlib-compressed against a shared
+dictionary trained from archived pages, and indexed by player and fetch time.
+After a parser fix, ``reparse_archive`` rebuilds snapshots from the archive on all cores
+without touching the website:
+
+    python page_archive.py reparse [--all] [--since UNIX_TIME]
+"""
+
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from config import PAGE_ARCHIVE_PATH, ARCHIVE_DICT_SAMPLES, ARCHIVE_DICT_SIZE, ARCHIVE_REPARSE_BATCH
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dictionaries (
+    id INTEGER PRIMARY KEY,
+    data BLOB NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    hash TEXT PRIMARY KEY,
+    dict_id INTEGER NOT NULL,
+    raw_size INTEGER NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS captures (
+    id INTEGER PRIMARY KEY,
+    player_key TEXT NOT NULL,
+    username TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    hash TEXT NOT NULL REFERENCES pages(hash)
+);
+CREATE INDEX IF NOT EXISTS captures_by_player ON captures (player_key, fetched_at);
+"""
+
+
+def build_dictionary(samples, size=ARCHIVE_DICT_SIZE):
+    """
+    Preset zlib dictionary from lines shared by most sample pages (the page template).
+    zlib matches closest to the end of the dictionary most cheaply, so the commonest lines go last.
+    """
+    counts = Counter()
+    for html in samples:
+        counts.update({line.strip() for line in html.splitlines() if len(line.strip()) >= 8})
+    threshold = max(2, len(samples) // 2)
+    chosen = []
+    total = 0
+    for line, count in counts.most_common():
+        if count < threshold:
+            break
+        encoded = line.encode('utf-8') + b'\n'
+        if total + len(encoded) > size:
+            break
+        chosen.append(encoded)
+        total += len(encoded)
+    return b''.join(reversed(chosen))
+
+
+class PageArchive:
+    """SQLite-backed archive. Blocking; call from a worker thread in async code."""
+
+    def __init__(self, path=PAGE_ARCHIVE_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._dictionaries = {0: None}
+        self._current_dict = 0
+        for dict_id, data in self._conn.execute("SELECT id, data FROM dictionaries ORDER BY id"):
+            self._dictionaries[dict_id] = data
+            self._current_dict = dict_id
+
+    @staticmethod
+    def key(username):
+        return username.strip().lower()
+
+    def _compress(self, raw):
+        zdict = self._dictionaries[self._current_dict]
+        compressor = zlib.compressobj(9, zdict=zdict) if zdict else zlib.compressobj(9)
+        return compressor.compress(raw) + compressor.flush()
+
+    def _decompress(self, data, dict_id):
+        zdict = self._dictionaries.get(dict_id)
+        if zdict is None and dict_id:
+            row = self._conn.execute("SELECT data FROM dictionaries WHERE id = ?", (dict_id,)).fetchone()
+            zdict = self._dictionaries[dict_id] = row[0]
+        decompressor = zlib.decompressobj(zdict=zdict) if zdict else zlib.decompressobj()
+        return decompressor.decompress(data) + decompressor.flush()
+
+    def add(self, username, html, fetched_at=None):
+        """Archive one fetched page; returns its content hash."""
+        raw = html.encode('utf-8')
+        digest = hashlib.sha256(raw).hexdigest()
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM pages WHERE hash = ?", (digest,)).fetchone() is None:
+                self._conn.execute(
+                    "INSERT INTO pages (hash, dict_id, raw_size, data) VALUES (?, ?, ?, ?)",
+                    (digest, self._current_dict, len(raw), self._compress(raw)),
+                )
+            self._conn.execute(
+                "INSERT INTO captures (player_key, username, fetched_at, hash) VALUES (?, ?, ?, ?)",
+                (self.key(username), username.strip(), fetched_at or time.time(), digest),
+            )
+            if self._current_dict == 0:
+                self._maybe_train()
+        return digest
+
+    def _maybe_train(self):
+        """Train the shared dictionary once enough pages are in; earlier pages keep dictionary 0."""
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()
+        if count < ARCHIVE_DICT_SAMPLES:
+            return
+        rows = self._conn.execute("SELECT data, dict_id FROM pages LIMIT ?", (ARCHIVE_DICT_SAMPLES,)).fetchall()
+        zdict = build_dictionary([self._decompress(data, dict_id).decode('utf-8') for data, dict_id in rows])
+        if not zdict:
+            return
+        cursor = self._conn.execute("INSERT INTO dictionaries (data, created_at) VALUES (?, ?)", (zdict, time.time()))
+        self._current_dict = cursor.lastrowid
+        self._dictionaries[self._current_dict] = zdict
+        logger.info(f"Trained page archive dictionary {self._current_dict} ({len(zdict)} bytes)")
+
+    def page(self, digest):
+        """HTML of the page with content hash ``digest``, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT data, dict_id FROM pages WHERE hash = ?", (digest,)).fetchone()
+            return self._decompress(*row).decode('utf-8') if row else None
+
+    def history(self, username, since=None):
+        """(fetched_at, hash) captures of ``username``, oldest first."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT fetched_at, hash FROM captures WHERE player_key = ? AND fetched_at >= ? ORDER BY fetched_at",
+                (self.key(username), since or 0),
+            ).fetchall()
+
+    def captures(self, latest_only=True, since=None):
+        """(capture id, username, fetched_at, hash) to re-parse, by default each player's newest page."""
+        query = "SELECT id, username, fetched_at, hash FROM captures WHERE fetched_at >= ?"
+        if latest_only:
+            query += " AND id IN (SELECT MAX(id) FROM captures GROUP BY player_key)"
+        with self._lock:
+            return self._conn.execute(query + " ORDER BY id", (since or 0,)).fetchall()
+
+    def stats(self):
+        with self._lock:
+            pages, raw, stored = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM pages"
+            ).fetchone()
+            (captures,) = self._conn.execute("SELECT COUNT(*) FROM captures").fetchone()
+        return {'captures': captures, 'pages': pages, 'raw_bytes': raw, 'stored_bytes': stored}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Batch re-parse; each pool process opens its own archive and uses the parser alone,
+# without a scraper's session, limiter or archive writer
+
+_worker_archive = None
+_worker_parse = None
+
+
+def _init_reparse_worker(path):
+    global _worker_archive, _worker_parse
+    from scraper import parse_player_html
+    _worker_archive = PageArchive(path)
+    _worker_parse = parse_player_html
+
+
+def _reparse_batch(batch):
+    results = []
+    for _, username, fetched_at, digest in batch:
+        html = _worker_archive.page(digest)
+        snapshot = _worker_parse(html, username) if html else None
+        results.append((username, fetched_at, snapshot.to_tuple() if snapshot else None))
+    return results
+
+
+def reparse_archive(path=PAGE_ARCHIVE_PATH, latest_only=True, since=None, workers=None, store=None):
+    """
+    Re-parse archived pages with the current parser on ``workers`` processes (default: all cores).
+    Rebuilt snapshots are written to ``store`` (a SharedStore) when given.
+    Returns (parsed, failed).
+    """
+    archive = PageArchive(path)
+    try:
+        captures = archive.captures(latest_only, since)
+    finally:
+        archive.close()
+    batches = [captures[i:i + ARCHIVE_REPARSE_BATCH] for i in range(0, len(captures), ARCHIVE_REPARSE_BATCH)]
+    parsed = failed = 0
+    started_at = time.monotonic()
+    with ProcessPoolExecutor(workers or os.cpu_count(), initializer=_init_reparse_worker, initargs=(path,)) as pool:
+        for results in pool.map(_reparse_batch, batches):
+            for username, fetched_at, snapshot_tuple in results:
+                if snapshot_tuple is None:
+                    failed += 1
+                    continue
+                parsed += 1
+                if store is not None:
+                    store.put_player(PageArchive.key(username), snapshot_tuple, fetched_at)
+    logger.info(f"Re-parsed {parsed} archived page(s), {failed} failed, in {time.monotonic() - started_at:.1f}s")
+    return parsed, failed
+
+
+if __name__ == "__main__":
+    from config import SHARED_STORE_PATH
+    from shared_store import SharedStore
+
+    parser = argparse.ArgumentParser(description="RTanks raw page archive")
+    commands = parser.add_subparsers(dest='command', required=True)
+    reparse = commands.add_parser('reparse', help="rebuild snapshots in the shared store from archived pages")
+    reparse.add_argument('--all', action='store_true', help="every capture, not just each player's newest")
+    reparse.add_argument('--since', type=float, help="only captures fetched at or after this unix time")
+    reparse.add_argument('--workers', type=int, help="parser processes (default: all cores)")
+    commands.add_parser('stats', help="show archive size and deduplication")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if not PAGE_ARCHIVE_PATH:
+        parser.error("PAGE_ARCHIVE_PATH is not set in config.py")
+    if args.command == 'stats':
+        print(PageArchive().stats())
+    elif not SHARED_STORE_PATH:
+        parser.error("SHARED_STORE_PATH is not set in config.py; there is nowhere to write re-parsed snapshots")
+    else:
+        shared_store = SharedStore()
+        try:
+            reparse_archive(latest_only=not args.all, since=args.since, workers=args.workers, store=shared_store)
+        finally:
+            shared_store.close()
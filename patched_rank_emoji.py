@@ -35,8 +35,6 @@ PREMIUM_RANK_EMOJIS = {
     31: '<:rank_31_premremovebgpreview:1398618237519925340>',
 }
 
-from utils import get_rank_emoji as original_get_rank_emoji
-
 def get_rank_emoji(rank_name, premium=False):
     """Return the appropriate emoji for a given rank, considering premium status."""
     if rank_name.startswith('Legend'):
@@ -55,7 +53,3 @@ def get_rank_emoji(rank_name, premium=False):
 
     rank_index = rank_mapping.get(rank_name, 31)
     return PREMIUM_RANK_EMOJIS.get(rank_index) if premium else RANK_EMOJIS.get(rank_index)
-
-# Monkey patch into the bot
-import bot
-bot.get_rank_emoji = get_rank_emoji
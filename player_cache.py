@@ -0,0 +1,112 @@
+"""
+Player snapshot cache for the RTanks Discord Bot.
+Keeps the latest scraped data per player so buttons and repeat lookups can reuse it.
+"""
+
+from collections import OrderedDict
+import itertools
+import time
+
+from config import PLAYER_CACHE_SIZE, RENDER_CACHE_SIZE
+
+
+class CacheEntry:
+    """A cached player snapshot with its version and fetch time."""
+
+    __slots__ = ('snapshot', 'version', 'fetched_at')
+
+    def __init__(self, snapshot, version, fetched_at):
+        self.snapshot = snapshot
+        self.version = version
+        self.fetched_at = fetched_at
+
+    @property
+    def age(self):
+        return time.time() - self.fetched_at
+
+
+class PlayerCache:
+    """LRU cache of player snapshots keyed by lower-cased username."""
+
+    def __init__(self, max_size=PLAYER_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._versions = itertools.count(1)
+        self._listeners = []
+
+    @staticmethod
+    def key(username):
+        return username.strip().lower()
+
+    def get(self, username):
+        """Return the cached entry for ``username`` regardless of age, or None."""
+        key = self.key(username)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def get_fresh(self, username, max_age):
+        """Return the cached entry if it is younger than ``max_age`` seconds, else None."""
+        entry = self.get(username)
+        if entry is not None and entry.age <= max_age:
+            return entry
+        return None
+
+    def add_listener(self, callback):
+        """Call ``callback(key, entry, shared)`` after every ``put()``."""
+        self._listeners.append(callback)
+
+    def put(self, username, snapshot, fetched_at=None, shared=False):
+        """
+        Store a snapshot (freshly scraped unless ``fetched_at`` says otherwise) and return its entry.
+        ``shared`` tells listeners the snapshot is already in the shared store.
+        """
+        key = self.key(username)
+        entry = CacheEntry(snapshot, next(self._versions), fetched_at or time.time())
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        for callback in self._listeners:
+            callback(key, entry, shared)
+        return entry
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, username):
+        return self.key(username) in self._entries
+
+
+class RenderCache:
+    """
+    LRU cache of rendered embed payloads (``Embed.to_dict()``) keyed by
+    snapshot version, language and expansion state.
+    """
+
+    def __init__(self, max_size=RENDER_CACHE_SIZE):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._payloads = OrderedDict()
+
+    def get(self, version, language, expanded):
+        key = (version, language, expanded)
+        payload = self._payloads.get(key)
+        if payload is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._payloads.move_to_end(key)
+        return payload
+
+    def put(self, version, language, expanded, payload):
+        key = (version, language, expanded)
+        self._payloads[key] = payload
+        self._payloads.move_to_end(key)
+        while len(self._payloads) > self.max_size:
+            self._payloads.popitem(last=False)
+
+    def __len__(self):
+        return len(self._payloads)
@@ -0,0 +1,212 @@
+"""
+Player popularity tracking, refresh-ahead and startup pre-warm for the RTanks Discord Bot.
+Frequently requested players are re-scraped in the background just before their cache entry expires.
+"""
+
+import asyncio
+import heapq
+import json
+import logging
+import math
+import os
+import time
+
+from circuit_breaker import CircuitOpenError
+from config import (
+    POPULARITY_HALF_LIFE, POPULARITY_MAX_TRACKED, HOT_PLAYER_SCORE, HOT_PLAYER_LIMIT,
+    REFRESH_AHEAD_MARGIN, REFRESH_AHEAD_INTERVAL, REFRESH_BUDGET_SHARE,
+    PLAYER_CACHE_TTL, RTANKS_TIMEOUT, HOT_SET_FILE, HOT_SET_SIZE, PREWARM_TOP_N, PREWARM_CONCURRENCY,
+)
+from deadline import Deadline, DeadlineExceeded
+from fair_queue import TokenBucket
+from metrics import registry
+from scheduler import BACKGROUND
+
+logger = logging.getLogger(__name__)
+
+
+class PopularityTracker:
+    """Exponentially decayed request counters per player (case-insensitive)."""
+
+    def __init__(self, half_life=POPULARITY_HALF_LIFE, max_tracked=POPULARITY_MAX_TRACKED):
+        self.decay_rate = math.log(2) / half_life
+        self.max_tracked = max_tracked
+        self._scores = {}  # key -> [score, updated_at, username as last requested]
+
+    @staticmethod
+    def key(username):
+        return username.strip().lower()
+
+    def _decayed(self, record, now):
+        return record[0] * math.exp(-self.decay_rate * (now - record[1]))
+
+    def record(self, username, weight=1.0):
+        now = time.monotonic()
+        key = self.key(username)
+        record = self._scores.get(key)
+        if record is None:
+            self._scores[key] = [weight, now, username.strip()]
+            if len(self._scores) > self.max_tracked * 1.1:
+                self._trim(now)
+        else:
+            record[0] = self._decayed(record, now) + weight
+            record[1] = now
+            record[2] = username.strip()
+
+    def score(self, username):
+        record = self._scores.get(self.key(username))
+        return self._decayed(record, time.monotonic()) if record else 0.0
+
+    def hottest(self, limit, min_score=0.0):
+        """Up to ``limit`` (username, score) pairs with the highest current scores."""
+        now = time.monotonic()
+        scored = ((self._decayed(record, now), record[2]) for record in self._scores.values())
+        # Partial selection of the few hottest instead of sorting every tracked player each tick
+        hot = heapq.nlargest(limit, (item for item in scored if item[0] >= min_score))
+        return [(username, score) for score, username in hot]
+
+    def _trim(self, now):
+        """Forget the coldest players once the table grows past its limit."""
+        coldest = sorted(self._scores, key=lambda key: self._decayed(self._scores[key], now))
+        for key in coldest[:len(self._scores) - self.max_tracked]:
+            del self._scores[key]
+
+    def __len__(self):
+        return len(self._scores)
+
+
+class RefreshAhead:
+    """
+    Background task that re-scrapes hot players shortly before their cache entries expire.
+    Refreshes run at background priority and are capped at a share of the upstream request rate.
+    """
+
+    def __init__(self, scraper, cache, tracker, interval=REFRESH_AHEAD_INTERVAL,
+                 margin=REFRESH_AHEAD_MARGIN, budget_share=REFRESH_BUDGET_SHARE):
+        self.scraper = scraper
+        self.cache = cache
+        self.tracker = tracker
+        self.interval = interval
+        self.margin = margin
+        rate = scraper.limiter.rate * budget_share
+        self.budget = TokenBucket(rate, max(1.0, rate * interval))
+        self._task = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def due(self):
+        """Hot players whose cached entry expires within the margin, hottest first."""
+        for username, _ in self.tracker.hottest(HOT_PLAYER_LIMIT, HOT_PLAYER_SCORE):
+            entry = self.cache.get(username)
+            # Only keep warm what is cached; players that were never found are not retried
+            if entry is not None and entry.age >= PLAYER_CACHE_TTL - self.margin:
+                yield username
+
+    async def refresh_once(self):
+        refreshed = 0
+        for username in list(self.due()):
+            if not self.budget.take():
+                registry.incr('refresh_ahead_budget_exhausted')
+                break
+            try:
+                snapshot = await self.scraper.get_player_data(username, Deadline(RTANKS_TIMEOUT), priority=BACKGROUND)
+            except CircuitOpenError:
+                break
+            except DeadlineExceeded:
+                continue
+            if snapshot:
+                self.cache.put(username, snapshot)
+                refreshed += 1
+        if refreshed:
+            registry.incr('refresh_ahead_refreshed', refreshed)
+            logger.debug("Refreshed %d hot player(s) ahead of expiry", refreshed)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Refresh-ahead pass failed: {e}")
+            await asyncio.sleep(self.interval)
+
+
+def save_hot_set(tracker, path=HOT_SET_FILE, limit=HOT_SET_SIZE):
+    """Write the currently hottest players to ``path`` for the next session."""
+    hot = [{'username': username, 'score': round(score, 3)} for username, score in tracker.hottest(limit)]
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(hot, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+    return len(hot)
+
+
+def load_hot_set(path=HOT_SET_FILE):
+    """Return the saved (username, score) pairs, or an empty list if there are none."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return [(item['username'], float(item['score'])) for item in json.load(f)]
+    except FileNotFoundError:
+        return []
+    except (ValueError, KeyError, TypeError) as e:
+        logger.warning(f"Ignoring unreadable hot player file {path}: {e}")
+        return []
+
+
+async def prewarm_cache(scraper, cache, tracker, top_n=PREWARM_TOP_N, concurrency=PREWARM_CONCURRENCY):
+    """
+    Fill the cache with last session's hot players (and optionally the top of the ratings page).
+    Saved scores seed the tracker so refresh-ahead keeps these players warm afterwards.
+    Fetches run at background priority, so commands arriving meanwhile go first.
+    """
+    started_at = time.monotonic()
+    usernames = []
+    for username, score in load_hot_set():
+        tracker.record(username, score)
+        usernames.append(username)
+    if top_n:
+        try:
+            usernames.extend(await scraper.get_top_player_names(top_n))
+        except Exception as e:
+            logger.warning(f"Could not read top players for pre-warm: {e}")
+
+    unique = {}
+    for name in usernames:
+        unique.setdefault(tracker.key(name), name)
+    usernames = list(unique.values())
+    if not usernames:
+        return 0
+
+    semaphore = asyncio.Semaphore(concurrency)
+    warmed = 0
+
+    async def warm(username):
+        nonlocal warmed
+        async with semaphore:
+            if username in cache:
+                return
+            try:
+                # Deadline starts once the fetch is due, not when it was queued
+                snapshot = await scraper.get_player_data(username, Deadline(RTANKS_TIMEOUT), priority=BACKGROUND)
+            except (CircuitOpenError, DeadlineExceeded):
+                return
+            if snapshot:
+                cache.put(username, snapshot)
+                warmed += 1
+
+    await asyncio.gather(*(warm(username) for username in usernames))
+    registry.incr('prewarm_players', warmed)
+    logger.info(f"Pre-warmed {warmed}/{len(usernames)} player(s) in {time.monotonic() - started_at:.1f}s")
+    return warmed
@@ -0,0 +1,88 @@
+"""
+Streaming reader for RTanks profile pages.
+Decodes the body chunk by chunk and stops once every section the parser needs has arrived.
+"""
+
+import codecs
+import logging
+import re
+
+from config import PROFILE_ENCODING, PROFILE_CHUNK_SIZE, PROFILE_REQUIRED_MARKERS, PROFILE_TAIL_BYTES, PROFILE_MARKER_OVERLAP
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+class ProfileStreamParser:
+    """
+    Incremental marker scanner fed with decoded text.
+    ``complete`` turns True once one marker from every required group has been seen.
+    """
+
+    def __init__(self, required_markers=PROFILE_REQUIRED_MARKERS):
+        # One case-sensitive alternation per group
+        self._pending = {
+            group: re.compile('|'.join(f'(?:{marker})' for marker in markers))
+            for group, markers in required_markers.items()
+        }
+        # Keep enough of the previous chunk to catch markers split across chunks
+        self._overlap = PROFILE_MARKER_OVERLAP
+        self._tail = ''
+        self._parts = []
+
+    def feed(self, text):
+        if not text:
+            return
+        self._parts.append(text)
+        if not self._pending:
+            return
+        window = self._tail + text
+        for group, pattern in list(self._pending.items()):
+            if pattern.search(window):
+                del self._pending[group]
+        self._tail = window[-self._overlap:]
+
+    @property
+    def complete(self):
+        return not self._pending
+
+    @property
+    def missing(self):
+        return sorted(self._pending)
+
+    def text(self):
+        return ''.join(self._parts)
+
+
+async def read_profile(response, parser=None, chunk_size=PROFILE_CHUNK_SIZE, full=False, tail_bytes=PROFILE_TAIL_BYTES):
+    """
+    Read a profile response body, stopping ``tail_bytes`` after ``parser`` is complete
+    unless ``full`` asks for the whole page (e.g. to archive it).
+    The page's declared charset (or PROFILE_ENCODING) is used directly, no detection.
+    Returns (html, truncated).
+    """
+    parser = parser or ProfileStreamParser()
+    decoder = codecs.getincrementaldecoder(response.charset or PROFILE_ENCODING)(errors='replace')
+    bytes_read = 0
+    complete_at = None
+    truncated = False
+
+    async for chunk in response.content.iter_chunked(chunk_size):
+        bytes_read += len(chunk)
+        parser.feed(decoder.decode(chunk))
+        if parser.complete and not full:
+            if complete_at is None:
+                complete_at = bytes_read
+            if bytes_read - complete_at >= tail_bytes:
+                truncated = not response.content.at_eof()
+                break
+    parser.feed(decoder.decode(b'', final=True))
+
+    registry.incr('profile_bytes_read', bytes_read)
+    if truncated:
+        # The rest of the body is not needed; drop the connection instead of draining it
+        registry.incr('profile_streams_truncated')
+        response.close()
+    elif not parser.complete:
+        logger.debug("Profile stream ended without markers: %s", ', '.join(parser.missing))
+    return parser.text(), truncated
@@ -0,0 +1,161 @@
+"""
+On-demand profiling for the RTanks Discord Bot.
+Profiles the event loop thread and the parse workers for a fixed window.
+"""
+
+import cProfile
+import io
+import marshal
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+from config import PROFILE_SAMPLE_INTERVAL
+
+# Session currently collecting data, checked by the parse workers
+active_session = None
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename.rsplit('/', 1)[-1]}:{code.co_firstlineno})"
+
+
+class ProfileSession:
+    """
+    A single profiling run.
+
+    ``sampling`` mode samples the stacks of the loop thread and parse worker threads.
+    ``deterministic`` mode additionally runs cProfile on the loop thread and around every
+    parse job, and merges the results into one pstats file.
+    """
+
+    def __init__(self, mode='sampling', sample_interval=PROFILE_SAMPLE_INTERVAL, worker_prefix='parse'):
+        self.mode = mode
+        self.sample_interval = sample_interval
+        self.worker_prefix = worker_prefix
+        self.loop_thread_id = None
+        self.started_at = None
+        self.duration = 0.0
+        self.samples = 0
+        self.stacks = Counter()
+        self.self_counts = Counter()
+        self.total_counts = Counter()
+        self._loop_profile = None
+        self._worker_profiles = []
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._sampler = None
+
+    def start(self):
+        """Start profiling; must be called from the event loop thread."""
+        global active_session
+        self.loop_thread_id = threading.get_ident()
+        self.started_at = time.monotonic()
+        if self.mode == 'deterministic':
+            self._loop_profile = cProfile.Profile()
+            self._loop_profile.enable()
+        self._sampler = threading.Thread(target=self._sample, name='profile-sampler', daemon=True)
+        self._sampler.start()
+        active_session = self
+
+    def stop(self):
+        """Stop profiling; must be called from the event loop thread."""
+        global active_session
+        if active_session is self:
+            active_session = None
+        if self._loop_profile is not None:
+            self._loop_profile.disable()
+        self._stop_event.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        self.duration = time.monotonic() - self.started_at
+
+    def run_in_worker(self, func, *args):
+        """Run a parse job, under cProfile when in deterministic mode."""
+        if self.mode != 'deterministic':
+            return func(*args)
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+ allows one active profiler per process; the loop profile already sees this thread
+            return func(*args)
+        try:
+            return func(*args)
+        finally:
+            profile.disable()
+            with self._lock:
+                self._worker_profiles.append(profile)
+
+    def _sample(self):
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.sample_interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if thread_id == self.loop_thread_id:
+                    thread_name = 'event-loop'
+                elif names.get(thread_id, '').startswith(self.worker_prefix):
+                    # Skip idle workers blocked on the executor queue
+                    if frame.f_code.co_name == '_worker':
+                        continue
+                    thread_name = 'parse-worker'
+                else:
+                    continue
+
+                labels = []
+                while frame is not None:
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                labels.reverse()
+                if not labels:
+                    continue
+
+                self.samples += 1
+                self.stacks[";".join([thread_name] + labels)] += 1
+                self.self_counts[labels[-1]] += 1
+                for label in set(labels):
+                    self.total_counts[label] += 1
+
+    def collapsed_stacks(self):
+        """Return samples in the collapsed-stack format used by flamegraph tools."""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+    def stats_file(self):
+        """
+        Return (filename, bytes) for the aggregated per-function results:
+        a binary pstats dump in deterministic mode, a text table in sampling mode.
+        """
+        if self.mode == 'deterministic':
+            stats = pstats.Stats(self._loop_profile)
+            for profile in self._worker_profiles:
+                stats.add(profile)
+            # Same format Stats.dump_stats() writes, without going through a temp file
+            return 'profile.pstats', marshal.dumps(stats.stats)
+
+        lines = [f"{'self':>8} {'total':>8}  function"]
+        for label, total in self.total_counts.most_common():
+            lines.append(f"{self.self_counts.get(label, 0):>8} {total:>8}  {label}")
+        return 'profile.txt', "\n".join(lines).encode('utf-8')
+
+    def summary(self, limit=15):
+        """Short human-readable summary of the hottest functions."""
+        header = f"{self.mode} profile, {self.duration:.1f}s, {self.samples} samples"
+        if self.mode == 'deterministic':
+            stats = pstats.Stats(self._loop_profile, stream=io.StringIO())
+            for profile in self._worker_profiles:
+                stats.add(profile)
+            lines = [header, f"{'calls':>8} {'cumtime':>9}  function"]
+            entries = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+            for (filename, line, name), (_, calls, _, cumtime, _) in entries[:limit]:
+                lines.append(f"{calls:>8} {cumtime:>9.3f}  {name} ({filename.rsplit('/', 1)[-1]}:{line})")
+            return "\n".join(lines)
+
+        lines = [header, f"{'self':>6} {'total':>6}  function"]
+        for label, count in self.self_counts.most_common(limit):
+            lines.append(f"{count:>6} {self.total_counts[label]:>6}  {label}")
+        return "\n".join(lines)
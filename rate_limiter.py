@@ -0,0 +1,71 @@
+"""
+Request limiter for the RTanks ratings website.
+Spaces outgoing requests a random REQUEST_DELAY_MIN..MAX apart, first come first served.
+"""
+
+import asyncio
+import random
+
+from config import REQUEST_DELAY_MIN, REQUEST_DELAY_MAX
+from metrics import registry
+
+
+class RequestLimiter:
+    """
+    FIFO queue of requests waiting for their turn.
+    Callers with a deadline give up their place if it passes while they wait.
+    With a SharedStore, the schedule is shared by every process using the same store.
+    """
+
+    def __init__(self, min_delay=REQUEST_DELAY_MIN, max_delay=REQUEST_DELAY_MAX, store=None):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.store = store
+        self._lock = asyncio.Lock()
+        self._next_at = 0.0
+        self.waiting = 0
+
+    @property
+    def rate(self):
+        """Average requests per second the limiter lets through."""
+        return 2 / (self.min_delay + self.max_delay)
+
+    async def acquire(self, deadline=None):
+        """Wait for the next request slot; raises DeadlineExceeded if ``deadline`` passes first."""
+        self.waiting += 1
+        registry.set_gauge('limiter_waiting', self.waiting)
+        try:
+            if deadline is not None:
+                await deadline.wait_for(self._take_slot(), 'limiter slot')
+            else:
+                await self._take_slot()
+        finally:
+            self.waiting -= 1
+            registry.set_gauge('limiter_waiting', self.waiting)
+
+    async def try_acquire(self):
+        """Take a slot only if one is free right now and nobody is queued; never waits."""
+        if self.waiting or self._lock.locked():
+            return False
+        spacing = random.uniform(self.min_delay, self.max_delay)
+        if self.store is not None:
+            return await self.store.run(self.store.try_reserve_slot, 'upstream', spacing)
+        now = asyncio.get_running_loop().time()
+        if now < self._next_at:
+            return False
+        self._next_at = now + spacing
+        return True
+    
+    async def _take_slot(self):
+        async with self._lock:
+            if self.store is not None:
+                spacing = random.uniform(self.min_delay, self.max_delay)
+                delay = await self.store.run(self.store.reserve_slot, 'upstream', spacing)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                return
+            loop = asyncio.get_running_loop()
+            delay = self._next_at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_at = loop.time() + random.uniform(self.min_delay, self.max_delay)
@@ -0,0 +1,83 @@
+"""
+Background resource sampler for the RTanks Discord Bot.
+Records process and upstream health samples so /botstats can render without blocking.
+"""
+
+import asyncio
+import logging
+import os
+import time
+
+from config import RESOURCE_SAMPLE_INTERVAL, UPSTREAM_HEALTH_INTERVAL
+from metrics import registry
+
+logger = logging.getLogger(__name__)
+
+
+class ResourceSampler:
+    """Periodically samples CPU, RSS, fd count, task count and upstream health."""
+
+    def __init__(self, scraper, interval=RESOURCE_SAMPLE_INTERVAL, health_interval=UPSTREAM_HEALTH_INTERVAL):
+        self.scraper = scraper
+        self.interval = interval
+        self.health_interval = health_interval
+        self.process = None  # created on the first sample so psutil is not imported at startup
+        self.last_health_check = 0.0
+        self._task = None
+
+    def start(self):
+        """Start the sampling loop on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return self._task
+
+    async def stop(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    def _sample_process(self):
+        """Collect process stats; runs in a worker thread."""
+        if self.process is None:
+            import psutil
+            self.process = psutil.Process(os.getpid())
+            # Prime cpu_percent; the first reading after this is meaningful
+            self.process.cpu_percent(interval=None)
+        with self.process.oneshot():
+            cpu = self.process.cpu_percent(interval=None)
+            rss_mb = self.process.memory_info().rss / 1024 / 1024
+            try:
+                fds = self.process.num_fds()
+            except AttributeError:
+                # Windows has no fd count, report handles instead
+                fds = self.process.num_handles()
+        return cpu, rss_mb, fds
+
+    async def sample_once(self):
+        cpu, rss_mb, fds = await asyncio.to_thread(self._sample_process)
+        registry.observe('cpu_percent', round(cpu, 1))
+        registry.observe('rss_mb', round(rss_mb, 2))
+        registry.observe('open_fds', fds)
+        registry.observe('asyncio_tasks', len(asyncio.all_tasks()))
+
+        now = time.monotonic()
+        if now - self.last_health_check >= self.health_interval:
+            self.last_health_check = now
+            status, response_ms = await self.scraper.check_website_status()
+            registry.set_gauge('upstream_status', status)
+            registry.set_gauge('upstream_checked_at', time.time())
+            if response_ms is not None:
+                registry.observe('upstream_ms', response_ms)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.sample_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Resource sampling failed: {e}")
+            await asyncio.sleep(self.interval)
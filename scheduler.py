@@ -0,0 +1,112 @@
+"""
+Priority scheduler for work against the RTanks website.
+Interactive lookups go ahead of background jobs; long-waiting background jobs are aged in.
+"""
+
+from collections import deque
+import asyncio
+import contextlib
+import time
+
+from config import SCHEDULER_MAX_CONCURRENCY, SCHEDULER_CLASS_LIMITS, SCHEDULER_AGING_SECONDS
+from metrics import registry
+
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+
+# Highest priority first
+JOB_CLASSES = (INTERACTIVE, BACKGROUND)
+
+
+class PriorityScheduler:
+    """
+    Admission control for scraper jobs.
+    A job runs when a global slot and a slot of its class are free. Waiting jobs are
+    admitted by class priority, except that a job which has waited ``aging_seconds``
+    is admitted in arrival order with the higher classes so it cannot starve.
+    """
+
+    def __init__(self, max_concurrency=SCHEDULER_MAX_CONCURRENCY,
+                 class_limits=SCHEDULER_CLASS_LIMITS, aging_seconds=SCHEDULER_AGING_SECONDS):
+        self.max_concurrency = max_concurrency
+        self.class_limits = dict(class_limits)
+        self.aging_seconds = aging_seconds
+        self._queues = {job_class: deque() for job_class in JOB_CLASSES}
+        self._running = {job_class: 0 for job_class in JOB_CLASSES}
+
+    @property
+    def running(self):
+        return sum(self._running.values())
+
+    def queued(self, job_class):
+        return sum(1 for _, future in self._queues[job_class] if not future.done())
+
+    @contextlib.asynccontextmanager
+    async def slot(self, job_class, deadline=None):
+        """Hold a slot of ``job_class`` for the duration of the block."""
+        await self.acquire(job_class, deadline)
+        try:
+            yield
+        finally:
+            self.release(job_class)
+
+    async def acquire(self, job_class, deadline=None):
+        """Wait for a slot; raises DeadlineExceeded if ``deadline`` passes while queued."""
+        enqueued_at = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        self._queues[job_class].append((enqueued_at, future))
+        self._dispatch()
+        try:
+            if deadline is not None:
+                await deadline.wait_for(future, f'{job_class} slot')
+            else:
+                await future
+        except BaseException:
+            if future.done() and not future.cancelled():
+                # Admitted just as we gave up; hand the slot back
+                self.release(job_class)
+            else:
+                future.cancel()
+                self._dispatch()
+            raise
+        registry.observe(f'scheduler_{job_class}_wait_ms', round((time.monotonic() - enqueued_at) * 1000, 2))
+
+    def release(self, job_class):
+        self._running[job_class] -= 1
+        self._dispatch()
+
+    def _dispatch(self):
+        """Admit waiting jobs while there is capacity."""
+        while self.running < self.max_concurrency:
+            job_class = self._next_class()
+            if job_class is None:
+                break
+            _, future = self._queues[job_class].popleft()
+            self._running[job_class] += 1
+            future.set_result(None)
+        for job_class in JOB_CLASSES:
+            self._publish(job_class)
+
+    def _next_class(self):
+        """Class whose head job should run next, or None if nothing can run."""
+        now = time.monotonic()
+        best_class = None
+        best_key = None
+        for rank, job_class in enumerate(JOB_CLASSES):
+            queue = self._queues[job_class]
+            # Drop waiters that gave up
+            while queue and queue[0][1].done():
+                queue.popleft()
+            if not queue or self._running[job_class] >= self.class_limits.get(job_class, self.max_concurrency):
+                continue
+            enqueued_at = queue[0][0]
+            # Aged jobs rank with the top class; within a rank, earlier arrivals go first
+            aged = now - enqueued_at >= self.aging_seconds
+            key = (0 if aged else rank, enqueued_at)
+            if best_key is None or key < best_key:
+                best_class, best_key = job_class, key
+        return best_class
+
+    def _publish(self, job_class):
+        registry.set_gauge(f'scheduler_{job_class}_queued', self.queued(job_class))
+        registry.set_gauge(f'scheduler_{job_class}_running', self._running[job_class])
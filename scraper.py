@@ -5,20 +5,135 @@ Handles scraping player data from the RTanks ratings website.
 
 import aiohttp
 import asyncio
-from bs4 import BeautifulSoup
-import random
+import bisect
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
 import re
+import sqlite3
+import time
 import logging
-from urllib.parse import quote
+from urllib.parse import quote, unquote
 import json
 
+import profiling
+from circuit_breaker import CircuitBreaker, CircuitOpenError
+from deadline import Deadline, DeadlineExceeded
+from rate_limiter import RequestLimiter
+from scheduler import PriorityScheduler, INTERACTIVE, BACKGROUND
+from profile_stream import read_profile
+from page_archive import PageArchive
+from aho_corasick import AhoCorasick
+from metrics import registry, RingBuffer
+from models import PlayerSnapshot, EquipmentBuilder
+from config import RTANKS_TIMEOUT, PARSE_WORKERS, TURRET_RUSSIAN_NAMES, HULL_RUSSIAN_NAMES, PROTECTION_NAMES, PAGE_ARCHIVE_PATH
+from config import HEDGE_ENABLED, HEDGE_PERCENTILE, HEDGE_MIN_SAMPLES, HEDGE_MIN_DELAY, HEDGE_LATENCY_SAMPLES
+
 logger = logging.getLogger(__name__)
 
+
+def make_soup(html):
+    """Parse HTML with BeautifulSoup; bs4 is imported on first use instead of at startup."""
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, 'html.parser')
+
+# Rank names in priority order (Russian, English); when several appear on a page the first listed wins
+RANK_NAMES = (
+    ('Легенда', 'Legend'),
+    ('Генералиссимус', 'Generalissimo'),
+    ('Командир бригады', 'Brigadier Commander'),
+    ('Командир полковник', 'Colonel Commander'),
+    ('Командир подполковник', 'Lieutenant Colonel Commander'),
+    ('Командир майор', 'Major Commander'),
+    ('Командир капитан', 'Captain Commander'),
+    ('Командир лейтенант', 'Lieutenant Commander'),
+    ('Командир', 'Commander'),
+    ('Фельдмаршал', 'Field Marshal'),
+    ('Маршал', 'Marshal'),
+    ('Генерал', 'General'),
+    ('Генерал-лейтенант', 'Lieutenant General'),
+    ('Генерал-майор', 'Major General'),
+    ('Бригадир', 'Brigadier'),
+    ('Полковник', 'Colonel'),
+    ('Подполковник', 'Lieutenant Colonel'),
+    ('Майор', 'Major'),
+    ('Капитан', 'Captain'),
+    ('Старший лейтенант', 'First Lieutenant'),
+    ('Лейтенант', 'Second Lieutenant'),
+    ('Старший прапорщик', 'Master Warrant Officer'),
+    ('Прапорщик', 'Warrant Officer'),
+    ('Старшина', 'Sergeant Major'),
+    ('Старший сержант', 'First Sergeant'),
+    ('Сержант', 'Master Sergeant'),
+    ('Младший сержант', 'Staff Sergeant'),
+    ('Ефрейтор', 'Sergeant'),
+    ('Старший ефрейтор', 'Master Corporal'),
+    ('Капрал', 'Corporal'),
+    ('Гефрейтор', 'Gefreiter'),
+    ('Рядовой', 'Private'),
+    ('Новобранец', 'Recruit'),
+)
+
+
+def _name_keywords():
+    """Lower-cased (keyword, (kind, value)) pairs for every rank and equipment name in both languages."""
+    for index, names in enumerate(RANK_NAMES):
+        for name in names:
+            yield name.lower(), ('rank', index)
+    for kind, mapping in (('turrets', TURRET_RUSSIAN_NAMES), ('hulls', HULL_RUSSIAN_NAMES)):
+        for russian_name, english_name in mapping.items():
+            yield russian_name.lower(), (kind, english_name)
+            yield english_name.lower(), (kind, english_name)
+    for animal_name, display_name in PROTECTION_NAMES.items():
+        yield f'resistances/{animal_name}/', ('protection_image', display_name)
+        yield animal_name, ('protections', display_name)
+        if display_name.lower() != animal_name:
+            yield display_name.lower(), ('protections', display_name)
+
+
+# Compiled once; matched against lower-cased text
+NAME_MATCHER = AhoCorasick(_name_keywords())
+_EQUIPMENT_ORDER = {name: index for index, name in enumerate([*TURRET_RUSSIAN_NAMES.values(), *HULL_RUSSIAN_NAMES.values()])}
+
+
+def _equipment_order(hit):
+    return _EQUIPMENT_ORDER.get(hit[2][1], 0)
+
+_MOD_LEVEL = re.compile(r'\s*[mм](\d)')  # Latin or Cyrillic М
+_IMAGE_MOD_LEVEL = re.compile(r'm(\d)/preview\.png')
+_CARD_MOD_LEVEL = re.compile(r'[MМ](\d)')
+_INSTALLED_MARKER = re.compile(r'установленный(?:[^|]*\|\s*(да))?')
+
+
+def _log_archive_error(future):
+    error = future.exception()
+    if error is not None:
+        logger.warning(f"Could not archive profile page: {error}")
+
 class RTanksScraper:
-    def __init__(self):
+    def __init__(self, shared_store=None):
         self.base_url = "https://ratings.ranked-rtanks.online"
         self.session = None
         
+        # Profile pages are parsed off the event loop
+        self.parse_executor = ThreadPoolExecutor(max_workers=PARSE_WORKERS, thread_name_prefix='parse')
+        
+        # Every request to the website goes through the breaker so outages fail fast
+        self.breaker = CircuitBreaker('upstream')
+        
+        # Profile requests wait their turn here instead of sleeping independently
+        # (shared with other shard processes through the store, if there is one)
+        self.limiter = RequestLimiter(store=shared_store)
+        
+        # Interactive lookups are admitted ahead of background jobs
+        self.scheduler = PriorityScheduler()
+        
+        # Recent time-to-headers (ms), used to decide when a slow profile fetch gets hedged
+        self.header_latency = RingBuffer(HEDGE_LATENCY_SAMPLES)
+        
+        # Optional raw page archive for offline re-parsing; written from one thread off the event loop
+        self.archive = PageArchive() if PAGE_ARCHIVE_PATH else None
+        self.archive_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='archive') if self.archive else None
+        
         # Headers to avoid bot detection
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
@@ -36,62 +151,74 @@ class RTanksScraper:
     async def _get_session(self):
         """Get or create an aiohttp session."""
         if self.session is None or self.session.closed:
-            timeout = aiohttp.ClientTimeout(total=30)
+            timeout = aiohttp.ClientTimeout(total=RTANKS_TIMEOUT)
             self.session = aiohttp.ClientSession(
                 timeout=timeout,
                 headers=self.headers
             )
         return self.session
     
-    async def get_player_data(self, username):
+    @contextlib.asynccontextmanager
+    async def _request(self, url, **kwargs):
+        """
+        GET ``url`` through the circuit breaker.
+        Connection errors, timeouts and 5xx responses count as failures, including a body that
+        stalls or breaks while the caller reads it; latency is measured to the headers.
+        """
+        call = self.breaker.begin()
+        session = await self._get_session()
+        start_time = time.monotonic()
+        try:
+            response = await session.get(url, **kwargs)
+        except asyncio.CancelledError:
+            call.cancel()
+            # A hedged-out request is at least this slow; keep it in the sample so p95 does not drift down
+            self.header_latency.append((time.monotonic() - start_time) * 1000)
+            raise
+        except Exception:
+            call.failure()
+            raise
+        elapsed_ms = (time.monotonic() - start_time) * 1000
+        if response.status >= 500:
+            call.failure()
+        else:
+            self.header_latency.append(elapsed_ms)
+        try:
+            yield response
+        except asyncio.CancelledError:
+            call.cancel()
+            raise
+        except (asyncio.TimeoutError, aiohttp.ClientError):
+            call.failure()
+            raise
+        finally:
+            # The outcome is only known once the caller is done with the body; no-op if already recorded
+            call.success(elapsed_ms)
+            response.release()
+    
+    async def get_player_data(self, username, deadline=None, priority=INTERACTIVE, hedge=None):
         """
         Scrape player data from the RTanks ratings website.
-        Returns a dictionary with player information or None if not found.
+        Returns a PlayerSnapshot or None if not found.
+        Raises DeadlineExceeded once ``deadline`` has passed; the fetch and parse are dropped.
+        ``priority`` is the scheduler class the lookup runs in.
+        With ``hedge`` (default: HEDGE_ENABLED, interactive lookups only) a slow profile
+        request is raced against a second one; see _hedged_request().
         """
+        if deadline is None:
+            deadline = Deadline(RTANKS_TIMEOUT)
+        if hedge is None:
+            hedge = HEDGE_ENABLED and priority == INTERACTIVE
+        # Fail fast without queueing while the website is known to be down
+        self.breaker.check()
+        async with self.scheduler.slot(priority, deadline):
+            return await self._fetch_player_data(username, deadline, hedge)
+    
+    async def _fetch_player_data(self, username, deadline, hedge=False):
         try:
-
-    # Parse equipment from the detailed equipment section
-    soup = BeautifulSoup(html, 'html.parser')
-    equipment_cards = soup.select("div.equipment-card")
-
-    for card in equipment_cards:
-        card_text = card.get_text(separator=" ", strip=True)
-
-        if "Установленный" in card_text or "Installed" in card_text:
-            for russian_name, english_name in turret_mapping.items():
-                if russian_name in card_text or english_name in card_text:
-                    match = re.search(r'[MМ](\d)', card_text)
-                    if match:
-                        mod_level = match.group(1)
-                        equipment_name = f"{english_name} M{mod_level}"
-                        if equipment_name not in player_data['equipment']['equipped_turrets']:
-                            player_data['equipment']['equipped_turrets'].append(equipment_name)
-                            logger.info(f"Found EQUIPPED turret: {equipment_name}")
-
-            for russian_name, english_name in hull_mapping.items():
-                if russian_name in card_text or english_name in card_text:
-                    match = re.search(r'[MМ](\d)', card_text)
-                    if match:
-                        mod_level = match.group(1)
-                        equipment_name = f"{english_name} M{mod_level}"
-                        if equipment_name not in player_data['equipment']['equipped_hulls']:
-                            player_data['equipment']['equipped_hulls'].append(equipment_name)
-                            logger.info(f"Found EQUIPPED hull: {equipment_name}")
-
-            for animal_name, display_name in protection_mapping.items():
-                if animal_name in card_text.lower() or display_name in card_text:
-                    match = re.search(r'[MМ](\d)', card_text)
-                    if match:
-                        mod_level = match.group(1)
-                        resistance_name = f"{display_name} M{mod_level}"
-                        if resistance_name not in player_data['equipment']['equipped_protections']:
-                            player_data['equipment']['equipped_protections'].append(resistance_name)
-                            logger.info(f"Found EQUIPPED protection: {resistance_name}")
-
-            session = await self._get_session()
-            
-            # Add random delay to avoid rate limiting
-            await asyncio.sleep(random.uniform(0.5, 1.5))
+            # Wait for a request slot to avoid rate limiting
+            await self.limiter.acquire(deadline)
+            deadline.check_fetch('profile request')
             
             # Try the correct URL pattern for RTanks
             possible_urls = [
@@ -101,10 +228,13 @@ class RTanksScraper:
             player_data = None
             for url in possible_urls:
                 try:
-                    async with session.get(url) as response:
+                    async with self._hedged_request(url, deadline, hedge) as response:
                         if response.status == 200:
-                            html = await response.text()
-                            player_data = await self._parse_player_data(html, username)
+                            # Stream the page and stop once the sections the parser needs are in;
+                            # archived pages are read whole and kept even if the parser fails on them
+                            html, _ = await read_profile(response, full=self.archive is not None)
+                            self._archive_page(username, html)
+                            player_data = await self._parse_player_data(html, username, deadline)
                             if player_data:
                                 break
                         elif response.status == 404:
@@ -113,8 +243,11 @@ class RTanksScraper:
                             logger.warning(f"Unexpected status code {response.status} for {url}")
                             continue
                             
+                except (CircuitOpenError, DeadlineExceeded):
+                    raise
                 except asyncio.TimeoutError:
                     logger.warning(f"Timeout while fetching {url}")
+                    deadline.check_fetch('main page fallback')
                     continue
                 except Exception as e:
                     logger.error(f"Error fetching {url}: {e}")
@@ -122,25 +255,135 @@ class RTanksScraper:
             
             if not player_data:
                 # Try searching the main page for the player
-                player_data = await self._search_player_on_main_page(username)
+                player_data = await self._search_player_on_main_page(username, deadline)
             
             return player_data
             
+        except (CircuitOpenError, DeadlineExceeded):
+            raise
         except Exception as e:
             logger.error(f"Error in get_player_data: {e}")
             return None
     
-    async def _parse_player_data(self, html, username):
-        """Parse player data from HTML response."""
+    def _hedge_delay(self):
+        """Seconds to wait for headers before hedging, or None until there are enough samples."""
+        if len(self.header_latency) < HEDGE_MIN_SAMPLES:
+            return None
+        return max(HEDGE_MIN_DELAY, self.header_latency.percentile(HEDGE_PERCENTILE) / 1000)
+    
+    async def _open(self, url, deadline):
+        """Enter _request() for ``url``; returns (context manager, response) for the caller to exit."""
+        request = self._request(url, timeout=deadline.client_timeout())
+        return request, await request.__aenter__()
+    
+    @contextlib.asynccontextmanager
+    async def _hedged_request(self, url, deadline, hedge=True):
+        """
+        Like _request(), but if no headers have arrived after the adaptive p95 delay, a second
+        request is sent and whichever response comes first is used. The hedge only goes out if
+        the limiter has a slot free right now, so hedging never exceeds the request budget.
+        """
+        delay = self._hedge_delay() if hedge else None
+        if delay is None:
+            async with self._request(url, timeout=deadline.client_timeout()) as response:
+                yield response
+            return
+        
+        attempts = [asyncio.ensure_future(self._open(url, deadline))]
+        pending = set(attempts)
+        winner = None
+        error = None
+        try:
+            while pending and winner is None:
+                hedged = len(attempts) > 1
+                done, pending = await asyncio.wait(
+                    pending, timeout=None if hedged else delay, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = winner or task
+                    else:
+                        error = task.exception()
+                if winner is None and not hedged and not done and deadline.remaining() > delay:
+                    if await self._try_hedge_slot():
+                        registry.incr('hedged_requests')
+                        attempts.append(asyncio.ensure_future(self._open(url, deadline)))
+                        pending.add(attempts[-1])
+                    else:
+                        registry.incr('hedges_skipped_budget')
+                        attempts.append(None)  # do not try again
+        finally:
+            # Cancel or close every attempt except the winner
+            losers = [task for task in attempts if task is not None and task is not winner]
+            for task in losers:
+                task.cancel()
+            for result in await asyncio.gather(*losers, return_exceptions=True):
+                if isinstance(result, tuple):
+                    request, response = result
+                    response.close()
+                    await request.__aexit__(None, None, None)
+        if winner is None:
+            raise error
+        if winner is not attempts[0]:
+            registry.incr('hedge_wins')
+        request, response = winner.result()
+        try:
+            yield response
+        except BaseException as e:
+            # Pass body errors on to _request() so the breaker sees them
+            if not await request.__aexit__(type(e), e, e.__traceback__):
+                raise
+        else:
+            await request.__aexit__(None, None, None)
+    
+    async def _try_hedge_slot(self):
+        """Limiter slot for a hedge, if free; a shared store error only costs the hedge, not the lookup."""
+        try:
+            return await self.limiter.try_acquire()
+        except sqlite3.Error as e:
+            logger.warning(f"Skipping hedge, request schedule unavailable: {e}")
+            return False
+    
+    def _archive_page(self, username, html):
+        """Queue a fetched page for the archive without waiting for the write."""
+        if self.archive is None:
+            return
+        future = self.archive_executor.submit(self.archive.add, username, html, time.time())
+        future.add_done_callback(_log_archive_error)
+    
+    async def _parse_player_data(self, html, username, deadline=None):
+        """
+        Parse player data from HTML response in the parse worker pool.
+        Jobs still queued when ``deadline`` passes are cancelled before they start.
+        """
+        loop = asyncio.get_running_loop()
+        job = loop.run_in_executor(self.parse_executor, self._run_parse_job, html, username, deadline)
+        if deadline is None:
+            return await job
+        return await deadline.wait_for(job, 'parse')
+    
+    def _run_parse_job(self, html, username, deadline=None):
+        """Entry point for parse workers; runs under the active profiler if there is one."""
+        if deadline is not None and deadline.expired:
+            # Nobody is waiting for this result any more
+            registry.incr('parse_jobs_expired')
+            return None
+        session = profiling.active_session
+        if session is not None:
+            return session.run_in_worker(self._parse_player_html, html, username)
+        return self._parse_player_html(html, username)
+    
+    @staticmethod
+    def _parse_player_html(html, username):
+        """Parse player data from HTML (blocking, CPU-bound); needs no scraper state."""
         try:
             # Check if this is the ratings website instead of a player profile
             # Invalid player names redirect to the main ratings page
             if 'ratings.ranked-rtanks.online' in html and ('Rankings' in html or 'Рейтинг' in html) and f'/user/{username}' not in html:
-                logger.info(f"Player {username} not found - redirected to ratings page")
+                logger.info("Player %s not found - redirected to ratings page", username)
                 return None
                 
-            soup = BeautifulSoup(html, 'html.parser')
-            logger.info(f"Parsing data for {username}")
+            soup = make_soup(html)
+            logger.debug("Parsing data for %s", username)
             
             # Initialize player data
             player_data = {
@@ -156,15 +399,17 @@ class RTanksScraper:
                 'group': 'Unknown',
                 'is_online': False,
                 'status_indicator': '🔴',
-                'equipment': {
-                    'turrets': [], 'hulls': [], 'protections': [],
-                    'equipped_turrets': [], 'equipped_hulls': [], 'equipped_protections': []
-                }
             }
             
+            # Equipment is registered as packed (item id, mod level, installed) codes while parsing
+            equipment = EquipmentBuilder()
+            
             # Debug: Log some of the HTML to understand structure
-            logger.info(f"HTML contains 'offline': {'offline' in html.lower()}")
-            logger.info(f"HTML contains 'online': {'online' in html.lower()}")
+            html_lower = html.lower()
+            debug_enabled = logger.isEnabledFor(logging.DEBUG)
+            if debug_enabled:
+                logger.debug("HTML contains 'offline': %s", 'offline' in html_lower)
+                logger.debug("HTML contains 'online': %s", 'online' in html_lower)
             
             # Parse the actual username as it appears on the website
             # Look for the username in various possible HTML structures
@@ -180,7 +425,7 @@ class RTanksScraper:
                     actual_username = username_match.group(1).strip()
                     if actual_username and len(actual_username) > 2 and 'профиль' not in actual_username.lower():
                         player_data['username'] = actual_username
-                        logger.info(f"Found actual username: {actual_username}")
+                        logger.debug("Found actual username: %s", actual_username)
                         break
             
             # Parse clan information from brackets [ClanName]
@@ -189,7 +434,7 @@ class RTanksScraper:
                 potential_clan = clan_match.group(1).strip()
                 if potential_clan and potential_clan.lower() not in ['online', 'offline', 'premium']:
                     player_data['clan'] = potential_clan
-                    logger.info(f"Found clan: {player_data['clan']}")
+                    logger.debug("Found clan: %s", player_data['clan'])
             
             # Parse online status from the small circle near player name
             # Parse online status from a hidden span with id="online_status"
@@ -198,18 +443,16 @@ class RTanksScraper:
                 if status_span:
                     status_text = status_span.get_text(strip=True).lower()
                     is_online = status_text == 'yes'
-                    logger.info(f"{username} detected as {'ONLINE' if is_online else 'OFFLINE'} from span")
+                    logger.debug("%s detected as %s from span", username, 'ONLINE' if is_online else 'OFFLINE')
                 else:
                     is_online = False
-                    logger.warning("No <span id='online_status'> found")
+                    logger.debug("No <span id='online_status'> found")
             except Exception as e:
                 is_online = False
                 logger.error(f"Error reading online status from span: {e}")
 
             player_data['is_online'] = is_online
             player_data['status_indicator'] = '🟢' if is_online else '🔴'
-            logger.info(f"{username} detected as {'ONLINE' if is_online else 'OFFLINE'}")
-            logger.info(f"{username} detected as {'ONLINE' if is_online else 'OFFLINE'}")
             
             # Parse experience FIRST - Look for current/max format like "105613/125000"
             exp_patterns = [
@@ -229,7 +472,7 @@ class RTanksScraper:
                         player_data['experience'] = int(current_exp_str)
                         player_data['max_experience'] = int(max_exp_str)
                         exp_found = True
-                        logger.info(f"Found experience: {player_data['experience']}/{player_data['max_experience']}")
+                        logger.debug("Found experience: %s/%s", player_data['experience'], player_data['max_experience'])
                         break
                     except ValueError:
                         continue
@@ -247,91 +490,20 @@ class RTanksScraper:
                     if exp_match:
                         exp_str = exp_match.group(1).replace(',', '').replace(' ', '')
                         player_data['experience'] = int(exp_str)
-                        logger.info(f"Found single experience: {player_data['experience']}")
+                        logger.debug("Found single experience: %s", player_data['experience'])
                         break
             
             # Parse rank - Enhanced detection with experience-based fallback
-            rank_patterns = [
-                r'(Легенда|Legend)\s*(\d*)',
-                r'(Генералиссимус|Generalissimo)',
-                r'(Командир бригады|Brigadier Commander)',
-                r'(Командир полковник|Colonel Commander)',
-                r'(Командир подполковник|Lieutenant Colonel Commander)',
-                r'(Командир майор|Major Commander)',
-                r'(Командир капитан|Captain Commander)',
-                r'(Командир лейтенант|Lieutenant Commander)',
-                r'(Командир|Commander)',
-                r'(Фельдмаршал|Field Marshal)',
-                r'(Маршал|Marshal)',
-                r'(Генерал|General)',
-                r'(Генерал-лейтенант|Lieutenant General)',
-                r'(Генерал-майор|Major General)',
-                r'(Бригадир|Brigadier)',
-                r'(Полковник|Colonel)',
-                r'(Подполковник|Lieutenant Colonel)',
-                r'(Майор|Major)',
-                r'(Капитан|Captain)',
-                r'(Старший лейтенант|First Lieutenant)',
-                r'(Лейтенант|Second Lieutenant)',
-                r'(Старший прапорщик|Master Warrant Officer)',
-                r'(Прапорщик|Warrant Officer)',
-                r'(Старшина|Sergeant Major)',
-                r'(Старший сержант|First Sergeant)',
-                r'(Сержант|Master Sergeant)',
-                r'(Младший сержант|Staff Sergeant)',
-                r'(Ефрейтор|Sergeant)',
-                r'(Старший ефрейтор|Master Corporal)',
-                r'(Капрал|Corporal)',
-                r'(Гефрейтор|Gefreiter)',
-                r'(Рядовой|Private)',
-                r'(Новобранец|Recruit)'
-            ]
+            # Every known name on the page, found in one pass (also used for equipment below)
+            name_hits = list(NAME_MATCHER.finditer(html_lower))
             
+            # Ranks are checked in RANK_NAMES order: the first listed rank present on the page wins
+            rank_indexes = [index for _, _, (kind, index) in name_hits if kind == 'rank']
             rank_found = False
-            for pattern in rank_patterns:
-                rank_match = re.search(pattern, html, re.IGNORECASE)
-                if rank_match:
-                    rank_text = rank_match.group(1)
-                    # Map Russian ranks to English
-                    rank_mapping = {
-                        'Легенда': 'Legend',
-                        'Генералиссимус': 'Generalissimo',
-                        'Командир бригады': 'Brigadier Commander',
-                        'Командир полковник': 'Colonel Commander',
-                        'Командир подполковник': 'Lieutenant Colonel Commander',
-                        'Командир майор': 'Major Commander',
-                        'Командир капитан': 'Captain Commander',
-                        'Командир лейтенант': 'Lieutenant Commander',
-                        'Командир': 'Commander',
-                        'Фельдмаршал': 'Field Marshal',
-                        'Маршал': 'Marshal',
-                        'Генерал': 'General',
-                        'Генерал-лейтенант': 'Lieutenant General',
-                        'Генерал-майор': 'Major General',
-                        'Бригадир': 'Brigadier',
-                        'Полковник': 'Colonel',
-                        'Подполковник': 'Lieutenant Colonel',
-                        'Майор': 'Major',
-                        'Капитан': 'Captain',
-                        'Старший лейтенант': 'First Lieutenant',
-                        'Лейтенант': 'Second Lieutenant',
-                        'Старший прапорщик': 'Master Warrant Officer',
-                        'Прапорщик': 'Warrant Officer',
-                        'Старшина': 'Sergeant Major',
-                        'Старший сержант': 'First Sergeant',
-                        'Сержант': 'Master Sergeant',
-                        'Младший сержант': 'Staff Sergeant',
-                        'Ефрейтор': 'Sergeant',
-                        'Старший ефрейтор': 'Master Corporal',
-                        'Капрал': 'Corporal',
-                        'Гефрейтор': 'Gefreiter',
-                        'Рядовой': 'Private',
-                        'Новобранец': 'Recruit'
-                    }
-                    player_data['rank'] = rank_mapping.get(rank_text, rank_text)
-                    rank_found = True
-                    logger.info(f"Found rank: {player_data['rank']}")
-                    break
+            if rank_indexes:
+                player_data['rank'] = RANK_NAMES[min(rank_indexes)][1]
+                rank_found = True
+                logger.debug("Found rank: %s", player_data['rank'])
             
             # Determine rank from experience using correct RTanks values
             # Always use experience-based calculation as the primary method
@@ -400,14 +572,14 @@ class RTanksScraper:
                     player_data['rank'] = 'Private'  # 100
                 else:
                     player_data['rank'] = 'Recruit'  # 0-99
-                logger.info(f"Determined rank from experience: {player_data['rank']}")
+                logger.debug("Determined rank from experience: %s", player_data['rank'])
                 rank_found = True  # Mark as found since we used experience-based calculation
                 
             # Assign max experience based on rank if not already set
             from utils import get_max_experience_for_rank
             if not player_data.get('max_experience') and player_data.get('rank'):
                 player_data['max_experience'] = get_max_experience_for_rank(player_data['rank'])
-                logger.info(f"Assigned max experience for {player_data['rank']}: {player_data['max_experience']}")
+                logger.debug("Assigned max experience for %s: %s", player_data['rank'], player_data['max_experience'])
             
             # Calculate dynamic Legend rank based on experience
             if player_data.get('rank', '').startswith('Legend') and player_data.get('experience', 0) >= 1600000:
@@ -418,9 +590,10 @@ class RTanksScraper:
             # Parse combat stats from the structured data
             # Look for numbers in specific patterns that match the screenshots
             
-            # Find all digit patterns and try to match them logically
-            all_numbers = re.findall(r'\b(\d+)\b', html)
-            logger.info(f"Found numbers in HTML: {all_numbers[:20]}")  # Log first 20 numbers
+            # Find all digit patterns and try to match them logically (debug only, scans the whole page)
+            if debug_enabled:
+                all_numbers = re.findall(r'\b(\d+)\b', html)
+                logger.debug("Found numbers in HTML: %s", all_numbers[:20])  # Log first 20 numbers
             
             # Parse kills and deaths from Russian website structure
             # From screenshot: "Уничтожил" (destroyed/kills) and "Падение" (deaths)
@@ -437,7 +610,7 @@ class RTanksScraper:
                 if kills_match:
                     kills_str = kills_match.group(1).replace(',', '').replace(' ', '')
                     player_data['kills'] = int(kills_str)
-                    logger.info(f"Found kills: {player_data['kills']} from pattern {pattern}")
+                    logger.debug("Found kills: %s from pattern %s", player_data['kills'], pattern)
                     break
             
             # Look for deaths pattern - "Hit" is the correct field name from the RTanks site
@@ -453,7 +626,7 @@ class RTanksScraper:
                 if deaths_match:
                     deaths_str = deaths_match.group(1).replace(',', '').replace(' ', '')
                     player_data['deaths'] = int(deaths_str)
-                    logger.info(f"Found deaths: {player_data['deaths']} from pattern {pattern}")
+                    logger.debug("Found deaths: %s from pattern %s", player_data['deaths'], pattern)
                     break
             
             # Parse K/D ratio - "У/П" from Russian website
@@ -468,7 +641,7 @@ class RTanksScraper:
                 kd_match = re.search(pattern, html, re.IGNORECASE)
                 if kd_match:
                     player_data['kd_ratio'] = kd_match.group(1)
-                    logger.info(f"Found K/D: {player_data['kd_ratio']} from pattern {pattern}")
+                    logger.debug("Found K/D: %s from pattern %s", player_data['kd_ratio'], pattern)
                     break
             
             if not player_data['kd_ratio'] or player_data['kd_ratio'] == '0.00':
@@ -485,7 +658,7 @@ class RTanksScraper:
             for pattern in premium_patterns:
                 if re.search(pattern, html, re.IGNORECASE):
                     player_data['premium'] = True
-                    logger.info(f"Found premium: True")
+                    logger.debug("Found premium: True")
                     break
             
             # Parse group
@@ -505,7 +678,7 @@ class RTanksScraper:
                         'Администратор': 'Administrator'
                     }
                     player_data['group'] = group_mapping.get(group_text, group_text)
-                    logger.info(f"Found group: {player_data['group']}")
+                    logger.debug("Found group: %s", player_data['group'])
                     break
             
             # Parse gold boxes - "Поймано золотых ящиков" from Russian website
@@ -521,151 +694,93 @@ class RTanksScraper:
                 if gold_match:
                     gold_str = gold_match.group(1).replace(',', '').replace(' ', '')
                     player_data['gold_boxes'] = int(gold_str)
-                    logger.info(f"Found gold boxes: {player_data['gold_boxes']} from pattern {pattern}")
+                    logger.debug("Found gold boxes: %s from pattern %s", player_data['gold_boxes'], pattern)
                     break
             
             # Parse equipment (looking for "Установленный Да")
-            turret_mapping = {
-                'Смоки': 'Smoky', 'Рельса': 'Rail', 'Рикошет': 'Ricochet', 
-                'Изида': 'Isida', 'Фриз': 'Freeze', 'Огнемет': 'Flamethrower',
-                'Гром': 'Thunder', 'Молот': 'Hammer', 'Вулкан': 'Vulcan',
-                'Твинс': 'Twins', 'Шафт': 'Shaft', 'Страйкер': 'Striker'
-            }
-            
-            hull_mapping = {
-                'Хантер': 'Hunter', 'Мамонт': 'Mammoth', 'Титан': 'Titan',
-                'Васп': 'Wasp', 'Викинг': 'Viking', 'Хорнет': 'Hornet',
-                'Диктатор': 'Dictator'
-            }
-            
             # Parse equipment from the detailed equipment section
             # Look for equipment cards showing "Installed: Yes" and extract mod levels
             
-            # Find all equipment cards in the HTML
-            equipment_cards = re.findall(r'<div[^>]*class="[^"]*equipment[^"]*"[^>]*>.*?</div>', html, re.DOTALL | re.IGNORECASE)
+            # Owned turrets and hulls: a known name followed by its mod level ("Смоки M3", "Smoky М3")
+            # An item counts as installed when the first "Установленный" marker after it reads "| Да"
+            markers = [(match.start(), match.group(1) is not None) for match in _INSTALLED_MARKER.finditer(html_lower)]
+            marker_starts = [start for start, _ in markers]
             
-            for russian_name, english_name in turret_mapping.items():
-                # Look for this turret in the HTML with multiple patterns
-                patterns = [
-                    f'{russian_name}\\s*M(\\d)',  # "Smoky M0", "Rail M1", etc.
-                    f'{russian_name}\\s*М(\\d)',  # Russian М instead of M
-                    f'{english_name}\\s*M(\\d)'   # English names
-                ]
-                
-                for pattern in patterns:
-                    matches = re.findall(pattern, html, re.IGNORECASE)
-                    for mod_level in matches:
-                        equipment_name = f"{english_name} M{mod_level}"
-                        # Add to all turrets list
-                        if equipment_name not in player_data['equipment']['turrets']:
-                            player_data['equipment']['turrets'].append(equipment_name)
-                            logger.info(f"Found turret: {equipment_name}")
-                        
-                        # Simple pattern: Look for this exact turret name followed by table containing "Установленный | Да"
-                        # Using a more direct approach since the table format is: Name -> image -> table with "Установленный | Да"
-                        turret_equipped_pattern = f'{russian_name}\\s*M{mod_level}.*?Установленный[^|]*\\|\\s*Да'
-                        if re.search(turret_equipped_pattern, html, re.DOTALL | re.IGNORECASE):
-                            if equipment_name not in player_data['equipment']['equipped_turrets']:
-                                player_data['equipment']['equipped_turrets'].append(equipment_name)
-                                logger.info(f"Found EQUIPPED turret: {equipment_name}")
-            
-            for russian_name, english_name in hull_mapping.items():
-                # Look for this hull in the HTML with multiple patterns
-                patterns = [
-                    f'{russian_name}\\s*M(\\d)',  # "Hunter M0", "Mammoth M1", etc.
-                    f'{russian_name}\\s*М(\\d)',  # Russian М instead of M
-                    f'{english_name}\\s*M(\\d)'   # English names
-                ]
-                
-                for pattern in patterns:
-                    matches = re.findall(pattern, html, re.IGNORECASE)
-                    for mod_level in matches:
-                        equipment_name = f"{english_name} M{mod_level}"
-                        # Add to all hulls list
-                        if equipment_name not in player_data['equipment']['hulls']:
-                            player_data['equipment']['hulls'].append(equipment_name)
-                            logger.info(f"Found hull: {equipment_name}")
-                        
-                        # Simple pattern: Look for this exact hull name followed by table containing "Установленный | Да"
-                        hull_equipped_pattern = f'{russian_name}\\s*M{mod_level}.*?Установленный[^|]*\\|\\s*Да'
-                        if re.search(hull_equipped_pattern, html, re.DOTALL | re.IGNORECASE):
-                            if equipment_name not in player_data['equipment']['equipped_hulls']:
-                                player_data['equipment']['equipped_hulls'].append(equipment_name)
-                                logger.info(f"Found EQUIPPED hull: {equipment_name}")
-            
-            # Add protection detection - find ALL resistance patterns in HTML
-            logger.info("=== DEBUG: Finding ALL resistance patterns ===")
-            
-            # Find all resistance image patterns
-            all_resistance_patterns = re.findall(r'resistances/([^/]+)/m(\d)/preview\.png', html, re.IGNORECASE)
-            if all_resistance_patterns:
-                logger.info(f"Found {len(all_resistance_patterns)} resistance patterns:")
-                for animal, level in all_resistance_patterns:
-                    logger.info(f"  - {animal} M{level}")
-            else:
-                logger.info("No resistance patterns found")
-            
-            # Based on debug output, resistances use animal names - complete list
-            protection_mapping = {
-                'badger': 'Badger',
-                'spider': 'Spider', 
-                'falcon': 'Falcon',
-                'bear': 'Bear',
-                'wolf': 'Wolf',
-                'fox': 'Fox',
-                'eagle': 'Eagle',
-                'tiger': 'Tiger',
-                'shark': 'Shark',
-                'lion': 'Lion',
-                'snake': 'Snake',
-                'hawk': 'Hawk',
-                'panther': 'Panther',
-                'dolphin': 'Dolphin',  # Found in HTML
-                'ocelot': 'Ocelot',    # Found in HTML
-                'leopard': 'Leopard',
-                'rhino': 'Rhino',
-                'gorilla': 'Gorilla',
-                'grizzly': 'Grizzly',  # Found in HTML
-                'orca': 'Orca',  # Found in HTML
-                'cheetah': 'Cheetah',
-                'spectr_b': 'Spectr B',  # Found in HTML  
-                'spectr_d': 'Spectr D',  # Found in HTML
-                'spectr_l': 'Spectr L',  # Found in HTML
-                'spectr_e': 'Spectr E'   # Found in HTML
-            }
-            
-            player_data['equipment']['protections'] = []
+            def installed_after(position):
+                index = bisect.bisect_left(marker_starts, position)
+                return index < len(markers) and markers[index][1]
             
-            found_resistances = set()  # Use set to avoid duplicates
+            installed_protections = set()
+            # Listed in dictionary order, as before, rather than page order
+            for _, end, (kind, name) in sorted(name_hits, key=_equipment_order):
+                if kind not in ('turrets', 'hulls', 'protections'):
+                    continue
+                level_match = _MOD_LEVEL.match(html_lower, end)
+                if not level_match:
+                    continue
+                mod_level = level_match.group(1)
+                if kind == 'protections':
+                    # Protections are owned by their image path below; the name only decides installation
+                    if installed_after(level_match.end()):
+                        installed_protections.add((name, mod_level))
+                    continue
+                if equipment.add(kind, name, mod_level):
+                    logger.debug("Found %s: %s M%s", kind, name, mod_level)
+                if installed_after(level_match.end()) and equipment.add(kind, name, mod_level, installed=True):
+                    logger.debug("Found EQUIPPED %s: %s M%s", kind, name, mod_level)
+            
+            # Add protection detection - find ALL resistance patterns in HTML (debug only)
+            if debug_enabled:
+                all_resistance_patterns = re.findall(r'resistances/([^/]+)/m(\d)/preview\.png', html, re.IGNORECASE)
+                if all_resistance_patterns:
+                    logger.debug("Found %d resistance patterns:", len(all_resistance_patterns))
+                    for animal, level in all_resistance_patterns:
+                        logger.debug("  - %s M%s", animal, level)
+                else:
+                    logger.debug("No resistance patterns found")
             
-            for animal_name, display_name in protection_mapping.items():
-                # Look for resistance patterns like "resistances/badger/m3/preview.png"
-                resistance_pattern = f'resistances/{animal_name}/m(\\d)/preview\\.png'
-                matches = re.findall(resistance_pattern, html, re.IGNORECASE)
-                
-                for mod_level in matches:
-                    resistance_name = f"{display_name} M{mod_level}"
-                    if resistance_name not in found_resistances:
-                        found_resistances.add(resistance_name)
-                        player_data['equipment']['protections'].append(resistance_name)
-                        logger.info(f"Found resistance: {resistance_name}")
-                        
-                        # Simple pattern: Look for this exact resistance name followed by table containing "Установленный | Да"
-                        resistance_equipped_pattern = f'{display_name}\\s*M{mod_level}.*?Установленный[^|]*\\|\\s*Да'
-                        if re.search(resistance_equipped_pattern, html, re.DOTALL | re.IGNORECASE):
-                            if resistance_name not in player_data['equipment']['equipped_protections']:
-                                player_data['equipment']['equipped_protections'].append(resistance_name)
-                                logger.info(f"Found EQUIPPED protection: {resistance_name}")
+            # Owned protections come from their image paths ("resistances/badger/m3/preview.png")
+            for _, end, (kind, name) in name_hits:
+                if kind != 'protection_image':
+                    continue
+                level_match = _IMAGE_MOD_LEVEL.match(html_lower, end)
+                if not level_match:
+                    continue
+                mod_level = level_match.group(1)
+                if equipment.add('protections', name, mod_level):
+                    logger.debug("Found resistance: %s M%s", name, mod_level)
+                    if (name, mod_level) in installed_protections:
+                        if equipment.add('protections', name, mod_level, installed=True):
+                            logger.debug("Found EQUIPPED protection: %s M%s", name, mod_level)
             
+            # Parse equipment from the detailed equipment section
+            equipment_cards = soup.select("div.equipment-card")
+
+            for card in equipment_cards:
+                card_text = card.get_text(separator=" ", strip=True)
+
+                if "Установленный" in card_text or "Installed" in card_text:
+                    # A card shows one item, so its first mod level applies to every name on it
+                    level_match = _CARD_MOD_LEVEL.search(card_text)
+                    if not level_match:
+                        continue
+                    mod_level = level_match.group(1)
+                    for _, _, (kind, name) in NAME_MATCHER.finditer(card_text.lower()):
+                        if kind in ('turrets', 'hulls', 'protections'):
+                            if equipment.add(kind, name, mod_level, installed=True):
+                                logger.debug("Found EQUIPPED %s: %s M%s", kind, name, mod_level)
+
             # Sort protections for consistent display (resistances only)
-            player_data['equipment']['protections'].sort()
-            player_data['equipment']['equipped_protections'].sort()
+            equipment.sort('protections')
             
             # If we found meaningful data, return it
             if (player_data['experience'] > 0 or 
                 player_data['kills'] > 0 or 
                 player_data['rank'] != 'Unknown'):
-                return player_data
+                logger.info("Parsed %s: %s, %d turrets, %d hulls, %d protections",
+                            player_data['username'], player_data['rank'],
+                            equipment.count('turrets'), equipment.count('hulls'), equipment.count('protections'))
+                return PlayerSnapshot.from_fields(player_data, equipment.codes())
             
             return None
             
@@ -673,17 +788,18 @@ class RTanksScraper:
             logger.error(f"Error parsing player data: {e}")
             return None
     
-    async def _search_player_on_main_page(self, username):
+    async def _search_player_on_main_page(self, username, deadline=None):
         """Search for player on the main rankings page."""
         try:
-            session = await self._get_session()
-            
-            async with session.get(self.base_url) as response:
+            if deadline is not None:
+                deadline.check_fetch('main page search')
+            kwargs = {'timeout': deadline.client_timeout()} if deadline is not None else {}
+            async with self._request(self.base_url, **kwargs) as response:
                 if response.status != 200:
                     return None
                 
                 html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
+                soup = make_soup(html)
                 
                 # Look for the player in any rankings tables
                 tables = soup.find_all('table')
@@ -697,6 +813,8 @@ class RTanksScraper:
                 
                 return None
                 
+        except (CircuitOpenError, DeadlineExceeded):
+            raise
         except Exception as e:
             logger.error(f"Error searching main page: {e}")
             return None
@@ -720,7 +838,6 @@ class RTanksScraper:
                 'group': 'Unknown',
                 'is_online': False,
                 'status_indicator': '⚫',
-                'equipment': {'turrets': [], 'hulls': [], 'protections': []}
             }
             
             # Try to extract numeric values from cells
@@ -733,29 +850,70 @@ class RTanksScraper:
                     if max_num > player_data['experience']:
                         player_data['experience'] = max_num
             
-            return player_data if player_data['experience'] > 0 else None
+            return PlayerSnapshot.from_fields(player_data, None) if player_data['experience'] > 0 else None
             
         except Exception as e:
             logger.error(f"Error parsing table row: {e}")
             return None
     
+    async def check_website_status(self):
+        """
+        Probe the ratings website using the shared session (background priority).
+        Returns (status_code, response_ms), or (None, None) if the site is unreachable.
+        """
+        try:
+            async with self.scheduler.slot(BACKGROUND):
+                return await self._probe_website()
+        except CircuitOpenError:
+            # Skipped while open; the first check after the cool-down is the half-open probe
+            return None, None
+        except Exception as e:
+            logger.warning(f"Website status check failed: {e}")
+            return None, None
+
+    async def _probe_website(self):
+        start_time = time.monotonic()
+        async with self._request(f"{self.base_url}/", timeout=aiohttp.ClientTimeout(total=10)) as response:
+            response_ms = round((time.monotonic() - start_time) * 1000, 2)
+            return response.status, response_ms
+
     async def close(self):
         """Close the aiohttp session."""
         if self.session and not self.session.closed:
             await self.session.close()
+        self.parse_executor.shutdown(wait=False)
+        if self.archive is not None:
+            # Let queued archive writes finish before the connection closes
+            await asyncio.to_thread(self.archive_executor.shutdown)
+            self.archive.close()
 
 
+    async def get_top_player_names(self, limit):
+        """Usernames linked from the ratings page, in page order (background priority)."""
+        async with self.scheduler.slot(BACKGROUND), self._request(f"{self.base_url}/") as response:
+            if response.status != 200:
+                logger.warning(f"Unexpected status: {response.status}")
+                return []
+            html = await response.text()
+        names = []
+        for match in re.finditer(r'href="[^"]*/user/([^"/?#]+)"', html):
+            name = unquote(match.group(1))
+            if name not in names:
+                names.append(name)
+                if len(names) >= limit:
+                    break
+        return names
+
     async def get_online_players_count(self):
-        """Extract the online player count more flexibly (final version)."""
-        session = await self._get_session()
+        """Extract the online player count more flexibly (final version). Runs at background priority."""
         try:
-            async with session.get(f"{self.base_url}/") as response:
+            async with self.scheduler.slot(BACKGROUND), self._request(f"{self.base_url}/") as response:
                 if response.status != 200:
                     logger.warning(f"Unexpected status: {response.status}")
                     return 0
 
                 html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
+                soup = make_soup(html)
 
                 for div in soup.find_all('div'):
                     if div.text.strip().startswith("Online players:"):
@@ -763,7 +921,7 @@ class RTanksScraper:
                         match = re.search(r'Online players:\s*(\d+)', div.text)
                         if match:
                             count = int(match.group(1))
-                            logger.info(f"Extracted fallback count from div.text: {count}")
+                            logger.debug("Extracted fallback count from div.text: %s", count)
                             return count
                         else:
                             logger.warning("Found container but no number matched in text.")
@@ -771,6 +929,12 @@ class RTanksScraper:
 
                 logger.warning("Could not find 'Online players:' container.")
                 return 0
+        except CircuitOpenError:
+            raise
         except Exception as e:
             logger.error(f"Error scraping online players: {e}")
             return 0
+
+
+# Parse-only entry point for processes that re-parse stored pages without running a scraper (see page_archive)
+parse_player_html = RTanksScraper._parse_player_html
@@ -0,0 +1,291 @@
+"""
+Local RPC between the bot and scraper worker processes.
+Frames are a 4-byte length and a 1-byte codec tag followed by a msgpack body, sent over
+Unix domain sockets. msgpack is required for the worker tier: it only decodes plain data,
+so a peer on the socket cannot make the other side run code.
+"""
+
+import asyncio
+import itertools
+import logging
+import struct
+import time
+
+from circuit_breaker import CircuitOpenError, CLOSED, OPEN
+from config import REQUEST_DELAY_MIN, REQUEST_DELAY_MAX, SCRAPER_RPC_MAX_FRAME, SCRAPER_RPC_CONNECT_TIMEOUT
+from config import SCRAPER_RPC_RETRY_MIN, SCRAPER_RPC_RETRY_MAX
+from deadline import DeadlineExceeded
+from metrics import registry
+from models import PlayerSnapshot
+from scheduler import INTERACTIVE, JOB_CLASSES
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct('>IB')
+# Codec 0 was marshal, which is no longer accepted from either side
+CODEC_MSGPACK = 1
+
+
+class WorkerError(Exception):
+    """A scraper worker failed the call or could not be reached."""
+
+
+def require_msgpack():
+    """Fail at startup, not on the first call, when the worker tier cannot run."""
+    if msgpack is None:
+        raise RuntimeError("scraper worker processes need msgpack (pip install msgpack)")
+
+
+async def write_frame(writer, message):
+    body = msgpack.packb(message, use_bin_type=True)
+    writer.write(_HEADER.pack(len(body), CODEC_MSGPACK) + body)
+    await writer.drain()
+
+
+async def read_frame(reader, max_frame=SCRAPER_RPC_MAX_FRAME):
+    """Return the next message, or raise asyncio.IncompleteReadError at end of stream."""
+    length, codec = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    if codec != CODEC_MSGPACK:
+        raise WorkerError(f"unsupported codec {codec}; both sides must speak msgpack")
+    if length > max_frame:
+        raise WorkerError(f"frame of {length} bytes exceeds the {max_frame} byte limit")
+    # Equipment item names are keyed by integer id
+    return msgpack.unpackb(await reader.readexactly(length), raw=False, strict_map_key=False, use_list=False)
+
+
+# Stand-ins for the scraper attributes the bot reads, filled from worker status reports
+
+class RemoteBreaker:
+    """Circuit state as last reported by a worker."""
+
+    def __init__(self):
+        self._state = CLOSED
+        self._open_until = 0.0
+
+    def update(self, state, retry_after):
+        self._state = state
+        self._open_until = time.monotonic() + retry_after
+
+    @property
+    def state(self):
+        return self._state
+
+    @property
+    def retry_after(self):
+        if self._state != OPEN:
+            return 0.0
+        return max(0.0, self._open_until - time.monotonic())
+
+    def check(self):
+        # Only a hint: the worker's own breaker has the final say
+        if self.retry_after > 0:
+            raise CircuitOpenError(self.retry_after)
+
+
+class RemoteScheduler:
+    def __init__(self):
+        self._queued = {job_class: 0 for job_class in JOB_CLASSES}
+
+    def update(self, queued):
+        self._queued.update(queued)
+
+    def queued(self, job_class):
+        return self._queued.get(job_class, 0)
+
+
+class RemoteLimiter:
+    def __init__(self):
+        self.rate = 2 / (REQUEST_DELAY_MIN + REQUEST_DELAY_MAX)
+
+
+class _WorkerConnection:
+    """
+    One multiplexed connection to a worker; calls are matched to replies by id.
+    A lost connection is reopened on the next call. After a failed connect the worker is
+    passed over for an exponentially growing delay, then tried again, so a restarted
+    worker gets its share of calls back.
+    """
+
+    def __init__(self, path, on_status):
+        self.path = path
+        self._on_status = on_status
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._calls = 0
+        self._reader = None
+        self._writer = None
+        self._reader_task = None
+        self._connect_lock = asyncio.Lock()
+        self._connect_failures = 0
+        self._retry_at = 0.0
+
+    @property
+    def pending(self):
+        """Calls in flight, including ones still waiting for the connection."""
+        return self._calls
+
+    @property
+    def connected(self):
+        return self._writer is not None and not self._writer.is_closing()
+
+    @property
+    def available(self):
+        """Connected, or due for a reconnect attempt."""
+        return self.connected or time.monotonic() >= self._retry_at
+
+    async def _ensure_connected(self):
+        async with self._connect_lock:
+            if self.connected:
+                return
+            try:
+                self._reader, self._writer = await asyncio.wait_for(
+                    asyncio.open_unix_connection(self.path), SCRAPER_RPC_CONNECT_TIMEOUT)
+            except (OSError, asyncio.TimeoutError) as e:
+                self._connect_failures += 1
+                backoff = min(SCRAPER_RPC_RETRY_MAX, SCRAPER_RPC_RETRY_MIN * 2 ** (self._connect_failures - 1))
+                self._retry_at = time.monotonic() + backoff
+                raise WorkerError(f"cannot reach scraper worker at {self.path}: {e}") from e
+            if self._connect_failures:
+                logger.info(f"Reconnected to scraper worker {self.path}")
+            self._connect_failures = 0
+            self._reader_task = asyncio.create_task(self._read_replies(self._reader, self._writer))
+
+    async def call(self, method, *args):
+        self._calls += 1
+        call_id = next(self._ids)
+        try:
+            await self._ensure_connected()
+            future = asyncio.get_running_loop().create_future()
+            self._pending[call_id] = future
+            await write_frame(self._writer, (call_id, method, args))
+            return await future
+        except (OSError, ConnectionError) as e:
+            raise WorkerError(f"scraper worker {self.path} connection lost: {e}") from e
+        finally:
+            self._calls -= 1
+            self._pending.pop(call_id, None)
+
+    async def _read_replies(self, reader, writer):
+        error = WorkerError(f"scraper worker {self.path} closed the connection")
+        try:
+            while True:
+                call_id, ok, result, status = await read_frame(reader)
+                self._on_status(status)
+                future = self._pending.get(call_id)
+                if future is None or future.done():
+                    continue
+                if ok:
+                    future.set_result(result)
+                else:
+                    future.set_exception(_remote_error(result))
+        except asyncio.IncompleteReadError:
+            pass
+        except Exception as e:
+            logger.warning(f"Dropping connection to scraper worker {self.path}: {e}")
+            error = WorkerError(f"scraper worker {self.path}: {e}")
+        finally:
+            writer.close()
+            for future in list(self._pending.values()):
+                if not future.done():
+                    future.set_exception(error)
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except asyncio.CancelledError:
+                pass
+
+
+def _remote_error(error):
+    kind, message, retry_after = error
+    if kind == 'circuit_open':
+        return CircuitOpenError(retry_after)
+    if kind == 'deadline':
+        return DeadlineExceeded(message)
+    return WorkerError(message)
+
+
+class RemoteScraper:
+    """
+    Drop-in client for RTanksScraper running in one or more worker processes.
+    Each call goes to the available worker with the fewest calls in flight,
+    and is retried once on another worker if that one fails.
+    """
+
+    def __init__(self, socket_paths):
+        require_msgpack()
+        self.connections = [_WorkerConnection(path, self._update_status) for path in socket_paths]
+        self.breaker = RemoteBreaker()
+        self.scheduler = RemoteScheduler()
+        self.limiter = RemoteLimiter()
+
+    def _update_status(self, status):
+        state, retry_after, queued, rate = status
+        self.breaker.update(state, retry_after)
+        self.scheduler.update(dict(queued))
+        self.limiter.rate = rate
+
+    def _pick(self, connections):
+        # Workers backing off after a failed connect only get calls when no other is available
+        return min(connections, key=lambda conn: (not conn.available, conn.pending))
+
+    def _pick_fallback(self, connections):
+        # A retry goes to a worker known to be up before one that merely may be
+        return min(connections, key=lambda conn: (not conn.connected, not conn.available, conn.pending))
+
+    async def _call(self, method, *args, deadline=None):
+        registry.incr('scraper_rpc_calls')
+        call = self._call_with_failover(method, args)
+        if deadline is not None:
+            return await deadline.wait_for(call, method)
+        return await call
+
+    async def _call_with_failover(self, method, args):
+        connection = self._pick(self.connections)
+        try:
+            return await connection.call(method, *args)
+        except WorkerError as e:
+            registry.incr('scraper_rpc_errors')
+            others = [conn for conn in self.connections if conn is not connection]
+            if not others:
+                raise
+            logger.warning(f"Retrying {method} on another scraper worker: {e}")
+            registry.incr('scraper_rpc_failovers')
+        try:
+            return await self._pick_fallback(others).call(method, *args)
+        except WorkerError:
+            registry.incr('scraper_rpc_errors')
+            raise
+
+    async def get_player_data(self, username, deadline=None, priority=INTERACTIVE):
+        """Same contract as RTanksScraper.get_player_data; the deadline travels as remaining seconds."""
+        self.breaker.check()
+        budget = deadline.remaining() if deadline is not None else None
+        data = await self._call('player', username, budget, priority, deadline=deadline)
+        return PlayerSnapshot.from_tuple(data) if data is not None else None
+
+    async def check_website_status(self):
+        try:
+            return tuple(await self._call('website_status'))
+        except WorkerError as e:
+            logger.warning(f"Website status check failed: {e}")
+            return None, None
+
+    async def get_online_players_count(self):
+        return await self._call('online_count')
+
+    async def get_top_player_names(self, limit):
+        return list(await self._call('top_names', limit))
+
+    async def close(self):
+        for connection in self.connections:
+            await connection.close()
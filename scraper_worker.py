@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Standalone scraper worker for the RTanks Discord Bot.
+Runs RTanksScraper in its own process and serves it over a Unix domain socket (see scraper_rpc),
+so HTML parsing never competes with the gateway for the bot's GIL.
+Several workers can run side by side; they share the upstream request schedule through the shared store
+(when SHARED_STORE_PATH is set).
+
+    python scraper_worker.py /run/rtanks/scraper-0.sock
+"""
+
+import asyncio
+import logging
+import os
+import sys
+
+from circuit_breaker import CircuitOpenError
+from config import SCRAPER_SOCKET_MODE, SHARED_STORE_PATH
+from deadline import Deadline, DeadlineExceeded
+from logging_setup import setup_logging
+from metrics import registry
+from scheduler import JOB_CLASSES
+from scraper import RTanksScraper
+from scraper_rpc import read_frame, write_frame, require_msgpack
+from shared_store import SharedStore
+
+logger = logging.getLogger(__name__)
+
+
+class ScraperWorker:
+    """Serves one RTanksScraper to any number of bot connections."""
+
+    def __init__(self, socket_path, scraper):
+        self.socket_path = socket_path
+        self.scraper = scraper
+        self._server = None
+        self._methods = {
+            'player': self._player,
+            'website_status': self.scraper.check_website_status,
+            'online_count': self.scraper.get_online_players_count,
+            'top_names': self.scraper.get_top_player_names,
+        }
+
+    async def _player(self, username, budget, priority):
+        deadline = Deadline(budget) if budget is not None else None
+        snapshot = await self.scraper.get_player_data(username, deadline, priority)
+        return snapshot.to_tuple() if snapshot else None
+
+    def _status(self):
+        """Piggybacked on every reply so clients can show breaker and queue state without polling."""
+        scraper = self.scraper
+        queued = {job_class: scraper.scheduler.queued(job_class) for job_class in JOB_CLASSES}
+        return (scraper.breaker.state, scraper.breaker.retry_after, queued, scraper.limiter.rate)
+
+    async def start(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = await asyncio.start_unix_server(self._serve, path=self.socket_path)
+        os.chmod(self.socket_path, SCRAPER_SOCKET_MODE)
+        logger.info(f"Scraper worker listening on {self.socket_path}")
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _serve(self, reader, writer):
+        # Calls on one connection run concurrently; replies go out as each finishes
+        write_lock = asyncio.Lock()
+        tasks = set()
+        try:
+            while True:
+                try:
+                    call_id, method, args = await read_frame(reader)
+                except asyncio.IncompleteReadError:
+                    break
+                task = asyncio.create_task(self._dispatch(writer, write_lock, call_id, method, args))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except Exception as e:
+            logger.warning(f"Closing bad client connection: {e}")
+        finally:
+            # Work for a client that went away is not worth finishing
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def _dispatch(self, writer, write_lock, call_id, method, args):
+        registry.incr('scraper_worker_calls')
+        try:
+            handler = self._methods.get(method)
+            if handler is None:
+                raise ValueError(f"unknown method {method!r}")
+            reply = (call_id, True, await handler(*args), self._status())
+        except CircuitOpenError as e:
+            reply = (call_id, False, ('circuit_open', str(e), e.retry_after), self._status())
+        except DeadlineExceeded as e:
+            reply = (call_id, False, ('deadline', str(e), 0.0), self._status())
+        except Exception as e:
+            logger.error(f"Worker call {method} failed: {e}")
+            reply = (call_id, False, ('error', f"{type(e).__name__}: {e}", 0.0), self._status())
+        try:
+            async with write_lock:
+                await write_frame(writer, reply)
+        except (OSError, ConnectionError):
+            pass
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.scraper.close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+async def main(socket_path):
+    require_msgpack()
+    # Without a shared store each worker paces its own requests
+    store = SharedStore() if SHARED_STORE_PATH else None
+    worker = ScraperWorker(socket_path, RTanksScraper(shared_store=store))
+    try:
+        await worker.serve_forever()
+    finally:
+        await worker.close()
+        if store is not None:
+            store.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit(f"usage: {sys.argv[0]} SOCKET_PATH")
+    log_listener = setup_logging(getattr(logging, os.getenv('LOG_LEVEL', 'INFO').upper(), logging.INFO))
+    try:
+        asyncio.run(main(sys.argv[1]))
+    except KeyboardInterrupt:
+        logger.info("Scraper worker stopped")
+    finally:
+        log_listener.stop()
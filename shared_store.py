@@ -0,0 +1,195 @@
+"""
+Cross-process shared store for the RTanks Discord Bot.
+A local SQLite database lets shard processes on one host share player snapshots,
+single-flight leases, the upstream request schedule and small values like the online count.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+import msgpack
+
+from config import SHARED_STORE_PATH, SHARED_STORE_RETENTION
+
+logger = logging.getLogger(__name__)
+
+# 1: msgpack payloads. Version 0 stored marshal, which is unsafe to load from a file every
+# process can write and is tied to the Python version that wrote it.
+_SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    key TEXT PRIMARY KEY,
+    payload BLOB NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS schedule (
+    name TEXT PRIMARY KEY,
+    next_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS kv (
+    name TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+def _pack(value):
+    return msgpack.packb(value, use_bin_type=True)
+
+
+def _unpack(payload):
+    # Equipment item names are keyed by integer id
+    return msgpack.unpackb(payload, raw=False, strict_map_key=False, use_list=False)
+
+
+class SharedStore:
+    """
+    Thin SQLite wrapper. Methods are blocking and safe to call from any thread
+    (each thread gets its own connection); use ``run()`` from async code.
+    Times are wall-clock (``time.time()``) so they compare across processes.
+    """
+
+    def __init__(self, path=SHARED_STORE_PATH, retention=SHARED_STORE_RETENTION):
+        self.path = path
+        self.retention = retention
+        # Lease owner id; single-flight inside a process is handled by the caller
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._puts = 0
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            if conn.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+                # Older payloads are only cached data; drop them rather than decode them
+                conn.executescript("DROP TABLE IF EXISTS players; DROP TABLE IF EXISTS kv;")
+                conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            conn.executescript(_SCHEMA)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    async def run(self, method, *args):
+        """Call a blocking store method in a worker thread."""
+        return await asyncio.to_thread(method, *args)
+
+    def close(self):
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    # Player snapshots
+
+    def get_player(self, key, max_age=None):
+        """Return (snapshot tuple, fetched_at) or None if missing or older than ``max_age``."""
+        row = self._conn().execute("SELECT payload, fetched_at FROM players WHERE key = ?", (key,)).fetchone()
+        if row is None or (max_age is not None and time.time() - row[1] > max_age):
+            return None
+        return _unpack(row[0]), row[1]
+
+    def put_player(self, key, snapshot_tuple, fetched_at):
+        conn = self._conn()
+        conn.execute(
+            "INSERT INTO players (key, payload, fetched_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET payload = excluded.payload, fetched_at = excluded.fetched_at "
+            "WHERE excluded.fetched_at >= players.fetched_at",
+            (key, _pack(snapshot_tuple), fetched_at),
+        )
+        # Drop long-expired rows every few hundred writes
+        self._puts += 1
+        if self._puts % 500 == 0:
+            conn.execute("DELETE FROM players WHERE fetched_at < ?", (time.time() - self.retention,))
+
+    def all_players(self):
+        """(key, snapshot tuple, fetched_at) for every stored player, e.g. to seed in-memory indexes."""
+        rows = self._conn().execute("SELECT key, payload, fetched_at FROM players").fetchall()
+        return [(key, _unpack(payload), fetched_at) for key, payload, fetched_at in rows]
+
+    # Single-flight leases
+
+    def acquire_lease(self, key, ttl):
+        """Take the lease on ``key`` if it is free, expired or already ours."""
+        now = time.time()
+        cursor = self._conn().execute(
+            "INSERT INTO leases (key, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE leases.expires_at < ? OR leases.owner = excluded.owner",
+            (key, self.owner, now + ttl, now),
+        )
+        return cursor.rowcount == 1
+
+    def lease_held(self, key):
+        row = self._conn().execute("SELECT expires_at FROM leases WHERE key = ?", (key,)).fetchone()
+        return row is not None and row[0] >= time.time()
+
+    def release_lease(self, key):
+        self._conn().execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, self.owner))
+
+    # Shared request schedule
+
+    def reserve_slot(self, name, spacing):
+        """
+        Reserve the next request slot of schedule ``name`` and push it ``spacing`` seconds out.
+        Returns how long the caller must wait before using its slot.
+        """
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT next_at FROM schedule WHERE name = ?", (name,)).fetchone()
+            slot_at = max(now, row[0]) if row else now
+            conn.execute(
+                "INSERT INTO schedule (name, next_at) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET next_at = excluded.next_at",
+                (name, slot_at + spacing),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return slot_at - now
+
+    def try_reserve_slot(self, name, spacing):
+        """Reserve the slot of schedule ``name`` only if it is due now; returns True if reserved."""
+        now = time.time()
+        cursor = self._conn().execute(
+            "INSERT INTO schedule (name, next_at) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET next_at = excluded.next_at WHERE schedule.next_at <= ?",
+            (name, now + spacing, now),
+        )
+        return cursor.rowcount == 1
+
+    # Small shared values
+
+    def get_value(self, name, max_age=None):
+        row = self._conn().execute("SELECT value, updated_at FROM kv WHERE name = ?", (name,)).fetchone()
+        if row is None or (max_age is not None and time.time() - row[1] > max_age):
+            return None
+        return _unpack(row[0])
+
+    def set_value(self, name, value):
+        self._conn().execute(
+            "INSERT INTO kv (name, value, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+            (name, _pack(value), time.time()),
+        )
@@ -0,0 +1,66 @@
+"""
+Startup timeline for the RTanks Discord Bot.
+Import this first so the clock starts before the heavy imports.
+"""
+
+import logging
+import random
+import time
+
+from config import STARTUP_TARGET_SECONDS, LOGIN_BACKOFF_BASE, LOGIN_BACKOFF_MAX
+
+logger = logging.getLogger(__name__)
+
+_STARTED_AT = time.perf_counter()
+
+
+class StartupTimeline:
+    """Ordered startup phases, each stamped once with the time since process start."""
+
+    def __init__(self, started_at=_STARTED_AT):
+        self.started_at = started_at
+        self.marks = []  # (phase, seconds since start)
+
+    def mark(self, phase):
+        """
+        Record the end of ``phase``. Returns False if it was already recorded,
+        so repeats (e.g. on_ready after a reconnect) are ignored.
+        """
+        if any(name == phase for name, _ in self.marks):
+            return False
+        self.marks.append((phase, time.perf_counter() - self.started_at))
+        return True
+
+    def phases(self):
+        """(phase, duration) pairs, each measured from the previous mark."""
+        previous = 0.0
+        durations = []
+        for name, at in self.marks:
+            durations.append((name, at - previous))
+            previous = at
+        return durations
+
+    @property
+    def total(self):
+        return self.marks[-1][1] if self.marks else 0.0
+
+    def summary(self):
+        parts = ", ".join(f"{name} {duration * 1000:.0f}ms" for name, duration in self.phases())
+        return f"{parts} (total {self.total:.2f}s)"
+
+    def log(self):
+        if self.total > STARTUP_TARGET_SECONDS:
+            logger.warning(f"Startup took longer than {STARTUP_TARGET_SECONDS}s: {self.summary()}")
+        else:
+            logger.info(f"Startup timeline: {self.summary()}")
+
+
+timeline = StartupTimeline()
+
+
+def login_backoff(attempt, retry_after=None):
+    """Seconds to wait before login attempt ``attempt`` (1-based) after a rate limit."""
+    if retry_after:
+        return retry_after
+    delay = min(LOGIN_BACKOFF_MAX, LOGIN_BACKOFF_BASE * 2 ** (attempt - 1))
+    return delay * random.uniform(0.5, 1.0)
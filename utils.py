@@ -71,6 +71,18 @@ def get_rank_emoji(rank_name):
     emoji_index = rank_mapping.get(rank_name, 31)  # Default to legend
     return RANK_EMOJIS.get(emoji_index, '🏆')
 
+def sparkline(values, width=20):
+    """Render the last ``width`` values as a unicode sparkline."""
+    values = list(values)[-width:]
+    if not values:
+        return "-"
+    ticks = "▁▂▃▄▅▆▇█"
+    low, high = min(values), max(values)
+    if high == low:
+        return ticks[0] * len(values)
+    scale = (len(ticks) - 1) / (high - low)
+    return "".join(ticks[int((v - low) * scale)] for v in values)
+
 def format_duration(seconds):
     """Format duration in seconds to a readable string."""
     if seconds < 60:
@@ -162,54 +174,48 @@ def extract_modification_level(equipment_name):
         return int(match.group(1))
     return 0  # Default to M0 if no modification found
 
-def get_equipment_quality_score(equipment_list):
-    """Calculate equipment quality score based on M3 priority."""
-    if not equipment_list:
-        return 0, []
-    
-    m3_count = 0
-    highest_m_level = 0
-    equipment_details = []
-    
-    for equipment in equipment_list:
-        mod_level = extract_modification_level(equipment)
-        equipment_details.append((equipment, mod_level))
-        
-        if mod_level == 3:
-            m3_count += 1
-        
-        if mod_level > highest_m_level:
-            highest_m_level = mod_level
-    
-    # Score calculation: M3s are worth 1000 points each, other Ms are worth their level * 10
-    score = m3_count * 1000
-    for equipment, mod_level in equipment_details:
-        if mod_level != 3:  # Don't double count M3s
-            score += mod_level * 10
-    
-    return score, equipment_details
+def equipment_mod_levels(equipment, categories=('turrets', 'hulls')):
+    """Mod levels of a player's equipment as bytes (one byte per item)."""
+    if not equipment:
+        return b""
+    if hasattr(equipment, 'mod_levels'):
+        # Snapshot equipment already carries integer mod levels from parse time
+        return equipment.mod_levels(categories)
+    levels = []
+    for category in categories:
+        levels.extend(extract_modification_level(name) for name in equipment.get(category, []))
+    return bytes(levels)
+
+# Per-item score in tens of points, indexed by mod level: M3s are worth 1000 points each,
+# other Ms are worth their level * 10
+_SCORE_WEIGHTS = bytes(100 if level == 3 else level for level in range(256))
+
+def equipment_quality_batch(level_arrays):
+    """
+    Score many players at once from their bytes/arrays of mod levels.
+    The arrays are joined into one buffer and mapped to per-item weights with a single
+    translate; each player's score is then the sum of its span of that buffer.
+    Returns a list of (M3 count, highest M level, score), one per array.
+    """
+    level_arrays = [bytes(levels) for levels in level_arrays]
+    weights = b"".join(level_arrays).translate(_SCORE_WEIGHTS)
+    results = []
+    start = 0
+    for levels in level_arrays:
+        end = start + len(levels)
+        results.append((levels.count(3), max(levels, default=0), sum(weights[start:end]) * 10))
+        start = end
+    return results
+
+def equipment_quality(levels):
+    """Return (M3 count, highest M level, score) for a bytes/array of mod levels."""
+    return equipment_quality_batch((levels,))[0]
 
 def compare_equipment_quality(player1_equipment, player2_equipment):
     """Compare equipment quality between two players based on M3 priority."""
-    # Combine all equipment for each player
-    p1_all_equipment = []
-    p2_all_equipment = []
-    
-    if player1_equipment:
-        p1_all_equipment.extend(player1_equipment.get('turrets', []))
-        p1_all_equipment.extend(player1_equipment.get('hulls', []))
-    
-    if player2_equipment:
-        p2_all_equipment.extend(player2_equipment.get('turrets', []))
-        p2_all_equipment.extend(player2_equipment.get('hulls', []))
-    
-    # Get quality scores and details
-    p1_score, p1_details = get_equipment_quality_score(p1_all_equipment)
-    p2_score, p2_details = get_equipment_quality_score(p2_all_equipment)
-    
-    # Count M3s for each player
-    p1_m3_count = sum(1 for _, mod_level in p1_details if mod_level == 3)
-    p2_m3_count = sum(1 for _, mod_level in p2_details if mod_level == 3)
+    (p1_m3_count, p1_highest, p1_score), (p2_m3_count, p2_highest, p2_score) = equipment_quality_batch(
+        (equipment_mod_levels(player1_equipment), equipment_mod_levels(player2_equipment))
+    )
     
     # Determine winner and reason
     if p1_m3_count > p2_m3_count:
@@ -224,9 +230,6 @@ def compare_equipment_quality(player1_equipment, player2_equipment):
         }
     else:
         # Same M3 count, compare by highest M level or total score
-        p1_highest = max([mod_level for _, mod_level in p1_details], default=0)
-        p2_highest = max([mod_level for _, mod_level in p2_details], default=0)
-        
         if p1_highest > p2_highest:
             return {
                 'winner': 'player1',